@@ -0,0 +1,133 @@
+"""
+Compares wire formats for scoring requests and responses, without HTTP or the
+model: decoding a request body into validated model input, and encoding a
+scored batch into a response body. Reports latency percentiles and body size.
+
+    python -m benchmarks.bench_codecs --rows 1 100 10000 --iterations 200
+
+Request codecs:  json (batch decoder + validate_frame; /predict: json.loads +
+pydantic, as FastAPI did), json_native (/predict: pydantic's own JSON parser),
+msgpack, arrow (batch only).
+Response codecs: pydantic (previous per-row models + model_dump_json), json
+(orjson from plain dicts), msgpack, arrow (batch only).
+Formats whose library is not installed are skipped.
+"""
+import argparse
+import importlib.util
+import json
+
+import numpy as np
+import orjson
+import pandas as pd
+
+from benchmarks.common import percentiles, time_calls
+from src.api.codecs import ARROW, JSON, MSGPACK, encode_batch, encode_prediction
+from src.api.payloads import decode_batch_payload, decode_prediction_request
+from src.api.schemas import (
+    BatchPredictionItem, BatchPredictionResponse, PredictionRequest, PredictionResponse, validate_frame
+)
+from src.training.mock_data import generate_synthetic_data
+from src.training.preprocess import split_features_target
+
+HAS_MSGPACK = importlib.util.find_spec("msgpack") is not None
+HAS_ARROW = importlib.util.find_spec("pyarrow") is not None
+
+
+def _arrow_body(frame: pd.DataFrame) -> bytes:
+    import pyarrow as pa
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _pydantic_batch(n_rows, positions, probabilities, labels, row_errors) -> bytes:
+    predictions = {
+        int(pos): PredictionResponse(default_probability=float(p), is_default=int(label))
+        for pos, p, label in zip(positions, probabilities, labels)
+    }
+    results = [BatchPredictionItem(index=pos, prediction=predictions.get(pos), errors=row_errors.get(pos))
+               for pos in range(n_rows)]
+    return BatchPredictionResponse(n_success=len(predictions), n_failed=len(row_errors),
+                                   results=results).model_dump_json().encode()
+
+
+def request_codecs(frame: pd.DataFrame) -> dict[str, tuple[bytes, callable]]:
+    """
+    name -> (body, decode-and-validate function).
+    """
+    rows = frame.to_dict(orient="records")
+    if len(frame) == 1:
+        row = rows[0]
+        codecs = {
+            "json": (json.dumps(row).encode(), lambda body: PredictionRequest(**json.loads(body))),
+            "json_native": (json.dumps(row).encode(), lambda body: decode_prediction_request(body, JSON)),
+        }
+        if HAS_MSGPACK:
+            import msgpack
+            codecs["msgpack"] = (msgpack.packb(row), lambda body: decode_prediction_request(body, MSGPACK))
+        return codecs
+
+    def batch(content_type):
+        return lambda body: validate_frame(decode_batch_payload(body, content_type)[0])
+
+    codecs = {"json": (orjson.dumps(rows), batch(JSON))}
+    if HAS_MSGPACK:
+        import msgpack
+        codecs["msgpack"] = (msgpack.packb(rows), batch(MSGPACK))
+    if HAS_ARROW:
+        codecs["arrow"] = (_arrow_body(frame), batch(ARROW))
+    return codecs
+
+
+def response_codecs(n_rows: int) -> dict[str, callable]:
+    rng = np.random.default_rng(0)
+    positions = np.arange(n_rows, dtype=np.int64)
+    probabilities = rng.random(n_rows)
+    labels = (probabilities >= 0.5).astype(np.int64)
+    if n_rows == 1:
+        response = PredictionResponse(default_probability=float(probabilities[0]), is_default=int(labels[0]))
+        codecs = {"pydantic": lambda: response.model_dump_json().encode(),
+                  "json": lambda: orjson.dumps(response.model_dump())}
+        if HAS_MSGPACK:
+            codecs["msgpack"] = lambda: encode_prediction(response, MSGPACK)
+        return codecs
+
+    codecs = {
+        "pydantic": lambda: _pydantic_batch(n_rows, positions, probabilities, labels, {}),
+        "json": lambda: encode_batch(n_rows, positions, probabilities, labels, None, {}, JSON),
+    }
+    if HAS_MSGPACK:
+        codecs["msgpack"] = lambda: encode_batch(n_rows, positions, probabilities, labels, None, {}, MSGPACK)
+    if HAS_ARROW:
+        codecs["arrow"] = lambda: encode_batch(n_rows, positions, probabilities, labels, None, {}, ARROW)
+    return codecs
+
+
+def run(row_counts: list[int], iterations: int, X: pd.DataFrame | None = None) -> dict:
+    if X is None:
+        X, _ = split_features_target(generate_synthetic_data(n_rows=max(row_counts), seed=7))
+    results = {}
+    for n_rows in row_counts:
+        frame = X.head(n_rows).reset_index(drop=True)
+        # Fewer iterations for large batches keeps the run short
+        n_iter = max(5, iterations // max(1, n_rows // 100))
+        decode = {
+            name: {**percentiles(time_calls(lambda: fn(body), n_iter)), "bytes": len(body)}
+            for name, (body, fn) in request_codecs(frame).items()
+        }
+        encode = {
+            name: {**percentiles(time_calls(fn, n_iter)), "bytes": len(fn())}
+            for name, fn in response_codecs(n_rows).items()
+        }
+        results[f"rows_{n_rows}"] = {"decode_request": decode, "encode_response": encode}
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1, 100, 10000])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    print(json.dumps(run(args.rows, args.iterations), indent=4))
@@ -0,0 +1,78 @@
+"""
+Training-data load time: parsing the source file versus reading the columnar
+dataset cache (checksum + memory-mapped columns).
+
+    python -m benchmarks.bench_data_load --rows 30000 --format xlsx
+    python -m benchmarks.bench_data_load --source data/default_of_credit_card_clients.xls
+
+Without --source, a synthetic dataset of --rows rows is written in the chosen
+format (xlsx needs openpyxl), so the benchmark runs offline.
+"""
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from src.training.data_loader import read_local_dataset
+from src.training.dataset_cache import file_checksum, load_cached, write_cache
+from src.training.mock_data import generate_synthetic_data
+
+
+def _write_synthetic(tmp: str, n_rows: int, fmt: str) -> str:
+    df = generate_synthetic_data(n_rows=n_rows).rename(columns={'target': 'default payment next month'})
+    path = Path(tmp) / f"synthetic.{fmt}"
+    if fmt == "csv":
+        df.to_csv(path, index=False)
+    else:
+        # Same layout as the UCI file: a title row above the real header
+        with open(path, "wb") as f:
+            df.to_excel(f, index=False, startrow=1)
+    return str(path)
+
+
+def _summary(samples: list[float]) -> dict:
+    ms = np.asarray(samples) * 1000
+    return {"median_ms": float(np.median(ms)), "min_ms": float(ms.min())}
+
+
+def run(source: str | None, n_rows: int, fmt: str, runs: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        source = source or _write_synthetic(tmp, n_rows, fmt)
+        processed_dir = str(Path(tmp) / "processed")
+
+        parse_samples = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            parsed = read_local_dataset(source)
+            parse_samples.append(time.perf_counter() - start)
+
+        write_cache(parsed, file_checksum(source), source, processed_dir)
+        cached_samples = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            cached = load_cached(source, read_local_dataset, processed_dir)
+            cached_samples.append(time.perf_counter() - start)
+
+        return {
+            "source": source if not source.startswith(tmp) else f"synthetic {fmt}",
+            "rows": len(parsed),
+            "parse_source": _summary(parse_samples),
+            "cached_load": _summary(cached_samples),
+            "frame_bytes": {
+                "parsed": int(parsed.memory_usage(deep=True).sum()),
+                "cached": int(cached.memory_usage(deep=True).sum()),
+            },
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", default=None, help="Existing .xls/.xlsx/.csv dataset")
+    parser.add_argument("--rows", type=int, default=30000)
+    parser.add_argument("--format", choices=["xlsx", "csv"], default="xlsx")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+    print(json.dumps(run(args.source, args.rows, args.format, args.runs), indent=4))
@@ -0,0 +1,51 @@
+"""
+Compares inference execution backends under concurrent load.
+
+    python -m benchmarks.bench_executor --concurrency 32 --requests 2000
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+from pathlib import Path
+
+import joblib
+
+from benchmarks.common import run_load, train_throwaway_pipeline
+from src.api.main import app
+from src.utils.config import settings
+
+
+async def _bench_backend(backend: str, payloads: list[dict], args) -> dict:
+    settings.INFERENCE_BACKEND = backend
+    settings.INFERENCE_WORKERS = args.workers
+    settings.INFERENCE_MAX_PENDING = args.max_pending
+    settings.XGB_NTHREAD = args.nthread
+    async with app.router.lifespan_context(app):
+        # Warm up every worker before measuring
+        await run_load(app, "/predict", payloads, args.workers, args.workers * 4)
+        return await run_load(app, "/predict", payloads, args.concurrency, args.requests)
+
+
+def run(args) -> dict:
+    pipeline, X = train_throwaway_pipeline()
+    payloads = X.head(500).to_dict(orient='records')
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.MODEL_PATH = str(Path(tmp) / "model.pkl")
+        joblib.dump(pipeline, settings.MODEL_PATH)
+        for backend in args.backends:
+            results[backend] = asyncio.run(_bench_backend(backend, payloads, args))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--backends", nargs="+", default=["threadpool", "thread", "process"])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--max-pending", type=int, default=64)
+    parser.add_argument("--nthread", type=int, default=1)
+    args = parser.parse_args()
+    print(json.dumps(run(args), indent=4))
@@ -0,0 +1,40 @@
+"""
+Latency of POST /predict with and without explanations.
+
+    python -m benchmarks.bench_explain --requests 500
+"""
+import argparse
+import json
+
+from fastapi.testclient import TestClient
+
+from benchmarks.common import percentiles, time_calls, train_throwaway_pipeline
+from src.api.main import app, models
+from src.scoring.executor import InferenceExecutor
+from src.scoring.registry import ModelRegistry
+from src.scoring.scorer import Scorer
+
+
+def run(n_requests: int) -> dict:
+    pipeline, X = train_throwaway_pipeline()
+    registry = ModelRegistry()
+    registry.register("bench", Scorer(pipeline))
+    registry.activate("bench")
+    models['registry'] = registry
+    models['executor'] = InferenceExecutor()
+    client = TestClient(app)
+    payload = X.iloc[0].to_dict()
+
+    results = {}
+    for label, url in [("explain_off", "/predict"), ("explain_on", "/predict?explain=true&top_k=5")]:
+        samples = time_calls(lambda: client.post(url, json=payload), n_requests)
+        results[label] = percentiles(samples)
+    models.clear()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+    print(json.dumps(run(args.requests), indent=4))
@@ -0,0 +1,114 @@
+"""
+Feature store build time and lookup/scoring latency at scale.
+
+    python -m benchmarks.bench_feature_store --accounts 20000000 --directory /tmp/feature_store
+
+Builds a store of --accounts synthetic accounts (sparse 64-bit IDs), then
+times single-account lookups (hash probe + row view), by-id scoring on
+both engines against scoring the account from its raw request fields, and a
+batch lookup. Lookups use random IDs across the whole key space. Right after
+the build most pages are still in the page cache; a lookup that misses it
+also pays a page fault for the index slot and one for the row.
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import percentiles, time_calls, train_throwaway_pipeline
+from src.api.schemas import FEATURE_COLUMNS, PredictionRequest
+from src.scoring.engine import CompiledPreprocessor, CompiledScorer
+from src.scoring.feature_store import build
+from src.scoring.scorer import Scorer
+from src.training.mock_data import generate_synthetic_data
+from src.training.preprocess import split_features_target
+
+
+class _TiledFrame:
+    """
+    Repeats a small frame to `n_rows` rows chunk by chunk, so building a large
+    store does not need tens of millions of rows in memory.
+    """
+    def __init__(self, X, n_rows: int):
+        self.raw = X[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+        self.n_rows = n_rows
+
+    def __len__(self):
+        return self.n_rows
+
+    @property
+    def iloc(self):
+        return self
+
+    def __getitem__(self, item: slice):
+        idx = np.arange(item.start, min(item.stop, self.n_rows)) % len(self.raw)
+        return pd.DataFrame(self.raw[idx], columns=FEATURE_COLUMNS)
+
+
+def run(n_accounts: int, iterations: int, directory: str | None = None, batch_size: int = 1000) -> dict:
+    pipeline, _ = train_throwaway_pipeline()
+    compiled = CompiledScorer(CompiledPreprocessor.from_column_transformer(pipeline.named_steps['preprocessor']),
+                              pipeline.named_steps['classifier'].get_booster())
+    scorers = {"compiled": compiled, "pipeline": Scorer(pipeline)}
+    for scorer in scorers.values():
+        scorer.set_nthread(1)
+    X, _ = split_features_target(generate_synthetic_data(n_rows=10000, seed=3))
+    # Sparse, unordered IDs like real account numbers
+    ids = np.arange(n_accounts, dtype=np.int64) * 7919 + 10**9
+
+    owns_directory = directory is None
+    directory = directory or tempfile.mkdtemp(prefix="feature_store_")
+    try:
+        start = time.perf_counter()
+        store = build(_TiledFrame(X, n_accounts), compiled.compiled, os.path.join(directory, "store"), ids)
+        build_seconds = time.perf_counter() - start
+
+        rng = np.random.default_rng(0)
+
+        def sample():
+            return iter(rng.choice(ids, size=iterations + 100).tolist())
+
+        request = PredictionRequest(**X.iloc[0].to_dict())
+        results = {
+            "accounts": n_accounts,
+            "build_seconds": build_seconds,
+            "store_bytes": sum(os.path.getsize(os.path.join(store.directory, name)) for name in os.listdir(store.directory)),
+        }
+        accounts = sample()
+        results["lookup"] = percentiles(time_calls(lambda: store.get(next(accounts)), iterations, warmup=0))
+
+        for engine, scorer in scorers.items():
+            accounts = sample()
+
+            def score_by_id():
+                [row] = store.lookup([next(accounts)])
+                return scorer.score_transformed(store.view(row))
+
+            results[engine] = {
+                "score_by_id": percentiles(time_calls(score_by_id, iterations)),
+                "score_from_request_fields": percentiles(
+                    time_calls(lambda: scorer.score(scorer.features_from_requests([request])), iterations)),
+            }
+
+        batches = iter([rng.choice(ids, size=batch_size) for _ in range(40)])
+        results[f"batch_lookup_{batch_size}"] = percentiles(
+            time_calls(lambda: store.features(store.lookup(next(batches))), 20, warmup=20))
+        return results
+    finally:
+        if owns_directory:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--accounts", type=int, default=1_000_000)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--directory", default=None, help="Where to build the store (default: a temporary directory)")
+    args = parser.parse_args()
+    print(json.dumps(run(args.accounts, args.iterations, args.directory, args.batch_size), indent=4))
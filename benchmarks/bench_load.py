@@ -0,0 +1,71 @@
+"""
+Replays request payloads against the app in-process (ASGI, no network) at a
+fixed concurrency and reports p50/p95/p99 latency and RPS.
+
+    python -m benchmarks.bench_load --payloads payloads.jsonl --concurrency 16 --requests 5000
+
+`--payloads` is an NDJSON file with one /predict body per line; without it,
+payloads are drawn from the synthetic training data. The model is a
+throwaway pipeline trained on synthetic data, so the benchmark runs offline.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import tempfile
+from pathlib import Path
+
+import joblib
+
+from benchmarks.common import load_payloads, run_load, train_throwaway_pipeline
+from src.api.main import app
+from src.scoring.engine import export_compiled_artifacts
+from src.utils.config import settings
+
+
+async def _replay(payloads: list[dict], path: str, concurrency: int, total: int, warmup: int) -> dict:
+    # One access-log (and httpx client) line per request would dominate the measurement
+    logging.getLogger("api.access").setLevel(logging.WARNING)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    async with app.router.lifespan_context(app):
+        if warmup:
+            await run_load(app, path, payloads, concurrency, warmup)
+        return await run_load(app, path, payloads, concurrency, total)
+
+
+def run(payloads_path: str | None = None, concurrency: int = 16, total: int = 2000, warmup: int = 200,
+        engine: str = "pipeline", path: str = "/predict", pipeline=None, X=None) -> dict:
+    if pipeline is None:
+        pipeline, X = train_throwaway_pipeline()
+    payloads = load_payloads(payloads_path) if payloads_path else X.head(1000).to_dict(orient='records')
+    with tempfile.TemporaryDirectory() as tmp:
+        # Point the app at the throwaway artifacts; restored afterwards so callers are unaffected
+        overrides = {
+            "MODEL_PATH": str(Path(tmp) / "model.pkl"),
+            "PREPROCESSOR_SPEC_PATH": str(Path(tmp) / "preprocessor_spec.json"),
+            "BOOSTER_PATH": str(Path(tmp) / "booster.ubj"),
+            "INFERENCE_ENGINE": engine,
+        }
+        previous = {name: getattr(settings, name) for name in overrides}
+        for name, value in overrides.items():
+            setattr(settings, name, value)
+        try:
+            joblib.dump(pipeline, settings.MODEL_PATH)
+            export_compiled_artifacts(pipeline)
+            result = asyncio.run(_replay(payloads, path, concurrency, total, warmup))
+        finally:
+            for name, value in previous.items():
+                setattr(settings, name, value)
+    return {"engine": engine, "concurrency": concurrency, "requests": total, **result}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--payloads", default=None, help="NDJSON file of /predict bodies")
+    parser.add_argument("--path", default="/predict")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--engine", choices=["pipeline", "compiled"], default="pipeline")
+    args = parser.parse_args()
+    print(json.dumps(run(args.payloads, args.concurrency, args.requests, args.warmup, args.engine, args.path), indent=4))
@@ -0,0 +1,64 @@
+"""
+Micro-benchmarks for each stage of POST /predict, timed in isolation on one
+applicant: pydantic validation, model-input construction, preprocessing,
+predict_proba and response serialization.
+
+    python -m benchmarks.bench_stages --iterations 2000 --engine compiled
+"""
+import argparse
+import json
+import tempfile
+from pathlib import Path
+
+from benchmarks.common import percentiles, time_calls, train_throwaway_pipeline
+from src.api.schemas import PredictionRequest, PredictionResponse
+from src.scoring.engine import CompiledScorer, export_compiled_artifacts
+from src.scoring.scorer import Scorer
+
+
+def _build_scorer(pipeline, engine: str, tmp: str):
+    if engine == "compiled":
+        spec_path, booster_path = Path(tmp) / "preprocessor_spec.json", Path(tmp) / "booster.ubj"
+        export_compiled_artifacts(pipeline, str(spec_path), str(booster_path))
+        scorer = CompiledScorer.load(str(spec_path), str(booster_path))
+    else:
+        scorer = Scorer(pipeline)
+    scorer.set_nthread(1)
+    return scorer
+
+
+def bench_stages(pipeline, payload: dict, engine: str, iterations: int) -> dict:
+    """
+    Returns latency percentiles per stage for one engine.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        scorer = _build_scorer(pipeline, engine, tmp)
+        request = PredictionRequest(**payload)
+        features = scorer.features_from_requests([request])
+        X = scorer.transform(features)
+        prob = float(scorer.predict_proba(X)[0])
+        response = PredictionResponse(default_probability=prob, is_default=int(prob >= scorer.threshold))
+
+        stages = {
+            "validate": lambda: PredictionRequest(**payload),
+            "build_input": lambda: scorer.features_from_requests([request]),
+            "transform": lambda: scorer.transform(features),
+            "predict_proba": lambda: scorer.predict_proba(X),
+            "serialize": lambda: response.model_dump_json(),
+        }
+        return {name: percentiles(time_calls(fn, iterations)) for name, fn in stages.items()}
+
+
+def run(iterations: int, engines: list[str], pipeline=None, X=None) -> dict:
+    if pipeline is None:
+        pipeline, X = train_throwaway_pipeline()
+    payload = X.iloc[0].to_dict()
+    return {engine: bench_stages(pipeline, payload, engine, iterations) for engine in engines}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--engine", dest="engines", nargs="+", default=["pipeline", "compiled"])
+    args = parser.parse_args()
+    print(json.dumps(run(args.iterations, args.engines), indent=4))
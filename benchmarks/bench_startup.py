@@ -0,0 +1,80 @@
+"""
+Cold-start breakdown: import time of the API module and model-load time per
+artifact format, each measured in a fresh interpreter.
+
+    python -m benchmarks.bench_startup --runs 5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+from benchmarks.common import train_throwaway_pipeline
+from src.scoring.engine import export_compiled_artifacts
+
+IMPORT_SNIPPET = """
+import time
+start = time.perf_counter()
+import src.api.main
+print(time.perf_counter() - start)
+"""
+
+LOAD_SNIPPET = """
+import time
+import src.api.main
+from src.scoring.scorer import load_scorer
+start = time.perf_counter()
+load_scorer("{engine}")
+print(time.perf_counter() - start)
+"""
+
+
+def _time_in_subprocess(code: str, env: dict) -> float:
+    out = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def _summary(samples: list[float]) -> dict:
+    ms = np.asarray(samples) * 1000
+    return {"median_ms": float(np.median(ms)), "min_ms": float(ms.min()), "max_ms": float(ms.max())}
+
+
+def run(runs: int) -> dict:
+    pipeline, _ = train_throwaway_pipeline()
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = Path(tmp) / "model.pkl"
+        spec_path, booster_path = Path(tmp) / "preprocessor_spec.json", Path(tmp) / "booster.ubj"
+        joblib.dump(pipeline, model_path)
+        export_compiled_artifacts(pipeline, str(spec_path), str(booster_path))
+        env = {
+            **os.environ,
+            "PYTHONPATH": os.getcwd(),
+            "MODEL_PATH": str(model_path),
+            "PREPROCESSOR_SPEC_PATH": str(spec_path),
+            "BOOSTER_PATH": str(booster_path),
+        }
+
+        return {
+            "import_src_api_main": _summary([_time_in_subprocess(IMPORT_SNIPPET, env) for _ in range(runs)]),
+            "model_load": {
+                engine: _summary([_time_in_subprocess(LOAD_SNIPPET.format(engine=engine), env) for _ in range(runs)])
+                for engine in ("pipeline", "compiled")
+            },
+            "artifact_bytes": {
+                "pipeline": model_path.stat().st_size,
+                "compiled": spec_path.stat().st_size + booster_path.stat().st_size,
+            },
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps(run(args.runs), indent=4))
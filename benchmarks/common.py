@@ -0,0 +1,89 @@
+import json
+import time
+
+import numpy as np
+import xgboost as xgb
+from sklearn.pipeline import Pipeline
+
+from src.training.mock_data import generate_synthetic_data
+from src.training.preprocess import get_preprocessor, split_features_target
+
+
+def train_throwaway_pipeline(n_rows: int = 5000, n_estimators: int = 300):
+    """
+    Trains a champion-shaped pipeline on synthetic data so benchmarks run offline.
+    Returns (pipeline, feature frame).
+    """
+    df = generate_synthetic_data(n_rows=n_rows)
+    X, y = split_features_target(df)
+    pipeline = Pipeline([
+        ('preprocessor', get_preprocessor([], X.columns.tolist())),
+        ('classifier', xgb.XGBClassifier(
+            objective='binary:logistic', n_estimators=n_estimators, max_depth=6,
+            learning_rate=0.05, random_state=42, n_jobs=1
+        ))
+    ])
+    pipeline.fit(X, y)
+    return pipeline, X
+
+
+def load_payloads(path: str) -> list[dict]:
+    """
+    Reads an NDJSON file of request bodies (blank lines ignored).
+    """
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def percentiles(samples_s: list[float]) -> dict[str, float]:
+    """
+    Summarises latency samples (seconds) as p50/p95/p99/mean in milliseconds.
+    """
+    ms = np.asarray(samples_s) * 1000
+    return {
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "mean_ms": float(ms.mean()),
+    }
+
+
+def time_calls(fn, n: int, warmup: int = 20) -> list[float]:
+    """
+    Calls `fn` n times (after a warmup) and returns each call's duration in seconds.
+    """
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def run_load(app, path: str, payloads: list[dict], concurrency: int, total: int) -> dict:
+    """
+    In-process ASGI load generator: `concurrency` clients send `total` POSTs to
+    `path`, cycling through `payloads`. Returns latency percentiles, RPS and status counts.
+    """
+    import asyncio
+    import httpx
+
+    latencies, statuses = [], {}
+    counter = iter(range(total))
+
+    async def client_loop(client):
+        for i in counter:
+            start = time.perf_counter()
+            response = await client.post(path, json=payloads[i % len(payloads)])
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return {**percentiles(latencies), "rps": total / elapsed, "status_counts": statuses}
@@ -0,0 +1,106 @@
+"""
+Runs the stage micro-benchmarks and the load test, then compares the results
+with a stored baseline and exits non-zero on a regression.
+
+    python -m benchmarks.regression --update-baseline      # record a baseline on this machine
+    python -m benchmarks.regression --tolerance 0.2        # fail if anything is >20% worse
+
+Latency metrics (`*_ms`) regress when they grow, throughput (`rps`) when it
+shrinks. Baselines are machine-specific: record and compare on the same host.
+"""
+import argparse
+import json
+import os
+import sys
+
+from benchmarks import bench_load, bench_stages
+from benchmarks.common import train_throwaway_pipeline
+
+DEFAULT_BASELINE = os.path.join("benchmarks", "baseline.json")
+
+# p99 over a few thousand samples is too noisy to gate on
+COMPARED_SUFFIXES = ("p50_ms", "p95_ms", "rps")
+# Stages faster than this are dominated by timer and scheduler noise
+MIN_COMPARED_MS = 0.05
+
+
+def flatten(results: dict, prefix: str = "") -> dict[str, float]:
+    """
+    Flattens nested results to {"a.b.p50_ms": value} for numeric leaves.
+    """
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = float(value)
+    return flat
+
+
+def compare(current: dict, baseline: dict, tolerance: float = 0.2) -> list[dict]:
+    """
+    Returns one row per metric present in both runs, with the relative change
+    (positive = worse) and whether it exceeds `tolerance`.
+    """
+    cur, base = flatten(current), flatten(baseline)
+    rows = []
+    for name in sorted(cur.keys() & base.keys()):
+        if not name.endswith(COMPARED_SUFFIXES) or base[name] <= 0:
+            continue
+        if name.endswith("_ms") and base[name] < MIN_COMPARED_MS:
+            continue
+        change = (cur[name] - base[name]) / base[name]
+        if name.endswith("rps"):
+            change = -change
+        rows.append({"metric": name, "baseline": base[name], "current": cur[name],
+                     "change": change, "regressed": change > tolerance})
+    return rows
+
+
+def run_suite(iterations: int, concurrency: int, total: int) -> dict:
+    pipeline, X = train_throwaway_pipeline()
+    return {
+        "stages": bench_stages.run(iterations, ["pipeline", "compiled"], pipeline, X),
+        "load": {
+            engine: bench_load.run(None, concurrency, total, engine=engine, pipeline=pipeline, X=X)
+            for engine in ("pipeline", "compiled")
+        },
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="Write this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative slowdown (0.2 = 20%%)")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--output", default=None, help="Also write this run's results here")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.iterations, args.concurrency, args.requests)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4)
+
+    if args.update_baseline or not os.path.exists(args.baseline):
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=4)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    rows = compare(results, baseline, args.tolerance)
+    for row in rows:
+        flag = "REGRESSION" if row["regressed"] else "ok"
+        print(f"{row['metric']:<55} {row['baseline']:>12.3f} {row['current']:>12.3f} {row['change']:>+8.1%}  {flag}")
+    regressions = [row for row in rows if row["regressed"]]
+    print(f"{len(regressions)} regression(s) out of {len(rows)} compared metrics (tolerance {args.tolerance:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
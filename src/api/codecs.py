@@ -0,0 +1,140 @@
+"""
+Response encodings for the scoring endpoints, chosen from the Accept header.
+
+- application/json (default): /predict uses pydantic's Rust serializer; batch
+  bodies are built as plain dicts and dumped with orjson, with no per-row models.
+- application/msgpack: the same structure as JSON, in MessagePack.
+- application/vnd.apache.arrow.stream (batch only): one Arrow IPC record batch
+  with one row per input row and columns index / default_probability /
+  is_default / errors (+ shap_values / top_features when explaining).
+  n_success / n_failed are stored in the schema metadata.
+- application/vnd.apache.arrow.file (batch only): the same table in the Arrow
+  IPC file format (footer, random access).
+
+msgpack and pyarrow are imported only when their format is requested.
+"""
+import numpy as np
+import orjson
+
+from src.api.schemas import PredictionResponse
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+ARROW = "application/vnd.apache.arrow.stream"
+ARROW_FILE = "application/vnd.apache.arrow.file"
+# Aliases seen in the wild, mapped to the canonical type
+MEDIA_TYPE_ALIASES = {
+    "application/x-msgpack": MSGPACK,
+    "application/vnd.msgpack": MSGPACK,
+}
+PREDICT_MEDIA_TYPES = (JSON, MSGPACK)
+BATCH_MEDIA_TYPES = (JSON, MSGPACK, ARROW, ARROW_FILE)
+
+
+class NotAcceptable(ValueError):
+    """Raised when none of the media types in the Accept header can be produced."""
+
+
+def canonical_media_type(content_type: str) -> str:
+    media_type = content_type.split(";")[0].strip().lower()
+    return MEDIA_TYPE_ALIASES.get(media_type, media_type)
+
+
+def negotiate(accept: str, supported: tuple[str, ...]) -> str:
+    """
+    Picks the supported media type with the highest q-value in `accept`
+    (ties keep header order). Missing header or wildcards mean JSON.
+    """
+    if not accept.strip():
+        return JSON
+    candidates = []
+    for position, part in enumerate(accept.split(",")):
+        media_type, *params = part.split(";")
+        q = 1.0
+        for param in params:
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        candidates.append((-q, position, canonical_media_type(media_type)))
+    for neg_q, _, media_type in sorted(candidates):
+        if neg_q >= 0:
+            break
+        if media_type in ("*/*", "application/*"):
+            return JSON
+        if media_type in supported:
+            return media_type
+    raise NotAcceptable(f"Supported response types: {', '.join(supported)}")
+
+
+def encode_prediction(response: PredictionResponse, media_type: str = JSON) -> bytes:
+    if media_type == MSGPACK:
+        import msgpack
+        return msgpack.packb(response.model_dump())
+    return response.model_dump_json().encode()
+
+
+def encode_batch(n_rows: int, positions: np.ndarray, probabilities: np.ndarray, labels: np.ndarray,
+                 explanations: list | None, row_errors: dict[int, list[str]], media_type: str = JSON) -> bytes:
+    """
+    Serializes a batch result given as arrays: `positions` are the input rows
+    that were scored, with their `probabilities`, `labels` and (optionally)
+    per-row (shap_values, top_features). Every other row is reported through
+    `row_errors`.
+    """
+    if media_type in (ARROW, ARROW_FILE):
+        return _encode_batch_arrow(n_rows, positions, probabilities, labels, explanations, row_errors,
+                                   file_format=media_type == ARROW_FILE)
+
+    predictions = [None] * n_rows
+    explanations = explanations or [(None, None)] * len(positions)
+    for pos, prob, label, (shap_dict, top_feats) in zip(positions.tolist(), probabilities.tolist(),
+                                                         labels.tolist(), explanations):
+        predictions[pos] = {"default_probability": prob, "is_default": int(label),
+                            "shap_values": shap_dict, "top_features": top_feats}
+    body = {
+        "n_success": len(positions),
+        "n_failed": len(row_errors),
+        "results": [
+            {"index": pos, "prediction": predictions[pos], "errors": row_errors.get(pos)}
+            for pos in range(n_rows)
+        ],
+    }
+    if media_type == MSGPACK:
+        import msgpack
+        return msgpack.packb(body)
+    return orjson.dumps(body)
+
+
+def _encode_batch_arrow(n_rows, positions, probabilities, labels, explanations, row_errors,
+                        file_format: bool = False) -> bytes:
+    import pyarrow as pa
+
+    scored = np.zeros(n_rows, dtype=bool)
+    scored[positions] = True
+    prob_column = np.zeros(n_rows)
+    prob_column[positions] = probabilities
+    label_column = np.zeros(n_rows, dtype=np.int8)
+    label_column[positions] = labels
+    columns = {
+        "index": pa.array(np.arange(n_rows, dtype=np.int64)),
+        "default_probability": pa.array(prob_column, mask=~scored),
+        "is_default": pa.array(label_column, mask=~scored),
+        "errors": pa.array([row_errors.get(pos) for pos in range(n_rows)], type=pa.list_(pa.string())),
+    }
+    if explanations:
+        shap_values, top_features = [None] * n_rows, [None] * n_rows
+        for pos, (shap_dict, top_feats) in zip(positions.tolist(), explanations):
+            shap_values[pos], top_features[pos] = list(shap_dict.items()), top_feats
+        columns["shap_values"] = pa.array(shap_values, type=pa.map_(pa.string(), pa.float64()))
+        columns["top_features"] = pa.array(top_features, type=pa.list_(pa.string()))
+    table = pa.table(columns).replace_schema_metadata(
+        {"n_success": str(len(positions)), "n_failed": str(len(row_errors))}
+    )
+    sink = pa.BufferOutputStream()
+    new_writer = pa.ipc.new_file if file_format else pa.ipc.new_stream
+    with new_writer(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
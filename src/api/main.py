@@ -1,16 +1,38 @@
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
 from contextlib import asynccontextmanager
 from mangum import Mangum
-import joblib
-import pandas as pd
 import numpy as np
 import logging
+import os
+import secrets
 import time
 import uuid
 
-from src.api.schemas import PredictionRequest, PredictionResponse, HealthCheck
+from src.api.schemas import (
+    FEATURE_COLUMNS, PredictionRequest, PredictionResponse, HealthCheck,
+    BatchPredictionResponse, ModelLoadRequest, ShadowRequest,
+    AccountRequest, AccountBatchRequest, AccountUpsertRequest
+)
+from src.api.codecs import BATCH_MEDIA_TYPES, PREDICT_MEDIA_TYPES, NotAcceptable, encode_prediction, negotiate
+from src.api.payloads import decode_batch_payload, decode_prediction_request, PayloadError, UnsupportedMediaType
+from starlette.concurrency import run_in_threadpool
+from src.scoring.batcher import MicroBatcher
+from src.scoring.cache import PredictionCache, build_cache_backend
+from src.scoring.executor import InferenceExecutor, Overloaded
+from src.scoring.feature_store import FeatureStore, StoreReplaced
+from src.scoring.service import score_account_row, score_account_rows, score_batch, score_requests
+from src.scoring.registry import ModelFileWatcher, ModelRegistry, ShadowRunner, watched_artifact_path
+from src.monitoring.audit import AuditQueueFull, AuditSink
+from src.monitoring.drift import DriftMonitor, load_reference, reference_path
 from src.utils.config import settings
-from src.explainability.shap_utils import get_feature_names
+from src.utils.timing import StageTimer
+from src.utils.access_log import AccessLog
+from src.utils.metrics import (
+    REGISTRY, REQUESTS_TOTAL, REQUEST_ERRORS_TOTAL, REQUEST_DURATION, IN_FLIGHT, MODEL_INFO,
+    Counter, Gauge, observe_stages
+)
 
 # Logging setup
 logging.basicConfig(level=logging.INFO)
@@ -19,98 +41,582 @@ logger = logging.getLogger("api")
 # Global variables for model
 models = {}
 
+access_log = AccessLog("api.access", settings.ACCESS_LOG_SAMPLE_RATE, settings.ACCESS_LOG_ASYNC)
+
+def get_scorer():
+    """
+    The registry's active model; raises 503 until one is loaded.
+    """
+    registry = models.get('registry')
+    scorer = registry.active if registry is not None else None
+    if scorer is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+    return scorer
+
+def start_drift_monitor(registry: ModelRegistry):
+    """
+    Starts the drift monitor against the active model's reference histograms
+    and switches reference whenever another version is activated.
+    """
+    def path_for(version):
+        model_dirs = {entry["version"]: entry["model_dir"] for entry in registry.describe()["versions"]}
+        return reference_path(model_dirs.get(version))
+
+    path = path_for(registry.active_version)
+    if not os.path.exists(path):
+        logger.warning(f"Drift monitoring disabled: no reference at {path}")
+        return
+    monitor = DriftMonitor(
+        load_reference(path), settings.DRIFT_WINDOW_SECONDS, settings.DRIFT_BUCKETS,
+        settings.DRIFT_FLUSH_INTERVAL_SECONDS, settings.DRIFT_MAX_BUFFERED_ROWS,
+    )
+
+    def on_activate(previous, current):
+        path = path_for(current)
+        if os.path.exists(path):
+            monitor.set_reference(load_reference(path))
+        else:
+            logger.warning(f"No drift reference for model version {current}; keeping the previous one")
+
+    registry.add_listener(on_activate)
+    monitor.start()
+    models['drift'] = monitor
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    access_log.start()
+    registry = ModelRegistry(settings.MODEL_REGISTRY_MAX_VERSIONS)
+    models['registry'] = registry
     # Load model on startup
     try:
         logger.info("Loading model artifacts...")
-        pipeline = joblib.load(settings.MODEL_PATH)
-        models['pipeline'] = pipeline
+        registry.load(settings.MODEL_VERSION)
+        registry.activate(settings.MODEL_VERSION)
         logger.info("Model loaded successfully.")
     except Exception as e:
         logger.error(f"Failed to load model: {e}")
         # We don't crash here to allow health check to pass, but predict will fail
+    if settings.CACHE_ENABLED:
+        cache = PredictionCache(build_cache_backend())
+        registry.add_listener(lambda previous, current: cache.invalidate())
+        models['cache'] = cache
+    models['shadow'] = ShadowRunner(registry, settings.SHADOW_MAX_PENDING)
+    if settings.DRIFT_ENABLED:
+        start_drift_monitor(registry)
+    if settings.FEATURE_STORE_ENABLED:
+        try:
+            models['feature_store'] = FeatureStore(settings.FEATURE_STORE_DIR)
+        except Exception as e:
+            logger.warning(f"Feature store disabled: cannot open {settings.FEATURE_STORE_DIR}: {e}")
+    if settings.AUDIT_ENABLED:
+        audit = AuditSink.from_settings()
+        audit.start()
+        models['audit'] = audit
+    if settings.MODEL_WATCH_ENABLED:
+        watcher = ModelFileWatcher(registry, watched_artifact_path(), settings.MODEL_WATCH_INTERVAL_SECONDS)
+        watcher.start()
+        models['watcher'] = watcher
+    executor = InferenceExecutor(settings.INFERENCE_BACKEND, settings.INFERENCE_WORKERS, settings.INFERENCE_MAX_PENDING)
+    executor.start()
+    models['executor'] = executor
+    if settings.BATCHING_ENABLED:
+        batcher = MicroBatcher(
+            score_requests, settings.BATCH_MAX_SIZE, settings.BATCH_MAX_WAIT_MS,
+            max_queue=settings.INFERENCE_MAX_PENDING,
+            runner=lambda fn, items: executor.run(fn, get_scorer(), items),
+        )
+        await batcher.start()
+        models['batcher'] = batcher
     yield
     # Clean up resources if needed
+    if 'batcher' in models:
+        await models['batcher'].stop()
+    if 'watcher' in models:
+        await models['watcher'].stop()
+    models['shadow'].shutdown()
+    if 'drift' in models:
+        models['drift'].shutdown()
+    # After the batcher has drained, so every served score is written before exit
+    if 'audit' in models:
+        models['audit'].shutdown()
+    executor.shutdown()
     models.clear()
+    access_log.stop()
 
 app = FastAPI(title=settings.PROJECT_NAME, version=settings.VERSION, lifespan=lifespan)
 
-# Middleware for request ID and logging
+# Middleware for request ID, metrics and (sampled, async) access logging
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
     request_id = str(uuid.uuid4())
-    start_time = time.time()
-    
-    response = await call_next(request)
-    
-    process_time = time.time() - start_time
-    logger.info(f"RID={request_id} METHOD={request.method} PATH={request.url.path} STATUS={response.status_code} LATENCY={process_time:.4f}s")
+    request.state.request_id = request_id
+    start_time = time.perf_counter()
+    request.state.start_time = start_time
+    IN_FLIGHT.inc()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+    finally:
+        IN_FLIGHT.dec()
+        process_time = time.perf_counter() - start_time
+        # Route template (e.g. /admin/models/{version}) keeps label cardinality bounded
+        route = request.scope.get("route")
+        path = route.path if route is not None else "unmatched"
+        REQUESTS_TOTAL.inc(method=request.method, path=path, status=str(status_code))
+        REQUEST_DURATION.observe(process_time, method=request.method, path=path)
+        if status_code >= 400:
+            REQUEST_ERRORS_TOTAL.inc(path=path, status=str(status_code))
+        access_log.log(
+            status_code, "RID=%s METHOD=%s PATH=%s STATUS=%d LATENCY=%.4fs",
+            request_id, request.method, request.scope["path"], status_code, process_time,
+        )
     
+    response.headers["X-Request-ID"] = request_id
     return response
 
+@app.get("/metrics")
+def metrics():
+    """
+    Prometheus text exposition of request, stage, model and queue metrics.
+    """
+    extra = []
+    registry = models.get('registry')
+    MODEL_INFO.clear()
+    if registry is not None:
+        for entry in registry.describe()["versions"]:
+            version = entry["version"]
+            role = "active" if version == registry.active_version else "shadow" if version == registry.shadow_version else "loaded"
+            MODEL_INFO.set(1 if role == "active" else 0, version=version, role=role)
+
+    if 'batcher' in models:
+        batcher = models['batcher']
+        depth = Gauge("risk_batch_queue_depth", "Requests waiting in the micro-batcher")
+        depth.set(batcher.queue_depth)
+        extra += [depth, batcher.batch_sizes]
+    if 'executor' in models:
+        stats = models['executor'].stats()
+        pending = Gauge("risk_inference_pending", "Scoring calls queued or running", ("backend",))
+        pending.set(stats["pending"], backend=stats["backend"])
+        rejected = Counter("risk_inference_rejected_total", "Calls rejected by admission control", ("backend",))
+        rejected.inc(stats["rejected_total"], backend=stats["backend"])
+        extra += [pending, rejected]
+    if 'cache' in models:
+        stats = models['cache'].stats()
+        cache_events = Counter("risk_cache_events_total", "Prediction cache events", ("event",))
+        for event in ("hits", "misses", "evictions", "expirations", "invalidations"):
+            cache_events.inc(stats[event], event=event)
+        extra.append(cache_events)
+    if 'shadow' in models:
+        stats = models['shadow'].stats()
+        shadow_rows = Counter("risk_shadow_rows_total", "Rows sent to the shadow model", ("outcome",))
+        for outcome in ("scored", "dropped", "errors"):
+            shadow_rows.inc(stats[outcome], outcome=outcome)
+        disagreement = Gauge("risk_shadow_label_disagreement_ratio", "Share of shadow labels differing from the active model")
+        disagreement.set(stats["label_disagreement_rate"])
+        extra += [shadow_rows, disagreement]
+    if 'drift' in models:
+        report = models['drift'].report()
+        drift_psi = Gauge("risk_drift_psi", "Population stability index against the training reference", ("feature",))
+        for name, column in report["columns"].items():
+            if column["psi"] is not None:
+                drift_psi.set(column["psi"], feature=name)
+        drift_rows = Counter("risk_drift_rows_total", "Rows offered to the drift monitor", ("outcome",))
+        drift_rows.inc(report["rows_recorded"], outcome="recorded")
+        drift_rows.inc(report["rows_dropped"], outcome="dropped")
+        extra += [drift_psi, drift_rows]
+    if 'audit' in models:
+        stats = models['audit'].stats()
+        audit_rows = Counter("risk_audit_rows_total", "Rows offered to the audit sink", ("outcome",))
+        for outcome in ("submitted", "written", "dropped", "rejected"):
+            audit_rows.inc(stats[outcome], outcome=outcome)
+        audit_queue = Gauge("risk_audit_queue_rows", "Rows waiting for the audit writer")
+        audit_queue.set(stats["queued_rows"])
+        extra += [audit_rows, audit_queue]
+    if 'feature_store' in models:
+        stats = models['feature_store'].stats()
+        store_accounts = Gauge("risk_feature_store_accounts", "Accounts in the feature store")
+        store_accounts.set(stats["accounts"])
+        store_lookups = Counter("risk_feature_store_lookups_total", "Feature store lookups", ("outcome",))
+        store_lookups.inc(stats["hits"], outcome="hit")
+        store_lookups.inc(stats["misses"], outcome="miss")
+        extra += [store_accounts, store_lookups]
+    return Response(content=REGISTRY.render(extra), media_type="text/plain; version=0.0.4")
+
 @app.get("/health", response_model=HealthCheck)
 def health_check():
-    status = "healthy" if 'pipeline' in models else "degraded"
-    return HealthCheck(status=status, version=settings.VERSION)
+    registry = models.get('registry')
+    active = registry.active_version if registry is not None else None
+    status = "healthy" if active is not None else "degraded"
+    return HealthCheck(status=status, version=settings.VERSION, model_version=active)
 
-@app.post("/predict", response_model=PredictionResponse)
-def predict(request: PredictionRequest):
-    if 'pipeline' not in models:
-        raise HTTPException(status_code=503, detail="Model not loaded")
-    
-    pipeline = models['pipeline']
-    
+async def prediction_request(request: Request) -> PredictionRequest:
+    """
+    Reads and validates the /predict body in one step: JSON goes straight
+    through pydantic's native parser (no intermediate dict); MessagePack with
+    Content-Type: application/msgpack. Validation errors keep FastAPI's 422 format.
+    """
+    body = await request.body()
     try:
-        # Convert request to DataFrame
-        data_dict = request.model_dump()
-        # Ensure column order matches training (though pandas handles by name usually, better safe)
-        input_df = pd.DataFrame([data_dict])
-        
-        # Predict
-        prob = pipeline.predict_proba(input_df)[:, 1][0]
-        label = int(pipeline.predict(input_df)[0])
-        
-        # Calculate SHAP values (simplified for performance)
-        # For true real-time SHAP, we might need a faster method or precomputed explainer
-        # Here we extract model and preprocessor to compute
+        return decode_prediction_request(body, request.headers.get("content-type", ""))
+    except ValidationError as e:
+        raise RequestValidationError([{**error, "loc": ("body", *error["loc"])} for error in e.errors()])
+    except UnsupportedMediaType as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    except PayloadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def response_media_type(supported: tuple[str, ...]):
+    def dependency(accept: str = Header("")) -> str:
         try:
-            model = pipeline.named_steps['classifier']
-            preprocessor = pipeline.named_steps['preprocessor']
-            transformed_data = preprocessor.transform(input_df)
-            
-            # Note: Creating TreeExplainer every time is slow. In prod, cache it.
-            # But XGBoost native predict often supports contribs
-             # If using XGBoost sklearn API:
-            if hasattr(model, "get_booster"):
-                 booster = model.get_booster()
-                 # Feature names logic is complex with sklearn pipelines
-                 # We'll just provide raw contributions mapped to feature names if possible
-                 # Or skip full SHAP for simplicity in this demo if it's too slow
-                 # Let's try a robust way:
-                 pass
-            
-            # Simple top features mock logic if full SHAP is too heavy for T2.micro
-            # Ideally: explainer = shap.TreeExplainer(model); shap_values = explainer.shap_values(transformed_data)
-            # We will return empty for now to avoid overhead crashes on free tier, or make it optional.
-            shap_dict = {} 
-            top_feats = []
+            return negotiate(accept, supported)
+        except NotAcceptable as e:
+            raise HTTPException(status_code=406, detail=str(e))
+    return dependency
 
-        except Exception as e:
-            logger.warning(f"Feature explanation failed: {e}")
-            shap_dict = {}
-            top_feats = []
-
-        return PredictionResponse(
-            default_probability=float(prob),
-            is_default=label,
-            shap_values=shap_dict,
-            top_features=top_feats
-        )
+_PREDICT_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {media_type: {"schema": PredictionRequest.model_json_schema()} for media_type in PREDICT_MEDIA_TYPES},
+    }
+}
+
+@app.post("/predict", response_model=PredictionResponse, openapi_extra=_PREDICT_OPENAPI)
+async def predict(
+    http_request: Request,
+    request: PredictionRequest = Depends(prediction_request),
+    media_type: str = Depends(response_media_type(PREDICT_MEDIA_TYPES)),
+    explain: bool = Query(False, description="Return per-feature SHAP contributions"),
+    top_k: int = Query(5, ge=1, le=100, description="Number of top features when explain=true"),
+):
+    # Body read + pydantic validation happen before the handler runs
+    validate_seconds = time.perf_counter() - http_request.state.start_time if hasattr(http_request.state, "start_time") else 0.0
+    scorer = get_scorer()
+    item = (request, top_k if explain else 0)
+    cache = models.get('cache')
+    
+    try:
+        cache_key = cache.key(request, item[1], scorer.version, scorer.threshold) if cache else None
+        cached = cache.get(cache_key) if cache else None
+        if cached is not None:
+            response, timer = cached, StageTimer()
+            timer.durations["cache_hit"] = 0.0
+        else:
+            # Single pass: preprocessor once, classifier once, label from the probability.
+            # Explanations reuse the same transformed row and the booster's native pred_contribs.
+            if 'batcher' in models:
+                response, timer = await models['batcher'].submit(item)
+            else:
+                [(response, timer)] = await models['executor'].run(score_requests, scorer, [item])
+            if cache:
+                cache.set(cache_key, response)
+            # Challenger scoring happens on its own thread, after this response is built
+            if 'shadow' in models:
+                models['shadow'].submit([request], [response.default_probability], [response.is_default])
+        if 'drift' in models:
+            models['drift'].record([request], [response.default_probability])
+        if 'audit' in models:
+            await models['audit'].submit_async(getattr(http_request.state, "request_id", None), "/predict", scorer.version,
+                                               [request], [response.default_probability], [response.is_default])
+
+        with timer.stage("serialize"):
+            body = encode_prediction(response, media_type)
+        timer.durations["validate"] = validate_seconds
+        observe_stages(timer.durations, scorer.version)
+        return Response(content=body, media_type=media_type, headers={"Server-Timing": timer.server_timing()})
         
+    except (Overloaded, AuditQueueFull) as e:
+        raise HTTPException(status_code=settings.OVERLOAD_STATUS_CODE, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         logger.error(f"Prediction error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/batcher/stats")
+def batcher_stats():
+    """
+    Queue depth and batch-size histogram of the micro-batcher (if enabled).
+    """
+    if 'batcher' not in models:
+        return {"enabled": False}
+    return {"enabled": True, **models['batcher'].stats()}
+
+@app.get("/cache/stats")
+def cache_stats():
+    """
+    Hit/miss/eviction counters of the prediction cache (if enabled).
+    """
+    if 'cache' not in models:
+        return {"enabled": False}
+    return {"enabled": True, **models['cache'].stats()}
+
+@app.get("/drift")
+def drift_report(window_seconds: float | None = Query(None, gt=0, description="Window to compare (default: DRIFT_WINDOW_SECONDS)")):
+    """
+    PSI and KS of each input feature and the score over the recent window, against the training reference.
+    """
+    if 'drift' not in models:
+        raise HTTPException(status_code=503, detail="Drift monitoring is not enabled")
+    if window_seconds is not None and window_seconds > models['drift'].window_seconds:
+        raise HTTPException(status_code=422,
+                            detail=f"window_seconds exceeds DRIFT_WINDOW_SECONDS={models['drift'].window_seconds:g}")
+    return models['drift'].report(window_seconds)
+
+@app.get("/audit/stats")
+def audit_stats():
+    """
+    Queue depth and submitted/written/dropped/uploaded counters of the audit sink (if enabled).
+    """
+    if 'audit' not in models:
+        return {"enabled": False}
+    return {"enabled": True, **models['audit'].stats()}
+
+@app.get("/executor/stats")
+def executor_stats():
+    """
+    Backend, pending calls and admission-control rejections of the inference executor.
+    """
+    if 'executor' not in models:
+        return {"backend": None}
+    return models['executor'].stats()
+
+@app.post("/predict/batch", response_model=BatchPredictionResponse)
+async def predict_batch(
+    request: Request,
+    media_type: str = Depends(response_media_type(BATCH_MEDIA_TYPES)),
+    explain: bool = Query(False, description="Return per-feature SHAP contributions"),
+    top_k: int = Query(5, ge=1, le=100, description="Number of top features when explain=true"),
+):
+    """
+    Scores many applicants in one call. Accepts a JSON list, {"instances": [...]},
+    columnar {"columns": {...}}, NDJSON (Content-Type: application/x-ndjson), the
+    same layouts in MessagePack (application/msgpack) or an Arrow IPC stream
+    (application/vnd.apache.arrow.stream). The response format follows Accept.
+    Invalid rows are reported individually and do not fail the batch.
+    """
+    scorer = get_scorer()
+
+    body = await request.body()
+    try:
+        raw_df, decode_errors = decode_batch_payload(body, request.headers.get("content-type", ""))
+    except UnsupportedMediaType as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    except PayloadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if len(raw_df) > settings.MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds MAX_BATCH_SIZE={settings.MAX_BATCH_SIZE}")
+
+    try:
+        # Scoring is CPU-bound; keep it off the event loop
+        body, timer, probabilities = await models['executor'].run(
+            score_batch, scorer, raw_df, decode_errors, top_k if explain else 0, media_type
+        )
+        scored = np.flatnonzero(~np.isnan(probabilities))
+        if 'drift' in models:
+            models['drift'].record(raw_df.iloc[scored], probabilities[scored])
+        if 'audit' in models:
+            await models['audit'].submit_async(getattr(request.state, "request_id", None), "/predict/batch", scorer.version,
+                                               raw_df.iloc[scored], probabilities[scored],
+                                               scorer.label(probabilities[scored]), row_indices=scored)
+        observe_stages(timer.durations, scorer.version)
+        return Response(content=body, media_type=media_type, headers={"Server-Timing": timer.server_timing()})
+    except (Overloaded, AuditQueueFull) as e:
+        raise HTTPException(status_code=settings.OVERLOAD_STATUS_CODE, detail=str(e), headers={"Retry-After": "1"})
+    except Exception as e:
+        logger.error(f"Batch prediction error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+def get_feature_store(scorer) -> FeatureStore:
+    """
+    The feature store, if its rows were transformed exactly as `scorer` transforms requests.
+    """
+    store = models.get('feature_store')
+    if store is None:
+        raise HTTPException(status_code=503, detail="Feature store is not enabled")
+    if not store.compatible(scorer):
+        raise HTTPException(
+            status_code=409,
+            detail=f"Feature store rows were built for another preprocessor than model version {scorer.version}; "
+                   "run `python -m src.scoring.feature_store refresh`",
+        )
+    return store
+
+@app.post("/predict/by-id", response_model=PredictionResponse)
+async def predict_by_id(
+    http_request: Request,
+    body: AccountRequest,
+    media_type: str = Depends(response_media_type(PREDICT_MEDIA_TYPES)),
+    explain: bool = Query(False, description="Return per-feature SHAP contributions"),
+    top_k: int = Query(5, ge=1, le=100, description="Number of top features when explain=true"),
+):
+    """
+    Scores a stored account: its preprocessed row is read from the
+    memory-mapped feature store without copying and goes straight to the model.
+    """
+    scorer = get_scorer()
+    store = get_feature_store(scorer)
+    start = time.perf_counter()
+    [row] = store.lookup([body.account_id])
+    lookup_seconds = time.perf_counter() - start
+    if row < 0:
+        raise HTTPException(status_code=404, detail=f"Unknown account {body.account_id}")
+
+    try:
+        response, timer = await models['executor'].run(score_account_row, scorer, store.view(row), top_k if explain else 0)
+        timer.durations["lookup"] = lookup_seconds
+        if 'drift' in models or 'audit' in models:
+            raw = store.raw_frame([row])
+            if 'drift' in models:
+                models['drift'].record(raw, [response.default_probability])
+            if 'audit' in models:
+                await models['audit'].submit_async(getattr(http_request.state, "request_id", None), "/predict/by-id", scorer.version,
+                                                   raw, [response.default_probability], [response.is_default])
+        with timer.stage("serialize"):
+            content = encode_prediction(response, media_type)
+        observe_stages(timer.durations, scorer.version)
+        return Response(content=content, media_type=media_type, headers={"Server-Timing": timer.server_timing()})
+    except (Overloaded, AuditQueueFull) as e:
+        raise HTTPException(status_code=settings.OVERLOAD_STATUS_CODE, detail=str(e), headers={"Retry-After": "1"})
+    except Exception as e:
+        logger.error(f"Prediction by id error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/predict/by-id/batch", response_model=BatchPredictionResponse)
+async def predict_by_id_batch(
+    request: Request,
+    body: AccountBatchRequest,
+    media_type: str = Depends(response_media_type(BATCH_MEDIA_TYPES)),
+    explain: bool = Query(False, description="Return per-feature SHAP contributions"),
+    top_k: int = Query(5, ge=1, le=100, description="Number of top features when explain=true"),
+):
+    """
+    Scores many stored accounts in one call. Unknown account IDs are reported
+    individually and do not fail the batch.
+    """
+    scorer = get_scorer()
+    store = get_feature_store(scorer)
+    n_rows = len(body.account_ids)
+    if n_rows > settings.MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds MAX_BATCH_SIZE={settings.MAX_BATCH_SIZE}")
+
+    start = time.perf_counter()
+    rows = store.lookup(body.account_ids)
+    positions = np.flatnonzero(rows >= 0)
+    row_errors = {int(pos): ["account_id: unknown account"] for pos in np.flatnonzero(rows < 0)}
+    X = store.features(rows[positions])
+    lookup_seconds = time.perf_counter() - start
+
+    try:
+        content, timer, probabilities = await models['executor'].run(
+            score_account_rows, scorer, X, n_rows, positions, row_errors, top_k if explain else 0, media_type
+        )
+        timer.durations["lookup"] = lookup_seconds
+        if 'drift' in models or 'audit' in models:
+            raw = store.raw_frame(rows[positions])
+            if 'drift' in models:
+                models['drift'].record(raw, probabilities[positions])
+            if 'audit' in models:
+                await models['audit'].submit_async(getattr(request.state, "request_id", None), "/predict/by-id/batch", scorer.version,
+                                                   raw, probabilities[positions], scorer.label(probabilities[positions]),
+                                                   row_indices=positions)
+        observe_stages(timer.durations, scorer.version)
+        return Response(content=content, media_type=media_type, headers={"Server-Timing": timer.server_timing()})
+    except (Overloaded, AuditQueueFull) as e:
+        raise HTTPException(status_code=settings.OVERLOAD_STATUS_CODE, detail=str(e), headers={"Retry-After": "1"})
+    except Exception as e:
+        logger.error(f"Batch prediction by id error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/feature-store/stats")
+def feature_store_stats():
+    """
+    Size, lookup hit/miss and upsert counters of the feature store (if enabled).
+    """
+    if 'feature_store' not in models:
+        return {"enabled": False}
+    store = models['feature_store']
+    registry = models.get('registry')
+    active = registry.active if registry is not None else None
+    return {"enabled": True, **store.stats(), "compatible_with_active": active is not None and store.compatible(active)}
+
+def require_admin(x_admin_token: str = Header("")):
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin API disabled (ADMIN_TOKEN not set)")
+    if not secrets.compare_digest(x_admin_token, settings.ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+@app.get("/admin/models", dependencies=[Depends(require_admin)])
+def list_models():
+    return {**models['registry'].describe(), "shadow_stats": models['shadow'].stats()}
+
+@app.post("/admin/models/load", dependencies=[Depends(require_admin)])
+async def load_model(body: ModelLoadRequest):
+    """
+    Loads and pre-warms a model version off the event loop; optionally activates it.
+    """
+    registry = models['registry']
+    model_dir = body.model_dir or os.path.join(settings.MODEL_REGISTRY_DIR, body.version)
+    try:
+        await run_in_threadpool(registry.load, body.version, body.engine, model_dir)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Failed to load {body.version}: {e}")
+    if body.activate:
+        registry.activate(body.version)
+    return registry.describe()
+
+@app.post("/admin/models/{version}/activate", dependencies=[Depends(require_admin)])
+def activate_model(version: str):
+    try:
+        models['registry'].activate(version)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return models['registry'].describe()
+
+@app.post("/admin/models/shadow", dependencies=[Depends(require_admin)])
+def set_shadow_model(body: ShadowRequest):
+    try:
+        models['registry'].set_shadow(body.version)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return models['registry'].describe()
+
+@app.delete("/admin/models/{version}", dependencies=[Depends(require_admin)])
+def remove_model(version: str):
+    try:
+        models['registry'].remove(version)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return models['registry'].describe()
+
+@app.post("/admin/feature-store/upsert", dependencies=[Depends(require_admin)])
+async def upsert_accounts(body: AccountUpsertRequest):
+    """
+    Inserts new accounts or replaces the features of changed ones; scoring sees them immediately.
+    """
+    store = models.get('feature_store')
+    if store is None:
+        raise HTTPException(status_code=503, detail="Feature store is not enabled")
+    ids = [account.account_id for account in body.accounts]
+    raw = [[getattr(account, c) for c in FEATURE_COLUMNS] for account in body.accounts]
+    try:
+        result = await run_in_threadpool(store.upsert, ids, raw)
+    except StoreReplaced as e:
+        raise HTTPException(status_code=409, detail=f"{e}: POST /admin/feature-store/reload first")
+    return {**result, "accounts": store.n_accounts}
+
+@app.post("/admin/feature-store/reload", dependencies=[Depends(require_admin)])
+async def reload_feature_store():
+    """
+    Reopens FEATURE_STORE_DIR, e.g. after an offline build or refresh.
+    """
+    try:
+        store = await run_in_threadpool(FeatureStore, settings.FEATURE_STORE_DIR)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Failed to open feature store: {e}")
+    models['feature_store'] = store
+    return store.stats()
+
 # Handler for AWS Lambda
 handler = Mangum(app, lifespan="on")
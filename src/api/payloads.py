@@ -0,0 +1,137 @@
+from typing import Any
+
+import orjson
+import pandas as pd
+
+from src.api.codecs import ARROW, ARROW_FILE, MSGPACK, canonical_media_type
+from src.api.schemas import PredictionRequest
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonlines")
+
+
+class PayloadError(ValueError):
+    """Raised when a batch payload cannot be decoded at all (as opposed to a bad row)."""
+
+
+class UnsupportedMediaType(PayloadError):
+    """Raised when the Content-Type needs an encoding library that is not installed."""
+
+
+def _rows_to_frame(rows: list[Any], errors: dict[int, list[str]]) -> pd.DataFrame:
+    # Non-object rows are kept as empty placeholders so row positions stay aligned
+    records = []
+    for pos, row in enumerate(rows):
+        if isinstance(row, dict):
+            records.append(row)
+        else:
+            errors.setdefault(pos, []).append("row must be a JSON object")
+            records.append({})
+    if not records:
+        # from_records cannot build an explicit index for zero rows
+        return pd.DataFrame(index=range(0))
+    return pd.DataFrame.from_records(records, index=range(len(records)))
+
+
+def decode_json(body: bytes) -> tuple[pd.DataFrame, dict[int, list[str]]]:
+    """
+    Accepts either a list of applicants, {"instances": [...]}, or the columnar
+    form {"columns": {"limit_bal": [...], ...}}.
+    """
+    try:
+        payload = orjson.loads(body)
+    except ValueError as e:
+        raise PayloadError(f"Invalid JSON body: {e}")
+    return _decode_object(payload)
+
+
+def decode_msgpack(body: bytes) -> tuple[pd.DataFrame, dict[int, list[str]]]:
+    """
+    Same layouts as decode_json, MessagePack-encoded.
+    """
+    return _decode_object(_unpack_msgpack(body))
+
+
+def decode_arrow(body: bytes) -> tuple[pd.DataFrame, dict[int, list[str]]]:
+    """
+    An Arrow IPC stream (or file) with one column per feature. Columns are
+    converted to pandas directly, without building per-row Python objects.
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise UnsupportedMediaType("Arrow payloads require pyarrow (pip install pyarrow)")
+    try:
+        reader = pa.ipc.open_stream(body) if not body.startswith(b"ARROW1") else pa.ipc.open_file(body)
+        table = reader.read_all()
+    except (pa.ArrowInvalid, OSError) as e:
+        raise PayloadError(f"Invalid Arrow IPC body: {e}")
+    return table.to_pandas(), {}
+
+
+def _unpack_msgpack(body: bytes) -> Any:
+    try:
+        import msgpack
+    except ImportError:
+        raise UnsupportedMediaType("MessagePack payloads require msgpack (pip install msgpack)")
+    try:
+        return msgpack.unpackb(body)
+    except (ValueError, msgpack.UnpackException) as e:
+        raise PayloadError(f"Invalid MessagePack body: {e}")
+
+
+def _decode_object(payload: Any) -> tuple[pd.DataFrame, dict[int, list[str]]]:
+    errors: dict[int, list[str]] = {}
+    if isinstance(payload, list):
+        return _rows_to_frame(payload, errors), errors
+    if isinstance(payload, dict) and isinstance(payload.get("instances"), list):
+        return _rows_to_frame(payload["instances"], errors), errors
+    if isinstance(payload, dict) and isinstance(payload.get("columns"), dict):
+        columns = payload["columns"]
+        lengths = {len(v) for v in columns.values() if isinstance(v, list)}
+        if len(lengths) != 1 or not all(isinstance(v, list) for v in columns.values()):
+            raise PayloadError("Columnar payload must map every feature to a list of equal length")
+        return pd.DataFrame(columns), errors
+
+    raise PayloadError("Expected a list of applicants, {'instances': [...]} or {'columns': {...}}")
+
+
+def decode_ndjson(body: bytes) -> tuple[pd.DataFrame, dict[int, list[str]]]:
+    """
+    One applicant per line. Malformed lines become per-row errors.
+    """
+    errors: dict[int, list[str]] = {}
+    rows = []
+    for line in body.splitlines():
+        if not line.strip():
+            continue
+        try:
+            rows.append(orjson.loads(line))
+        except ValueError as e:
+            errors[len(rows)] = [f"invalid JSON: {e}"]
+            rows.append({})
+    return _rows_to_frame(rows, errors), errors
+
+
+def decode_batch_payload(body: bytes, content_type: str) -> tuple[pd.DataFrame, dict[int, list[str]]]:
+    """
+    Decodes a batch body into a raw (unvalidated) frame, one row per input item,
+    plus any row-level decoding errors keyed by row position.
+    """
+    media_type = canonical_media_type(content_type)
+    if media_type in NDJSON_CONTENT_TYPES:
+        return decode_ndjson(body)
+    if media_type == MSGPACK:
+        return decode_msgpack(body)
+    if media_type in (ARROW, ARROW_FILE):
+        return decode_arrow(body)
+    return decode_json(body)
+
+
+def decode_prediction_request(body: bytes, content_type: str) -> PredictionRequest:
+    """
+    Parses and validates a single /predict body in one step (JSON through
+    pydantic's native parser, or MessagePack). Raises pydantic.ValidationError.
+    """
+    if canonical_media_type(content_type) == MSGPACK:
+        return PredictionRequest.model_validate(_unpack_msgpack(body))
+    return PredictionRequest.model_validate_json(body)
@@ -1,5 +1,7 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, conint
 from typing import List, Dict, Optional, Any
+import numpy as np
+import pandas as pd
 
 class PredictionRequest(BaseModel):
     limit_bal: float = Field(..., description="Amount of given credit in NT dollars")
@@ -32,6 +34,90 @@ class PredictionResponse(BaseModel):
     shap_values: Optional[Dict[str, float]] = None
     top_features: Optional[List[str]] = None
     
+class BatchPredictionItem(BaseModel):
+    index: int
+    prediction: Optional[PredictionResponse] = None
+    errors: Optional[List[str]] = None
+
+class BatchPredictionResponse(BaseModel):
+    n_success: int
+    n_failed: int
+    results: List[BatchPredictionItem]
+
 class HealthCheck(BaseModel):
+    model_config = ConfigDict(protected_namespaces=())
+
     status: str
     version: str
+    model_version: Optional[str] = None
+
+class ModelLoadRequest(BaseModel):
+    model_config = ConfigDict(protected_namespaces=())
+
+    version: str = Field(..., description="Label for the new model version")
+    model_dir: Optional[str] = Field(None, description="Directory with the version's artifacts (default: MODEL_REGISTRY_DIR/<version>)")
+    engine: Optional[str] = Field(None, description="'pipeline' or 'compiled' (default: INFERENCE_ENGINE)")
+    activate: bool = Field(False, description="Swap to this version once it is loaded and warmed up")
+
+class ShadowRequest(BaseModel):
+    version: Optional[str] = Field(None, description="Version to shadow-score, or null to disable")
+
+# Feature store keys are non-negative int64
+AccountId = conint(ge=0, lt=2**63)
+
+class AccountRequest(BaseModel):
+    account_id: AccountId = Field(..., description="Account ID in the feature store")
+
+class AccountBatchRequest(BaseModel):
+    account_ids: List[AccountId] = Field(..., description="Account IDs in the feature store")
+
+class AccountUpsert(PredictionRequest):
+    account_id: AccountId = Field(..., description="Account ID to insert or replace")
+
+class AccountUpsertRequest(BaseModel):
+    accounts: List[AccountUpsert]
+
+# Feature order used at training time (matches the request schema)
+FEATURE_COLUMNS = list(PredictionRequest.model_fields)
+INTEGER_COLUMNS = [name for name, field in PredictionRequest.model_fields.items() if field.annotation is int]
+
+def validate_frame(df: pd.DataFrame) -> tuple[pd.DataFrame, dict[int, list[str]]]:
+    """
+    Vectorized equivalent of validating every row of `df` with PredictionRequest.
+    Returns the valid rows (in FEATURE_COLUMNS order, positional index preserved)
+    and a mapping of row position -> error messages for the rejected rows.
+    """
+    n_rows = len(df)
+    errors: dict[int, list[str]] = {}
+    columns = {}
+
+    for col in FEATURE_COLUMNS:
+        if col in df.columns:
+            raw = df[col]
+            missing = raw.isna().to_numpy()
+            values = pd.to_numeric(raw, errors='coerce').to_numpy(dtype=np.float64)
+        else:
+            missing = np.ones(n_rows, dtype=bool)
+            values = np.full(n_rows, np.nan)
+
+        for pos in np.flatnonzero(missing):
+            errors.setdefault(int(pos), []).append(f"{col}: field required")
+        for pos in np.flatnonzero(np.isnan(values) & ~missing):
+            errors.setdefault(int(pos), []).append(f"{col}: value is not a valid number")
+        if col in INTEGER_COLUMNS:
+            # Infinity and values outside int64 have no integer value (astype(int64) would make one up)
+            with np.errstate(invalid='ignore'):
+                not_integer = (np.isinf(values) | (np.abs(values) >= 2**63)
+                               | (np.isfinite(values) & (values != np.floor(values))))
+            for pos in np.flatnonzero(not_integer):
+                errors.setdefault(int(pos), []).append(f"{col}: value is not a valid integer")
+
+        columns[col] = values
+
+    valid = np.ones(n_rows, dtype=bool)
+    if errors:
+        valid[list(errors)] = False
+
+    clean = pd.DataFrame(columns).loc[valid]
+    clean[INTEGER_COLUMNS] = clean[INTEGER_COLUMNS].astype(np.int64)
+    return clean, errors
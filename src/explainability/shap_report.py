@@ -0,0 +1,234 @@
+"""
+Global SHAP report for large datasets.
+
+    python -m src.explainability.shap_report portfolio.csv --chunk-size 20000 --workers 4
+
+Rows are explained in chunks, across worker processes when workers > 1. Each
+chunk's SHAP matrix is appended to `<output_dir>/shap_values.f32` (float32,
+row-major; shape and feature names in `shap_values.json`), so memory stays
+bounded by the chunks in flight. Global importance (mean |SHAP| and mean SHAP
+per feature) is accumulated as chunks arrive. A sample stratified by
+predicted-probability decile is kept for the summary plot.
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+from src.explainability.shap_utils import get_explainer, get_feature_names
+
+logger = logging.getLogger(__name__)
+
+# Explainer built once per worker process (or once in-process when workers == 1)
+_explainer = None
+
+
+def _init_worker(booster_raw: bytes, nthread: int):
+    import xgboost as xgb
+
+    global _explainer
+    booster = xgb.Booster()
+    booster.load_model(bytearray(booster_raw))
+    booster.set_param({"nthread": nthread})
+    _explainer = get_explainer(booster, None)
+
+
+def _explain_chunk(X: np.ndarray) -> tuple[np.ndarray, float]:
+    values = np.asarray(_explainer.shap_values(X), dtype=np.float32)
+    return values, float(np.ravel(_explainer.expected_value)[0])
+
+
+class StratifiedSample:
+    """
+    Uniform sample of at most `per_stratum` rows in each stratum, kept as the
+    rows with the smallest random keys (bottom-k sampling), so it can be
+    updated chunk by chunk without knowing the total size.
+    """
+    def __init__(self, n_strata: int, per_stratum: int, seed: int = 42):
+        self.n_strata = n_strata
+        self.per_stratum = per_stratum
+        self._rng = np.random.default_rng(seed)
+        self._keys = [np.empty(0) for _ in range(n_strata)]
+        self._rows = [np.empty(0, dtype=np.int64) for _ in range(n_strata)]
+
+    def update(self, row_ids: np.ndarray, strata: np.ndarray):
+        keys = self._rng.random(len(row_ids))
+        for s in np.unique(strata):
+            mask = strata == s
+            all_keys = np.r_[self._keys[s], keys[mask]]
+            all_rows = np.r_[self._rows[s], row_ids[mask]]
+            keep = np.argsort(all_keys, kind="stable")[: self.per_stratum]
+            self._keys[s], self._rows[s] = all_keys[keep], all_rows[keep]
+
+    def rows(self) -> np.ndarray:
+        return np.sort(np.concatenate(self._rows))
+
+
+def generate_shap_report(pipeline, chunks: Iterable[pd.DataFrame], output_dir: str = "reports",
+                         workers: int = 1, sample_size: int = 2000, n_strata: int = 10,
+                         plot: bool = True, seed: int = 42) -> dict:
+    """
+    Explains every row of `chunks` (DataFrames of raw features) with the
+    pipeline's XGBoost model and writes shap_values.f32 / shap_values.json,
+    shap_importance.json and (if `plot`) shap_summary.png to `output_dir`.
+    """
+    preprocessor = pipeline.named_steps['preprocessor']
+    booster = pipeline.named_steps['classifier'].get_booster()
+    feature_names = [str(name) for name in get_feature_names(preprocessor)]
+    os.makedirs(output_dir, exist_ok=True)
+    values_path = os.path.join(output_dir, "shap_values.f32")
+
+    pool = None
+    if workers > 1:
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(bytes(booster.save_raw("ubj")), 1),
+        )
+    else:
+        _init_worker(bytes(booster.save_raw("ubj")), os.cpu_count() or 1)
+
+    n_features = len(feature_names)
+    abs_sum = np.zeros(n_features)
+    signed_sum = np.zeros(n_features)
+    sample = StratifiedSample(n_strata, max(1, sample_size // n_strata), seed)
+    state = {"rows": 0, "expected_value": None}
+    # Raw feature rows of the current sample, gathered as chunks pass so the input is read only once
+    sampled_raw = [pd.DataFrame()]
+
+    def consume(result, raw: pd.DataFrame, start_row: int):
+        values, expected_value = result
+        with open(values_path, "ab") as f:
+            f.write(values.tobytes())
+        abs_sum[:] += np.abs(values).sum(axis=0, dtype=np.float64)
+        signed_sum[:] += values.sum(axis=0, dtype=np.float64)
+        # Margin = base value + row sum of SHAP; its probability decile is the stratum
+        prob = 1.0 / (1.0 + np.exp(-(values.sum(axis=1, dtype=np.float64) + expected_value)))
+        strata = np.minimum((prob * n_strata).astype(np.int64), n_strata - 1)
+        row_ids = np.arange(start_row, start_row + len(values))
+        sample.update(row_ids, strata)
+        current = sample.rows()
+        kept = np.isin(row_ids, current)
+        candidates = pd.concat([sampled_raw[0], raw.iloc[np.flatnonzero(kept)].set_index(row_ids[kept])])
+        sampled_raw[0] = candidates[candidates.index.isin(current)]
+        state["rows"] += len(values)
+        state["expected_value"] = expected_value
+
+    open(values_path, "wb").close()
+    start = time.perf_counter()
+    in_flight = deque()
+    next_row = 0
+    try:
+        for raw in chunks:
+            if not len(raw):
+                continue
+            X = preprocessor.transform(raw).astype(np.float32)
+            if pool is None:
+                consume(_explain_chunk(X), raw, next_row)
+            else:
+                in_flight.append((pool.submit(_explain_chunk, X), raw, next_row))
+                # Bound memory: at most two chunks per worker in flight; written in input order
+                while len(in_flight) >= workers * 2:
+                    future, pending_raw, row = in_flight.popleft()
+                    consume(future.result(), pending_raw, row)
+            next_row += len(raw)
+            logger.info(f"Explained {state['rows']:,} rows")
+        while in_flight:
+            future, pending_raw, row = in_flight.popleft()
+            consume(future.result(), pending_raw, row)
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+    elapsed = time.perf_counter() - start
+
+    n_rows = state["rows"]
+    with open(os.path.join(output_dir, "shap_values.json"), "w") as f:
+        json.dump({"shape": [n_rows, n_features], "dtype": "float32", "feature_names": feature_names,
+                   "expected_value": state["expected_value"]}, f, indent=4)
+
+    mean_abs = abs_sum / max(n_rows, 1)
+    order = np.argsort(-mean_abs)
+    summary = {
+        "rows": n_rows,
+        "seconds": elapsed,
+        "rows_per_sec": n_rows / elapsed if elapsed > 0 else 0.0,
+        "expected_value": state["expected_value"],
+        "mean_abs_shap": {feature_names[i]: float(mean_abs[i]) for i in order},
+        "mean_shap": {feature_names[i]: float(signed_sum[i] / max(n_rows, 1)) for i in order},
+        "shap_values_path": values_path,
+    }
+
+    sample_rows = sample.rows()
+    summary["sample_size"] = len(sample_rows)
+    if plot and n_rows:
+        sample_raw = sampled_raw[0].loc[sample_rows]
+        sample_values = load_shap_values(output_dir)[sample_rows]
+        summary["plot_path"] = _summary_plot(
+            np.asarray(sample_values), preprocessor.transform(sample_raw), feature_names,
+            os.path.join(output_dir, "shap_summary.png"),
+        )
+
+    with open(os.path.join(output_dir, "shap_importance.json"), "w") as f:
+        json.dump(summary, f, indent=4)
+    return summary
+
+
+def load_shap_values(output_dir: str = "reports") -> np.memmap:
+    """
+    Memory-maps the SHAP matrix written by generate_shap_report.
+    """
+    with open(os.path.join(output_dir, "shap_values.json")) as f:
+        meta = json.load(f)
+    return np.memmap(os.path.join(output_dir, "shap_values.f32"), dtype=meta["dtype"], mode="r",
+                     shape=tuple(meta["shape"]))
+
+
+def _summary_plot(values: np.ndarray, X: np.ndarray, feature_names: list[str], path: str) -> str:
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import shap
+
+    plt.figure()
+    shap.summary_plot(values, X, feature_names=feature_names, show=False)
+    plt.savefig(path, bbox_inches='tight')
+    plt.close()
+    return path
+
+
+def main(argv=None):
+    import joblib
+
+    from src.api.schemas import validate_frame
+    from src.scoring.batch import iter_chunks
+    from src.utils.config import settings
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="CSV, Parquet or NDJSON file of applicants")
+    parser.add_argument("--model-path", default=settings.MODEL_PATH)
+    parser.add_argument("--output-dir", default="reports")
+    parser.add_argument("--chunk-size", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--sample-size", type=int, default=2000, help="Rows shown in the summary plot")
+    parser.add_argument("--no-plot", action="store_true")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    # Invalid rows are skipped; feature columns only, in schema order
+    chunks = (validate_frame(raw)[0].drop(index=list(errors), errors="ignore") for raw, errors in iter_chunks(args.input, args.chunk_size))
+    summary = generate_shap_report(joblib.load(args.model_path), chunks, args.output_dir, args.workers,
+                                   args.sample_size, plot=not args.no_plot)
+    print(json.dumps({k: v for k, v in summary.items() if k != "mean_shap"}, indent=4))
+
+
+if __name__ == "__main__":
+    main()
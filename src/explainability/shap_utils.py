@@ -1,8 +1,6 @@
-import shap
-import joblib
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
+# shap and matplotlib are imported inside the functions that need them: they
+# dominate import time and the API (incl. Lambda cold starts) only needs
+# get_feature_names from this module.
 from src.utils.config import settings
 
 def get_explainer(model, X_background):
@@ -10,27 +8,21 @@ def get_explainer(model, X_background):
     Returns a SHAP TreeExplainer for the XGBoost model.
     model: The trained XGBoost model (underlying booster).
     X_background: Background dataset for SHAP (optional for TreeExplainer but good practice).
+    Without one, TreeExplainer uses the path-dependent algorithm, which needs no background data.
     """
-    return shap.TreeExplainer(model)
+    import shap
+    return shap.TreeExplainer(model, X_background)
 
-def generate_shap_plots(pipeline, X_sample):
+def generate_shap_plots(pipeline, X_sample, output_dir: str = "reports", chunk_size: int = 10000, workers: int = 1):
     """
     Generates summary plots for features.
+    Delegates to the chunked report (see shap_report.py), so large samples are
+    explained in batches instead of one shap_values call.
     """
-    model = pipeline.named_steps['classifier']
-    preprocessor = pipeline.named_steps['preprocessor']
-    
-    # Transform data to match model input
-    X_transformed = preprocessor.transform(X_sample)
-    feature_names = get_feature_names(preprocessor)
-    
-    explainer = shap.TreeExplainer(model)
-    shap_values = explainer.shap_values(X_transformed)
-    
-    plt.figure()
-    shap.summary_plot(shap_values, X_transformed, feature_names=feature_names, show=False)
-    plt.savefig('reports/shap_summary.png', bbox_inches='tight')
-    plt.close()
+    from src.explainability.shap_report import generate_shap_report
+
+    chunks = (X_sample.iloc[i:i + chunk_size] for i in range(0, len(X_sample), chunk_size))
+    return generate_shap_report(pipeline, chunks, output_dir, workers)
 
 def get_feature_names(preprocessor):
     """
@@ -40,7 +32,8 @@ def get_feature_names(preprocessor):
     
     # Check transformers
     for name, pipe, features in preprocessor.transformers_:
-        if name == 'remainder':
+        if name == 'remainder' or pipe == 'drop' or len(features) == 0:
+            # Transformers with an empty column selection are never fitted
             continue
         if hasattr(pipe, 'get_feature_names_out'):
             # Sklearn 1.0+
@@ -0,0 +1,453 @@
+"""
+Audit trail of every served score, written off the request path.
+
+Request handlers call `AuditSink.submit` with the scored inputs, outputs,
+model version and request ID. That only appends one entry to a bounded
+in-memory queue. A background thread drains the queue in batches (every
+`batch_rows` rows or `flush_interval` seconds), flattens each entry into one
+record per row and appends them to the current segment file: gzip-compressed
+NDJSON, or Parquet when pyarrow is installed. Segments rotate by size or age.
+Each closed segment is handed to an `Uploader`, which moves it to a local
+directory or S3. Segments that fail to upload stay in `directory` and are
+retried at the next rotation.
+
+When the queue is full, `policy` decides what happens:
+
+- drop_newest: the new entry is dropped and counted (default),
+- drop_oldest: the oldest queued entries are dropped to make room,
+- block: the caller waits up to `block_timeout` seconds, then drops,
+- reject: `AuditQueueFull` is raised, so no score is returned without being queued.
+
+Async request handlers use `submit_async`, which waits for room under "block"
+on a worker thread instead of the event loop.
+
+Segments are written under a `.partial` name and renamed when closed. On
+start, `.partial` segments left by a process that died are finalized and
+uploaded. NDJSON segments are flushed after every batch, so all complete
+lines are recovered. An unclosed Parquet segment has no footer and is
+unreadable; it is kept with an `.incomplete` suffix and uploaded as is.
+"""
+import gzip
+import logging
+import os
+import shutil
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import deque
+
+import numpy as np
+import orjson
+import pandas as pd
+from starlette.concurrency import run_in_threadpool
+
+from src.api.schemas import FEATURE_COLUMNS, INTEGER_COLUMNS
+from src.utils.config import settings
+
+logger = logging.getLogger(__name__)
+
+POLICIES = ("drop_newest", "drop_oldest", "block", "reject")
+
+# Fixed record schema: a segment's column types must not depend on what its first batch happened to hold
+RECORD_DTYPES = {
+    "timestamp": "float64",
+    "request_id": "string",
+    "endpoint": "string",
+    "model_version": "string",
+    "row_index": "int64",
+    **{col: "int64" if col in INTEGER_COLUMNS else "float64" for col in FEATURE_COLUMNS},
+    "default_probability": "float64",
+    "is_default": "int8",
+}
+
+
+class AuditQueueFull(RuntimeError):
+    """Raised by the "reject" policy when the audit queue has no room."""
+
+
+class Uploader(ABC):
+    """
+    Ships a closed segment somewhere durable. Must remove or move the local
+    file on success; raising leaves it in place for a later retry.
+    """
+    @abstractmethod
+    def upload(self, path: str):
+        ...
+
+
+class LocalDirectoryUploader(Uploader):
+    """
+    Moves segments into another directory (a mounted volume, or a stand-in for object storage).
+    """
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def upload(self, path: str):
+        shutil.move(path, os.path.join(self.directory, os.path.basename(path)))
+
+
+class S3Uploader(Uploader):
+    def __init__(self, bucket: str, prefix: str = ""):
+        import boto3
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.client = boto3.client("s3", region_name=settings.AWS_REGION)
+
+    def upload(self, path: str):
+        name = os.path.basename(path)
+        key = f"{self.prefix}/{name}" if self.prefix else name
+        self.client.upload_file(path, self.bucket, key)
+        os.remove(path)
+
+
+def build_uploader(uri: str | None = None) -> Uploader | None:
+    """
+    "" keeps segments in the audit directory; "s3://bucket/prefix" or a directory path (optionally file://).
+    """
+    uri = settings.AUDIT_UPLOAD_URI if uri is None else uri
+    if not uri:
+        return None
+    if uri.startswith("s3://"):
+        bucket, _, prefix = uri[len("s3://"):].partition("/")
+        return S3Uploader(bucket, prefix)
+    return LocalDirectoryUploader(uri[len("file://"):] if uri.startswith("file://") else uri)
+
+
+class _NdjsonSegment:
+    suffix = ".ndjson.gz"
+
+    def __init__(self, path: str):
+        self._file = gzip.open(path, "wb", compresslevel=6)
+        self.bytes_written = 0
+
+    def write(self, frame: pd.DataFrame):
+        lines = b"".join(orjson.dumps(record) + b"\n" for record in frame.to_dict(orient="records"))
+        self._file.write(lines)
+        # Sync flush: everything written so far is readable if the process dies before rotation
+        self._file.flush()
+        self.bytes_written += len(lines)
+
+    def close(self):
+        self._file.close()
+
+
+class _ParquetSegment:
+    suffix = ".parquet"
+
+    def __init__(self, path: str):
+        import pyarrow.parquet as pq
+        self._pq = pq
+        self._path = path
+        self._writer = None
+        self._schema = None
+        self.bytes_written = 0
+
+    def write(self, frame: pd.DataFrame):
+        import pyarrow as pa
+        if self._schema is None:
+            self._schema = pa.schema([
+                (name, pa.string() if dtype == "string" else pa.from_numpy_dtype(np.dtype(dtype)))
+                for name, dtype in RECORD_DTYPES.items()
+            ])
+            self._writer = self._pq.ParquetWriter(self._path, self._schema, compression="zstd")
+        table = pa.Table.from_pandas(frame, schema=self._schema, preserve_index=False)
+        self._writer.write_table(table)
+        self.bytes_written += table.nbytes
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def _process_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _salvage_ndjson(src: str, dst: str) -> int:
+    """
+    Rewrites the complete lines of an unclosed gzip NDJSON segment as a closed
+    one and returns how many were kept. zlib decompresses up to the last
+    flushed block and does not need the gzip trailer; a torn final block ends
+    the salvage.
+    """
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    n_lines, tail = 0, b""
+    with open(src, "rb") as f, gzip.open(dst, "wb", compresslevel=6) as out:
+        while chunk := f.read(1 << 16):
+            try:
+                data = tail + decompressor.decompress(chunk)
+            except zlib.error:
+                break
+            end = data.rfind(b"\n") + 1
+            out.write(data[:end])
+            n_lines += data.count(b"\n", 0, end)
+            tail = data[end:]
+            if decompressor.eof:
+                break
+    # A line cut off mid-write (the tail) is dropped
+    return n_lines
+
+
+class AuditSink:
+    """
+    Bounded queue + background writer. Each record holds timestamp, request_id,
+    endpoint, model_version, row_index, the 23 input features,
+    default_probability and is_default.
+    """
+    def __init__(self, directory: str = "audit", fmt: str = "ndjson", max_queue_rows: int = 100000,
+                 batch_rows: int = 1000, flush_interval: float = 1.0, rotate_bytes: int = 64 * 1024 * 1024,
+                 rotate_seconds: float = 3600.0, policy: str = "drop_newest", block_timeout: float = 0.005,
+                 uploader: Uploader | None = None):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown audit overflow policy '{policy}' (expected one of {POLICIES})")
+        if fmt not in ("ndjson", "parquet"):
+            raise ValueError(f"Unknown audit format '{fmt}'")
+        self.directory = directory
+        self.fmt = fmt
+        self.max_queue_rows = max_queue_rows
+        self.batch_rows = batch_rows
+        self.flush_interval = flush_interval
+        self.rotate_bytes = rotate_bytes
+        self.rotate_seconds = rotate_seconds
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.uploader = uploader
+        os.makedirs(directory, exist_ok=True)
+
+        self._queue: deque = deque()
+        self._queued_rows = 0
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._thread: threading.Thread | None = None
+        self._segment = None
+        self._segment_path: str | None = None
+        self._segment_opened = 0.0
+        self._sequence = 0
+        self._counts = {"submitted": 0, "dropped": 0, "rejected": 0, "written": 0,
+                        "segments": 0, "uploaded": 0, "upload_errors": 0, "write_errors": 0,
+                        "recovered_segments": 0}
+
+    @classmethod
+    def from_settings(cls) -> "AuditSink":
+        return cls(
+            settings.AUDIT_DIR, settings.AUDIT_FORMAT, settings.AUDIT_MAX_QUEUE_ROWS, settings.AUDIT_BATCH_ROWS,
+            settings.AUDIT_FLUSH_INTERVAL_SECONDS, settings.AUDIT_ROTATE_BYTES, settings.AUDIT_ROTATE_SECONDS,
+            settings.AUDIT_OVERFLOW_POLICY, settings.AUDIT_BLOCK_TIMEOUT_MS / 1000, build_uploader(),
+        )
+
+    def start(self):
+        """
+        Starts the writer thread, which first finalizes and uploads segments a crashed process left behind.
+        """
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+
+    def shutdown(self):
+        """
+        Writes everything still queued, closes the current segment and uploads it.
+        """
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        else:
+            self._drain()
+        self._rotate()
+
+    def submit(self, request_id: str | None, endpoint: str, model_version: str, features,
+               probabilities, labels, row_indices=None, wait: bool = True):
+        """
+        Queues one entry; `features` is a list of PredictionRequest or a
+        DataFrame of feature columns aligned with `probabilities` and `labels`.
+        Returns False if the entry was dropped. With `wait=False`, the "block"
+        policy returns False at once instead of waiting, and counts no drop.
+        """
+        n = len(probabilities)
+        entry = (time.time(), request_id, endpoint, model_version, features,
+                 np.asarray(probabilities, dtype=np.float64), np.asarray(labels, dtype=np.int8), row_indices)
+        with self._cond:
+            if self._queued_rows + n > self.max_queue_rows:
+                if self.policy == "block" and not wait:
+                    return False
+                if not self._make_room(n):
+                    return False
+            self._queue.append(entry)
+            self._queued_rows += n
+            self._counts["submitted"] += n
+            if self._queued_rows >= self.batch_rows:
+                self._cond.notify_all()
+        return True
+
+    async def submit_async(self, *args, **kwargs) -> bool:
+        """
+        `submit` for async handlers. Under the "block" policy, a full queue is
+        waited on in the threadpool, so only this request waits, not the event loop.
+        """
+        if self.policy != "block":
+            return self.submit(*args, **kwargs)
+        # Only a full queue needs to wait
+        if self.submit(*args, wait=False, **kwargs):
+            return True
+        return await run_in_threadpool(self.submit, *args, **kwargs)
+
+    def _make_room(self, n: int) -> bool:
+        # Called with the condition held
+        if self.policy == "drop_oldest":
+            while self._queue and self._queued_rows + n > self.max_queue_rows:
+                dropped = len(self._queue.popleft()[5])
+                self._queued_rows -= dropped
+                self._counts["dropped"] += dropped
+            return self._queued_rows + n <= self.max_queue_rows or not self._queue
+        if self.policy == "block":
+            self._cond.notify_all()
+            if self._cond.wait_for(lambda: self._queued_rows + n <= self.max_queue_rows, self.block_timeout):
+                return True
+        if self.policy == "reject":
+            self._counts["rejected"] += n
+            raise AuditQueueFull("Audit queue is full")
+        self._counts["dropped"] += n
+        return False
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {**self._counts, "queued_rows": self._queued_rows, "policy": self.policy, "format": self.fmt}
+
+    def _run(self):
+        self._recover()
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._stopping or self._queued_rows >= self.batch_rows, self.flush_interval)
+                stopping = self._stopping
+            self._drain()
+            if self._segment is not None and (self._segment.bytes_written >= self.rotate_bytes
+                                              or time.time() - self._segment_opened >= self.rotate_seconds):
+                self._rotate()
+            if stopping:
+                return
+
+    def _drain(self):
+        with self._cond:
+            entries, self._queue, self._queued_rows = list(self._queue), deque(), 0
+            # Wakes callers waiting under the "block" policy
+            self._cond.notify_all()
+        if not entries:
+            return
+        n_rows = sum(len(entry[5]) for entry in entries)
+        try:
+            frame = self._to_frame(entries)
+            if self._segment is None:
+                self._open_segment()
+            self._segment.write(frame)
+            with self._cond:
+                self._counts["written"] += len(frame)
+        except Exception as e:
+            logger.error(f"Audit write failed, {n_rows} rows lost: {e}")
+            with self._cond:
+                self._counts["write_errors"] += 1
+
+    @staticmethod
+    def _to_frame(entries) -> pd.DataFrame:
+        frames = []
+        for timestamp, request_id, endpoint, model_version, features, probs, labels, row_indices in entries:
+            if isinstance(features, pd.DataFrame):
+                # Raw batch columns may still hold numeric strings; store the validated numbers
+                frame = features.reindex(columns=FEATURE_COLUMNS).apply(pd.to_numeric, errors="coerce").reset_index(drop=True)
+            else:
+                frame = pd.DataFrame([r.model_dump() for r in features], columns=FEATURE_COLUMNS)
+            frame.insert(0, "timestamp", timestamp)
+            frame.insert(1, "request_id", request_id)
+            frame.insert(2, "endpoint", endpoint)
+            frame.insert(3, "model_version", model_version)
+            frame.insert(4, "row_index", np.arange(len(probs)) if row_indices is None else np.asarray(row_indices))
+            frame["default_probability"] = probs
+            frame["is_default"] = labels
+            frames.append(frame)
+        frame = pd.concat(frames, ignore_index=True)
+        # Strings stay plain objects (None for a missing request ID) so NDJSON can serialize them
+        return frame.astype({name: dtype for name, dtype in RECORD_DTYPES.items() if dtype != "string"})
+
+    def _open_segment(self):
+        self._sequence += 1
+        segment_cls = _ParquetSegment if self.fmt == "parquet" else _NdjsonSegment
+        name = f"audit-{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-{self._sequence:04d}{segment_cls.suffix}"
+        # Written under a .partial name; renamed once closed so readers and uploaders only see complete files
+        self._segment_path = os.path.join(self.directory, name)
+        self._segment = segment_cls(self._segment_path + ".partial")
+        self._segment_opened = time.time()
+
+    def _recover(self):
+        """
+        Finalizes `.partial` segments whose writer process is gone, then uploads them.
+        """
+        recovered = 0
+        for name in sorted(os.listdir(self.directory)):
+            # audit-<time>-<pid>-<sequence><suffix>.partial
+            if not (name.startswith("audit-") and name.endswith(".partial")):
+                continue
+            parts = name.split("-")
+            if len(parts) < 4 or not parts[2].isdigit() or _process_alive(int(parts[2])):
+                continue
+            path = os.path.join(self.directory, name)
+            final = path[:-len(".partial")]
+            try:
+                if final.endswith(_NdjsonSegment.suffix):
+                    n_lines = _salvage_ndjson(path, final + ".tmp")
+                    os.replace(final + ".tmp", final)
+                    os.remove(path)
+                    logger.warning(f"Recovered {n_lines} audit records from unclosed segment {name}")
+                else:
+                    os.replace(path, final + ".incomplete")
+                    logger.error(f"Audit segment {name} was never closed and cannot be read; kept as .incomplete")
+                recovered += 1
+            except Exception as e:
+                logger.error(f"Recovering audit segment {name} failed: {e}")
+        if recovered:
+            with self._cond:
+                self._counts["recovered_segments"] += recovered
+            self._upload_closed()
+
+    def _rotate(self):
+        if self._segment is not None:
+            self._segment.close()
+            os.replace(self._segment_path + ".partial", self._segment_path)
+            self._segment = None
+            with self._cond:
+                self._counts["segments"] += 1
+        self._upload_closed()
+
+    def _upload_closed(self):
+        if self.uploader is None:
+            return
+        # Also retries segments whose earlier upload failed
+        for name in sorted(os.listdir(self.directory)):
+            if not name.startswith("audit-") or name.endswith((".partial", ".tmp")):
+                continue
+            try:
+                self.uploader.upload(os.path.join(self.directory, name))
+                outcome = "uploaded"
+            except Exception as e:
+                logger.warning(f"Audit upload of {name} failed, will retry: {e}")
+                outcome = "upload_errors"
+            with self._cond:
+                self._counts[outcome] += 1
+
+
+def read_audit_segment(path: str) -> pd.DataFrame:
+    """
+    Loads one closed segment (either format) for inspection or tests.
+    """
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    return pd.read_json(path, lines=True, compression="gzip")
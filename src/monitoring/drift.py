@@ -0,0 +1,312 @@
+"""
+Feature and score drift monitoring with fixed-memory histograms.
+
+At training time `build_reference` bins every input feature and the score
+into at most `n_bins` quantile bins and stores the edges and reference
+counts. At serving time `DriftMonitor` counts live rows into the same bins,
+in a ring of time buckets, so memory is O(features x bins x buckets) however
+much traffic is served. Rows are buffered by the request handlers and binned
+in batches on a background thread. PSI and KS for any window up to
+DRIFT_WINDOW_SECONDS come from summing the most recent buckets.
+
+    python -m src.monitoring.drift traffic.csv --reference models/drift_reference.json
+"""
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.api.schemas import FEATURE_COLUMNS
+from src.utils.config import settings
+
+logger = logging.getLogger(__name__)
+
+SCORE_COLUMN = "default_probability"
+# Added to every bin share so empty bins do not make PSI infinite
+_PSI_EPS = 1e-4
+# Conventional PSI bands: < 0.1 stable, 0.1-0.25 moderate shift, > 0.25 significant
+PSI_WARN, PSI_DRIFT = 0.1, 0.25
+
+
+def _bin_edges(values: np.ndarray, n_bins: int) -> np.ndarray:
+    """
+    Interior bin edges: midpoints between distinct values for low-cardinality
+    features (one bin per value), quantile edges otherwise.
+    """
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return np.empty(0)
+    unique = np.unique(values)
+    if len(unique) <= n_bins:
+        return (unique[:-1] + unique[1:]) / 2
+    return np.unique(np.quantile(values, np.linspace(0, 1, n_bins + 1)[1:-1]))
+
+
+def _counts(values: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    values = values[~np.isnan(values)]
+    return np.bincount(np.searchsorted(edges, values, side="right"), minlength=len(edges) + 1)
+
+
+def build_reference(features: pd.DataFrame, scores: np.ndarray | None = None, n_bins: int = 10) -> dict:
+    """
+    Reference histograms for the FEATURE_COLUMNS of `features` and, if given, the scores.
+    """
+    columns = {name: np.asarray(features[name], dtype=np.float64) for name in FEATURE_COLUMNS if name in features}
+    if scores is not None:
+        columns[SCORE_COLUMN] = np.asarray(scores, dtype=np.float64)
+    reference = {}
+    for name, values in columns.items():
+        edges = _bin_edges(values, n_bins)
+        reference[name] = {"edges": edges.tolist(), "counts": _counts(values, edges).tolist()}
+    return reference
+
+
+def merge_reference(reference: dict, features: pd.DataFrame, scores: np.ndarray | None = None,
+                    n_bins: int = 10) -> dict:
+    """
+    Adds `features` to a reference's feature counts on its existing edges (an
+    incrementally updated model was trained on the old rows plus these). The
+    score histogram is rebuilt from `scores`, since the model changed.
+    """
+    merged = {}
+    for name, column in reference.items():
+        if name == SCORE_COLUMN:
+            continue
+        counts = np.asarray(column["counts"], dtype=np.int64)
+        if name in features:
+            counts = counts + _counts(np.asarray(features[name], dtype=np.float64), np.asarray(column["edges"]))
+        merged[name] = {"edges": column["edges"], "counts": counts.tolist()}
+    if scores is not None:
+        merged[SCORE_COLUMN] = build_reference(pd.DataFrame(), scores, n_bins)[SCORE_COLUMN]
+    return merged
+
+
+def save_reference(reference: dict, path: str | None = None) -> str:
+    path = path or settings.DRIFT_REFERENCE_PATH
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(reference, f)
+    return path
+
+
+def reference_path(model_dir: str | None = None) -> str:
+    """
+    Reference written next to a versioned model, or DRIFT_REFERENCE_PATH for the default artifacts.
+    """
+    if model_dir is None:
+        return settings.DRIFT_REFERENCE_PATH
+    return os.path.join(model_dir, os.path.basename(settings.DRIFT_REFERENCE_PATH))
+
+
+def load_reference(path: str | None = None) -> dict:
+    with open(path or settings.DRIFT_REFERENCE_PATH) as f:
+        return json.load(f)
+
+
+def psi(expected_counts: np.ndarray, actual_counts: np.ndarray) -> float:
+    expected = np.asarray(expected_counts, dtype=np.float64)
+    actual = np.asarray(actual_counts, dtype=np.float64)
+    e = expected / max(expected.sum(), 1) + _PSI_EPS
+    a = actual / max(actual.sum(), 1) + _PSI_EPS
+    return float(np.sum((a - e) * np.log(a / e)))
+
+
+def ks_binned(expected_counts: np.ndarray, actual_counts: np.ndarray) -> float:
+    """
+    Max CDF gap evaluated at the bin edges (a lower bound of the exact KS statistic).
+    """
+    expected = np.cumsum(expected_counts, dtype=np.float64)
+    actual = np.cumsum(actual_counts, dtype=np.float64)
+    return float(np.max(np.abs(expected / max(expected[-1], 1) - actual / max(actual[-1], 1))))
+
+
+def compare(reference: dict, counts: dict[str, np.ndarray]) -> dict:
+    """
+    PSI/KS per column against the reference, with a stable/warn/drift status.
+    """
+    report = {}
+    for name, ref in reference.items():
+        actual = counts.get(name)
+        n = int(actual.sum()) if actual is not None else 0
+        if not n:
+            report[name] = {"n": 0, "psi": None, "ks": None, "status": "no_data"}
+            continue
+        value = psi(ref["counts"], actual)
+        status = "drift" if value > PSI_DRIFT else "warn" if value > PSI_WARN else "ok"
+        report[name] = {"n": n, "psi": value, "ks": ks_binned(ref["counts"], actual), "status": status}
+    return report
+
+
+class SlidingWindowCounts:
+    """
+    Ring of `n_buckets` time buckets, each holding one count vector per column.
+    Old buckets are recycled as time moves on, so memory never grows.
+    """
+    def __init__(self, reference: dict, window_seconds: float, n_buckets: int, clock=time.time):
+        self.columns = list(reference)
+        self.edges = [np.asarray(reference[c]["edges"], dtype=np.float64) for c in self.columns]
+        self.bucket_seconds = window_seconds / n_buckets
+        self.n_buckets = n_buckets
+        self._clock = clock
+        self._counts = [np.zeros((n_buckets, len(e) + 1), dtype=np.int64) for e in self.edges]
+        self._bucket_ids = np.full(n_buckets, -1, dtype=np.int64)
+        self._lock = threading.Lock()
+
+    def _slot(self, now: float) -> int:
+        bucket_id = int(now // self.bucket_seconds)
+        slot = bucket_id % self.n_buckets
+        if self._bucket_ids[slot] != bucket_id:
+            for counts in self._counts:
+                counts[slot] = 0
+            self._bucket_ids[slot] = bucket_id
+        return slot
+
+    def add(self, columns: dict[str, np.ndarray]):
+        # Binning happens outside the lock; only the increments are serialised
+        binned = {}
+        for i, name in enumerate(self.columns):
+            if name in columns:
+                binned[i] = _counts(np.asarray(columns[name], dtype=np.float64), self.edges[i])
+        with self._lock:
+            slot = self._slot(self._clock())
+            for i, counts in binned.items():
+                self._counts[i][slot] += counts
+
+    def _n_buckets(self, seconds: float | None) -> int:
+        if seconds is None:
+            return self.n_buckets
+        return max(1, min(self.n_buckets, int(np.ceil(seconds / self.bucket_seconds))))
+
+    def covered_seconds(self, seconds: float | None = None) -> float:
+        """
+        The span `window(seconds)` actually sums: whole buckets, at most the full ring.
+        """
+        return self._n_buckets(seconds) * self.bucket_seconds
+
+    def window(self, seconds: float | None = None) -> dict[str, np.ndarray]:
+        """
+        Counts summed over the buckets that overlap the last `seconds`.
+        """
+        with self._lock:
+            current = int(self._clock() // self.bucket_seconds)
+            n = self._n_buckets(seconds)
+            live = (self._bucket_ids > current - n) & (self._bucket_ids <= current)
+            return {name: counts[live].sum(axis=0) for name, counts in zip(self.columns, self._counts)}
+
+
+class DriftMonitor:
+    """
+    Collects scored rows from the request handlers and bins them on a
+    background thread every `flush_interval` seconds. `record` only appends
+    to a buffer. When more than `max_buffered_rows` rows are waiting, new
+    rows are dropped (and counted) rather than slowing requests down.
+    """
+    def __init__(self, reference: dict, window_seconds: float = 3600.0, n_buckets: int = 12,
+                 flush_interval: float = 1.0, max_buffered_rows: int = 100000):
+        self.window_seconds = window_seconds
+        self.n_buckets = n_buckets
+        self.flush_interval = flush_interval
+        self.max_buffered_rows = max_buffered_rows
+        self._lock = threading.Lock()
+        self._buffer: list[tuple[object, np.ndarray]] = []
+        self._buffered_rows = 0
+        self.rows_recorded = 0
+        self.rows_dropped = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.set_reference(reference)
+
+    def set_reference(self, reference: dict):
+        """
+        Switches to a new reference (e.g. after a model swap) and clears the windows.
+        """
+        self.flush()
+        self.reference = reference
+        self.counts = SlidingWindowCounts(reference, self.window_seconds, self.n_buckets)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="drift-monitor", daemon=True)
+        self._thread.start()
+
+    def shutdown(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def record(self, features, probabilities):
+        """
+        Queues rows for binning: `features` is a list of PredictionRequest or a
+        DataFrame with the feature columns; `probabilities` aligns with it (NaN = not scored).
+        """
+        n = len(probabilities)
+        with self._lock:
+            if self._buffered_rows + n > self.max_buffered_rows:
+                self.rows_dropped += n
+                return
+            self._buffer.append((features, np.asarray(probabilities, dtype=np.float64)))
+            self._buffered_rows += n
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning(f"Drift monitor flush failed: {e}")
+
+    def flush(self):
+        with self._lock:
+            pending, self._buffer, self._buffered_rows = self._buffer, [], 0
+        if not pending:
+            return
+        frames, scores = [], []
+        for features, probs in pending:
+            if isinstance(features, pd.DataFrame):
+                frames.append(features.reindex(columns=FEATURE_COLUMNS))
+            else:
+                frames.append(pd.DataFrame([r.model_dump() for r in features], columns=FEATURE_COLUMNS))
+            scores.append(probs)
+        frame = pd.concat(frames, ignore_index=True).apply(pd.to_numeric, errors="coerce")
+        columns = {name: frame[name].to_numpy(dtype=np.float64) for name in FEATURE_COLUMNS}
+        columns[SCORE_COLUMN] = np.concatenate(scores)
+        self.counts.add(columns)
+        self.rows_recorded += len(frame)
+
+    def report(self, window_seconds: float | None = None) -> dict:
+        columns = compare(self.reference, self.counts.window(window_seconds))
+        return {
+            "window_seconds": self.counts.covered_seconds(window_seconds),
+            "rows_recorded": self.rows_recorded,
+            "rows_dropped": self.rows_dropped,
+            "drifted": sorted(name for name, c in columns.items() if c["status"] == "drift"),
+            "columns": columns,
+        }
+
+
+def main(argv=None):
+    from src.scoring.batch import iter_chunks
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="CSV, Parquet or NDJSON file of applicants (optionally with default_probability)")
+    parser.add_argument("--reference", default=None, help="Reference histograms (default: DRIFT_REFERENCE_PATH)")
+    parser.add_argument("--chunk-size", type=int, default=100000)
+    args = parser.parse_args(argv)
+
+    reference = load_reference(args.reference)
+    counts = {name: np.zeros(len(ref["counts"]), dtype=np.int64) for name, ref in reference.items()}
+    for raw, _ in iter_chunks(args.input, args.chunk_size):
+        for name, ref in reference.items():
+            if name in raw:
+                values = pd.to_numeric(raw[name], errors="coerce").to_numpy(dtype=np.float64)
+                counts[name] += _counts(values, np.asarray(ref["edges"]))
+    print(json.dumps(compare(reference, counts), indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""
+Offline bulk scoring for large files.
+
+    python -m src.scoring.batch portfolio.csv scores.csv --chunk-size 50000 --workers 4
+    python -m src.scoring.batch applicants.jsonl scores.jsonl --resume
+
+Input is streamed in fixed-size chunks (CSV, Parquet or NDJSON), each chunk is
+validated and scored as one matrix, and results are appended to the output in
+input order, so memory stays bounded by chunk_size * (workers * 2) rows.
+Rows that fail validation are written with an `error` message instead of
+aborting the run. A checkpoint next to the output allows `--resume`.
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+from src.api.payloads import decode_ndjson
+from src.api.schemas import validate_frame
+from src.scoring.scorer import load_scorer
+from src.utils.config import settings
+
+logger = logging.getLogger(__name__)
+
+NDJSON_SUFFIXES = (".jsonl", ".ndjson")
+
+# Scorer loaded once per worker process (or once in-process when workers == 1)
+_scorer = None
+
+
+def _input_format(path: str) -> str:
+    lowered = path.lower()
+    if lowered.endswith(".parquet"):
+        return "parquet"
+    if lowered.endswith(NDJSON_SUFFIXES):
+        return "ndjson"
+    if lowered.endswith(".json"):
+        # A JSON array has to be parsed whole, which defeats chunked streaming
+        raise SystemExit(f"{path}: JSON array input cannot be streamed; write one object per line (.jsonl)")
+    return "csv"
+
+
+def iter_chunks(path: str, chunk_size: int) -> Iterator[tuple[pd.DataFrame, dict[int, list[str]]]]:
+    """
+    Yields (raw chunk, row-level decode errors) without loading the whole file.
+    """
+    fmt = _input_format(path)
+    if fmt == "csv":
+        for chunk in pd.read_csv(path, chunksize=chunk_size):
+            yield chunk.reset_index(drop=True), {}
+    elif fmt == "parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Parquet input requires pyarrow (pip install pyarrow)")
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas(), {}
+    else:
+        with open(path, "rb") as f:
+            lines = []
+            for line in f:
+                if line.strip():
+                    lines.append(line)
+                if len(lines) >= chunk_size:
+                    yield decode_ndjson(b"".join(lines))
+                    lines = []
+            if lines:
+                yield decode_ndjson(b"".join(lines))
+
+
+def _init_worker(engine: str | None, model_dir: str | None, nthread: int):
+    global _scorer
+    _scorer = load_scorer(engine, model_dir)
+    _scorer.set_nthread(nthread)
+
+
+def score_chunk(raw_df: pd.DataFrame, decode_errors: dict[int, list[str]], row_offset: int,
+                id_column: str | None, output_format: str) -> tuple[str, int, int]:
+    """
+    Validates and scores one chunk; returns (serialized output, n_scored, n_failed).
+    """
+    features, row_errors = validate_frame(raw_df)
+    row_errors.update(decode_errors)
+    features = features.drop(index=[pos for pos in decode_errors if pos in features.index])
+
+    n = len(raw_df)
+    probs = np.full(n, np.nan)
+    labels = np.full(n, -1, dtype=np.int64)
+    if len(features):
+        result = _scorer.score(features)
+        probs[features.index] = result.probabilities
+        labels[features.index] = result.labels
+
+    out = pd.DataFrame({"row": np.arange(row_offset, row_offset + n)})
+    if id_column:
+        out[id_column] = raw_df[id_column].to_numpy() if id_column in raw_df.columns else None
+    out["default_probability"] = probs
+    out["is_default"] = pd.array(np.where(labels >= 0, labels, None), dtype="Int64")
+    out["error"] = [("; ".join(row_errors[pos]) if pos in row_errors else None) for pos in range(n)]
+
+    if output_format == "ndjson":
+        text = out.to_json(orient="records", lines=True)
+        text = text if text.endswith("\n") else text + "\n"
+    else:
+        text = out.to_csv(index=False, header=False)
+    return text, n - len(row_errors), len(row_errors)
+
+
+def _checkpoint_path(output: str) -> str:
+    return output + ".checkpoint.json"
+
+
+def _load_checkpoint(output: str, state: dict) -> dict | None:
+    path = _checkpoint_path(output)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        checkpoint = json.load(f)
+    # Appending under other settings would mix row layouts in one output file
+    for key in ("input", "chunk_size", "id_column", "output_format"):
+        if checkpoint.get(key) != state[key]:
+            raise SystemExit(f"Checkpoint {path} was written with a different {key.replace('_', ' ')} "
+                             f"({checkpoint.get(key)!r}, now {state[key]!r})")
+    return checkpoint
+
+
+def _write_checkpoint(output: str, state: dict):
+    tmp = _checkpoint_path(output) + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, _checkpoint_path(output))
+
+
+def run(input_path: str, output_path: str, chunk_size: int = 50000, workers: int = 1,
+        engine: str | None = None, model_dir: str | None = None, id_column: str | None = None,
+        resume: bool = False) -> dict:
+    output_format = "ndjson" if output_path.lower().endswith(NDJSON_SUFFIXES) else "csv"
+    state = {"input": os.path.abspath(input_path), "chunk_size": chunk_size,
+             "id_column": id_column, "output_format": output_format,
+             "chunks_done": 0, "rows_done": 0, "rows_scored": 0, "rows_failed": 0, "output_bytes": 0}
+
+    checkpoint = _load_checkpoint(output_path, state) if resume else None
+    if checkpoint:
+        state.update(checkpoint)
+        logger.info(f"Resuming after chunk {state['chunks_done']} ({state['rows_done']} rows)")
+        out = open(output_path, "r+b")
+        # Drop anything written after the last checkpoint (a chunk that was cut short)
+        out.truncate(state["output_bytes"])
+        out.seek(state["output_bytes"])
+    else:
+        out = open(output_path, "wb")
+        if output_format == "csv":
+            header = ["row"] + ([id_column] if id_column else []) + ["default_probability", "is_default", "error"]
+            out.write((",".join(header) + "\n").encode())
+        state["output_bytes"] = out.tell()
+
+    pool = None
+    if workers > 1:
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(engine, model_dir, 1),
+        )
+    else:
+        _init_worker(engine, model_dir, settings.XGB_NTHREAD)
+
+    def flush(text: str, n_scored: int, n_failed: int):
+        out.write(text.encode())
+        out.flush()
+        state["chunks_done"] += 1
+        state["rows_done"] += n_scored + n_failed
+        state["rows_scored"] += n_scored
+        state["rows_failed"] += n_failed
+        state["output_bytes"] = out.tell()
+        _write_checkpoint(output_path, state)
+
+    start = time.perf_counter()
+    rows_at_start = state["rows_done"]
+    in_flight = deque()
+    row_offset = state["rows_done"]
+    skip_chunks = state["chunks_done"]
+    try:
+        for index, (raw_df, decode_errors) in enumerate(iter_chunks(input_path, chunk_size)):
+            if index < skip_chunks:
+                continue
+            args = (raw_df, decode_errors, row_offset, id_column, output_format)
+            row_offset += len(raw_df)
+            if pool is None:
+                flush(*score_chunk(*args))
+            else:
+                in_flight.append(pool.submit(score_chunk, *args))
+                # Bound memory: at most two chunks per worker in flight; write in input order
+                while len(in_flight) >= workers * 2:
+                    flush(*in_flight.popleft().result())
+            elapsed = time.perf_counter() - start
+            logger.info(f"Chunk {index}: {state['rows_done']} rows written, "
+                        f"{(state['rows_done'] - rows_at_start) / max(elapsed, 1e-9):,.0f} rows/sec")
+        while in_flight:
+            flush(*in_flight.popleft().result())
+    finally:
+        out.close()
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    elapsed = time.perf_counter() - start
+    summary = {
+        "rows": state["rows_done"],
+        "rows_scored": state["rows_scored"],
+        "rows_failed": state["rows_failed"],
+        "chunks": state["chunks_done"],
+        "seconds": elapsed,
+        "rows_per_sec": (state["rows_done"] - rows_at_start) / elapsed if elapsed > 0 else 0.0,
+    }
+    logger.info(f"Scoring complete: {summary}")
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="CSV, Parquet or NDJSON (.jsonl/.ndjson) file")
+    parser.add_argument("output", help="Output file; .jsonl/.ndjson writes NDJSON, anything else CSV")
+    parser.add_argument("--chunk-size", type=int, default=50000)
+    parser.add_argument("--workers", type=int, default=1, help="Scoring processes (1 = in-process)")
+    parser.add_argument("--engine", choices=["pipeline", "compiled"], default=None)
+    parser.add_argument("--model-dir", default=None, help="Versioned model directory (default: settings paths)")
+    parser.add_argument("--id-column", default=None, help="Input column copied to the output (e.g. account id)")
+    parser.add_argument("--resume", action="store_true", help="Continue from the output's checkpoint")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    summary = run(args.input, args.output, args.chunk_size, args.workers, args.engine,
+                  args.model_dir, args.id_column, args.resume)
+    print(json.dumps(summary, indent=4))
+
+
+if __name__ == "__main__":
+    main()
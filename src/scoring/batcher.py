@@ -0,0 +1,137 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable
+
+from starlette.concurrency import run_in_threadpool
+
+from src.scoring.executor import Overloaded
+from src.utils.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-row requests into one model call.
+
+    Callers `await submit(item)`; a background task collects items until either
+    `max_batch_size` rows are queued or `max_wait_ms` has passed since the first
+    row of the batch arrived, runs `score_fn(items)` once and resolves every
+    caller's future with its own result.
+
+    `runner(score_fn, items)` decides where the batch runs (default: Starlette's
+    threadpool). Once `max_queue` rows are waiting, `submit` raises Overloaded.
+    """
+    def __init__(
+        self,
+        score_fn: Callable[[list], list],
+        max_batch_size: int = 64,
+        max_wait_ms: float = 2.0,
+        max_queue: int | None = None,
+        runner: Callable[[Callable, list], Awaitable[list]] | None = None,
+    ):
+        self.score_fn = score_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue = max_queue
+        self.runner = runner or run_in_threadpool
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        # Items taken off the queue but not yet answered (collecting or scoring)
+        self._batch: list = []
+        # Batch-size histogram with power-of-two upper bounds up to max_batch_size
+        self.bucket_bounds = []
+        bound = 1
+        while bound < max_batch_size:
+            self.bucket_bounds.append(bound)
+            bound *= 2
+        self.bucket_bounds.append(max_batch_size)
+        self.batch_sizes = Histogram("risk_batch_size", "Rows per micro-batch", buckets=self.bucket_bounds)
+        self.batches_total = 0
+        self.items_total = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Fail the interrupted batch and anything still queued rather than leaving callers hanging
+        pending, self._batch = self._batch, []
+        while self._queue is not None and not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for _, future in pending:
+            if not future.done():
+                future.set_exception(RuntimeError("Batcher stopped"))
+
+    async def submit(self, item: Any) -> Any:
+        if self._task is None:
+            raise RuntimeError("Batcher is not running")
+        if self.max_queue is not None and self.queue_depth >= self.max_queue:
+            raise Overloaded(f"Batch queue full ({self.queue_depth} waiting)")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def _collect(self) -> list:
+        self._batch = batch = [await self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            # Drain whatever is already queued without waiting
+            while len(batch) < self.max_batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            remaining = deadline - time.perf_counter()
+            if len(batch) >= self.max_batch_size or remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    def _record(self, size: int):
+        self.batches_total += 1
+        self.items_total += size
+        self.batch_sizes.observe(size)
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            self._record(len(batch))
+            items = [item for item, _ in batch]
+            try:
+                results = await self.runner(self.score_fn, items)
+            except Exception as e:
+                logger.error(f"Batch of {len(batch)} failed: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                self._batch = []
+                continue
+            for (_, future), result in zip(batch, results):
+                # The caller may have gone away (client disconnect/cancel)
+                if not future.done():
+                    future.set_result(result)
+            self._batch = []
+
+    def stats(self) -> dict:
+        cumulative, _ = self.batch_sizes.snapshot()
+        return {
+            "queue_depth": self.queue_depth,
+            "batches_total": self.batches_total,
+            "items_total": self.items_total,
+            "mean_batch_size": self.items_total / self.batches_total if self.batches_total else 0.0,
+            # Cumulative counts, as in Prometheus histograms
+            "batch_size_histogram": {f"le_{b}": c for b, c in zip(self.bucket_bounds, cumulative)},
+        }
@@ -0,0 +1,129 @@
+import hashlib
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any
+
+from src.api.schemas import FEATURE_COLUMNS, PredictionRequest
+from src.utils.config import settings
+
+
+class CacheBackend(ABC):
+    """
+    Storage interface for PredictionCache. Implement this to share cached
+    predictions across workers (e.g. Redis/ElastiCache) without touching the API.
+    """
+    @abstractmethod
+    def get(self, key: str) -> Any | None:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: Any):
+        ...
+
+    @abstractmethod
+    def clear(self):
+        ...
+
+    @abstractmethod
+    def stats(self) -> dict:
+        ...
+
+
+class InMemoryCache(CacheBackend):
+    """
+    Bounded LRU cache with a per-entry time-to-live, local to one process.
+    """
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": "memory",
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+def build_cache_backend(name: str | None = None) -> CacheBackend:
+    name = name or settings.CACHE_BACKEND
+    if name == "memory":
+        return InMemoryCache(settings.CACHE_MAX_ENTRIES, settings.CACHE_TTL_SECONDS)
+    raise ValueError(f"Unknown CACHE_BACKEND '{name}'")
+
+
+class PredictionCache:
+    """
+    Caches PredictionResponse objects keyed by a hash of the canonicalized
+    request, the explanation size, the decision threshold and the model version.
+    """
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+        self.invalidations = 0
+
+    @staticmethod
+    def key(request: PredictionRequest, top_k: int, model_version: str, threshold: float) -> str:
+        # Every field as float in schema order, so 1 and 1.0 (or key order) never split entries
+        features = [float(getattr(request, col)) for col in FEATURE_COLUMNS]
+        canonical = json.dumps([model_version, threshold, top_k, features], separators=(",", ":"))
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def get(self, key: str):
+        return self.backend.get(key)
+
+    def set(self, key: str, response):
+        self.backend.set(key, response)
+
+    def invalidate(self):
+        """
+        Drops every entry; called whenever the active model changes.
+        """
+        self.backend.clear()
+        self.invalidations += 1
+
+    def stats(self) -> dict:
+        return {**self.backend.stats(), "invalidations": self.invalidations}
@@ -0,0 +1,161 @@
+"""
+Early-exit scoring for the XGBoost champion.
+
+Every row is first scored with the first `prefix_trees` trees
+(`iteration_range=(0, prefix_trees)`). Rows whose partial margin lies more
+than `band` away from the decision threshold (in margin space) keep the
+partial score. Only rows inside the band are finished with the remaining
+trees, reusing the partial margin so no tree is evaluated twice.
+
+`calibrate_early_exit` picks the prefix and band on held-out data: for each
+candidate prefix, the narrowest band whose label-flip rate (early-exit label
+!= full-model label) stays within `max_flip_rate`, keeping the prefix with the
+fewest expected trees per row. Rows that exit early return the prefix
+model's probability, so their `default_probability` is an approximation of the
+full model's; labels differ from the full model for at most about
+`max_flip_rate` of traffic.
+"""
+import json
+import os
+from typing import NamedTuple
+
+import numpy as np
+import xgboost as xgb
+
+from src.utils.config import settings
+
+# Prefix sizes tried during calibration, as fractions of the ensemble
+PREFIX_FRACTIONS = (0.05, 0.1, 0.2, 0.3, 0.4, 0.5, 0.75)
+
+
+class EarlyExitConfig(NamedTuple):
+    prefix_trees: int
+    n_trees: int
+    # Decision threshold and half-width of the uncertainty band, on the margin (log-odds) scale
+    threshold_margin: float
+    band: float
+    # Margin offset (base_score) that every predict call adds once
+    base_margin: float
+
+    def to_dict(self) -> dict:
+        return self._asdict()
+
+    def matches(self, booster: xgb.Booster, threshold: float) -> bool:
+        """
+        A band calibrated for another ensemble or threshold would not hold its flip rate.
+        """
+        return self.n_trees == booster.num_boosted_rounds() and np.isclose(self.threshold_margin, _logit(threshold))
+
+
+def _logit(p: float) -> float:
+    return float(np.log(p / (1 - p)))
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def _margin(booster: xgb.Booster, X: np.ndarray, start: int, end: int) -> np.ndarray:
+    return booster.inplace_predict(X, iteration_range=(start, end), predict_type="margin").astype(np.float64)
+
+
+def predict_early_exit(booster: xgb.Booster, X: np.ndarray, config: EarlyExitConfig) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns (probabilities, trees evaluated per row).
+    """
+    margin = _margin(booster, X, 0, config.prefix_trees)
+    trees = np.full(len(X), config.prefix_trees, dtype=np.int64)
+    uncertain = np.flatnonzero(np.abs(margin - config.threshold_margin) <= config.band)
+    if len(uncertain) and config.prefix_trees < config.n_trees:
+        rest = _margin(booster, X[uncertain], config.prefix_trees, config.n_trees)
+        # Both calls include the base margin; keep it once
+        margin[uncertain] += rest - config.base_margin
+        trees[uncertain] = config.n_trees
+    return _sigmoid(margin), trees
+
+
+def _narrowest_band(distance: np.ndarray, flipped: np.ndarray, max_flips: int) -> float:
+    """
+    Smallest band such that at most `max_flips` flipped rows lie outside it
+    (rows at exactly the band edge are finished with the full model).
+    """
+    flip_distances = np.sort(distance[flipped])[::-1]
+    return float(flip_distances[max_flips]) if max_flips < len(flip_distances) else 0.0
+
+
+def calibrate_early_exit(booster: xgb.Booster, X: np.ndarray, threshold: float | None = None,
+                         max_flip_rate: float = 0.001, prefixes: list[int] | None = None) -> tuple[EarlyExitConfig, list[dict]]:
+    """
+    Chooses the prefix and band with the fewest expected trees per row on `X`
+    while flipping at most `max_flip_rate` of the full model's labels.
+    Returns the config and one summary row per candidate prefix.
+    """
+    threshold = settings.DECISION_THRESHOLD if threshold is None else threshold
+    n_trees = booster.num_boosted_rounds()
+    X = np.asarray(X, dtype=np.float32)
+    t = _logit(threshold)
+    full = _margin(booster, X, 0, n_trees)
+    full_label = full >= t
+    max_flips = int(np.floor(max_flip_rate * len(X)))
+    if prefixes is None:
+        prefixes = sorted({max(1, int(round(n_trees * f))) for f in PREFIX_FRACTIONS})
+
+    candidates = []
+    for k in prefixes:
+        partial = _margin(booster, X, 0, k)
+        rest = _margin(booster, X, k, n_trees) if k < n_trees else np.zeros(len(X))
+        distance = np.abs(partial - t)
+        band = _narrowest_band(distance, (partial >= t) != full_label, max_flips)
+        in_band = distance <= band
+        candidates.append({
+            "prefix_trees": k,
+            "band": band,
+            "in_band_rate": float(in_band.mean()),
+            "avg_trees": float(k + in_band.mean() * (n_trees - k)),
+            "flip_rate": float(((partial >= t) != full_label)[~in_band].sum() / len(X)),
+            # partial + rest - full is the base margin counted twice, identical for every row
+            "base_margin": float(np.median(partial + rest - full)) if k < n_trees else 0.0,
+        })
+
+    best = min(candidates, key=lambda c: c["avg_trees"])
+    config = EarlyExitConfig(best["prefix_trees"], n_trees, t, best["band"], best["base_margin"])
+    return config, candidates
+
+
+def evaluate_early_exit(booster: xgb.Booster, X: np.ndarray, y: np.ndarray, config: EarlyExitConfig,
+                        threshold: float | None = None) -> dict:
+    """
+    Average trees evaluated, label-flip rate and accuracy of early exit vs the full ensemble.
+    """
+    threshold = settings.DECISION_THRESHOLD if threshold is None else threshold
+    X = np.asarray(X, dtype=np.float32)
+    y = np.asarray(y)
+    full_label = _sigmoid(_margin(booster, X, 0, config.n_trees)) >= threshold
+    probs, trees = predict_early_exit(booster, X, config)
+    early_label = probs >= threshold
+    accuracy_full = float((full_label == y).mean())
+    accuracy_early = float((early_label == y).mean())
+    return {
+        "n_samples": len(X),
+        "avg_trees": float(trees.mean()),
+        "n_trees": config.n_trees,
+        "trees_saved_ratio": float(1 - trees.mean() / config.n_trees),
+        "full_ensemble_rate": float((trees == config.n_trees).mean()),
+        "flip_rate": float((early_label != full_label).mean()),
+        "accuracy_full": accuracy_full,
+        "accuracy_early_exit": accuracy_early,
+        "accuracy_delta": accuracy_early - accuracy_full,
+    }
+
+
+def save_early_exit(config: EarlyExitConfig, path: str | None = None) -> str:
+    path = path or settings.EARLY_EXIT_PATH
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(config.to_dict(), f, indent=4)
+    return path
+
+
+def load_early_exit(path: str | None = None) -> EarlyExitConfig:
+    with open(path or settings.EARLY_EXIT_PATH) as f:
+        return EarlyExitConfig(**json.load(f))
@@ -0,0 +1,195 @@
+import json
+import threading
+from pathlib import Path
+
+import numpy as np
+import xgboost as xgb
+
+from src.api.schemas import FEATURE_COLUMNS
+from src.scoring.scorer import BaseScorer
+from src.utils.config import settings
+
+
+class CompiledPreprocessor:
+    """
+    Flat NumPy replica of the fitted ColumnTransformer from get_preprocessor:
+    median imputation + standard scaling for numerical columns, most-frequent
+    imputation + one-hot encoding (unknowns ignored) for categorical columns.
+    Inputs are float64 rows in FEATURE_COLUMNS order, outputs float32.
+    """
+    def __init__(self, num_columns, num_fill, num_mean, num_scale, cat_columns=(), cat_fill=(), cat_categories=()):
+        self.num_columns = list(num_columns)
+        self.num_idx = np.array([FEATURE_COLUMNS.index(c) for c in self.num_columns], dtype=np.intp)
+        self.num_fill = np.asarray(num_fill, dtype=np.float64)
+        self.num_mean = np.asarray(num_mean, dtype=np.float64)
+        self.num_scale = np.asarray(num_scale, dtype=np.float64)
+
+        self.cat_columns = list(cat_columns)
+        self.cat_idx = np.array([FEATURE_COLUMNS.index(c) for c in self.cat_columns], dtype=np.intp)
+        self.cat_fill = np.asarray(cat_fill, dtype=np.float64)
+        self.cat_categories = [np.asarray(c, dtype=np.float64) for c in cat_categories]
+        # Output column offset of each one-hot block
+        sizes = [len(c) for c in self.cat_categories]
+        self.cat_offsets = len(self.num_columns) + np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.intp) if sizes else []
+        self.n_outputs = len(self.num_columns) + sum(sizes)
+
+    @property
+    def feature_names(self) -> list[str]:
+        names = list(self.num_columns)
+        for col, cats in zip(self.cat_columns, self.cat_categories):
+            names.extend(f"{col}_{c:g}" for c in cats)
+        return names
+
+    @classmethod
+    def from_column_transformer(cls, preprocessor) -> "CompiledPreprocessor":
+        """
+        Extracts the fitted statistics from a ColumnTransformer built by get_preprocessor.
+        """
+        # Only needed at export time; serving loads the JSON spec without sklearn
+        from sklearn.impute import SimpleImputer
+        from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+        spec = {"num_columns": [], "num_fill": [], "num_mean": [], "num_scale": [],
+                "cat_columns": [], "cat_fill": [], "cat_categories": []}
+        for name, pipe, features in preprocessor.transformers_:
+            if name == 'remainder' or pipe == 'drop' or len(features) == 0:
+                continue
+            steps = dict(pipe.steps) if hasattr(pipe, 'steps') else {name: pipe}
+            imputer = next((s for s in steps.values() if isinstance(s, SimpleImputer)), None)
+            scaler = next((s for s in steps.values() if isinstance(s, StandardScaler)), None)
+            encoder = next((s for s in steps.values() if isinstance(s, OneHotEncoder)), None)
+            unsupported = [s for s in steps.values() if not isinstance(s, (SimpleImputer, StandardScaler, OneHotEncoder))]
+            if unsupported or (scaler is not None and encoder is not None):
+                raise ValueError(f"Cannot compile transformer '{name}': unsupported steps {unsupported}")
+
+            n = len(features)
+            fill = imputer.statistics_.astype(np.float64) if imputer is not None else np.full(n, np.nan)
+            if encoder is not None:
+                spec["cat_columns"].extend(features)
+                spec["cat_fill"].extend(fill.tolist())
+                spec["cat_categories"].extend(c.astype(np.float64).tolist() for c in encoder.categories_)
+            else:
+                mean = scaler.mean_ if scaler is not None and scaler.mean_ is not None else np.zeros(n)
+                scale = scaler.scale_ if scaler is not None and scaler.scale_ is not None else np.ones(n)
+                spec["num_columns"].extend(features)
+                spec["num_fill"].extend(fill.tolist())
+                spec["num_mean"].extend(np.asarray(mean, dtype=np.float64).tolist())
+                spec["num_scale"].extend(np.asarray(scale, dtype=np.float64).tolist())
+        return cls(**spec)
+
+    def to_dict(self) -> dict:
+        return {
+            "num_columns": self.num_columns,
+            "num_fill": self.num_fill.tolist(),
+            "num_mean": self.num_mean.tolist(),
+            "num_scale": self.num_scale.tolist(),
+            "cat_columns": self.cat_columns,
+            "cat_fill": self.cat_fill.tolist(),
+            "cat_categories": [c.tolist() for c in self.cat_categories],
+        }
+
+    @classmethod
+    def from_dict(cls, spec: dict) -> "CompiledPreprocessor":
+        return cls(**spec)
+
+    def transform_into(self, raw: np.ndarray, out: np.ndarray) -> np.ndarray:
+        """
+        Transforms `raw` (n, len(FEATURE_COLUMNS)) into the preallocated float32 `out`.
+        """
+        n_num = len(self.num_columns)
+        num = raw[:, self.num_idx]
+        np.copyto(num, self.num_fill, where=np.isnan(num))
+        num -= self.num_mean
+        num /= self.num_scale
+        out[:, :n_num] = num
+
+        if self.cat_columns:
+            out[:, n_num:] = 0.0
+            cat = raw[:, self.cat_idx]
+            np.copyto(cat, self.cat_fill, where=np.isnan(cat))
+            rows = np.arange(len(raw))
+            for j, (cats, offset) in enumerate(zip(self.cat_categories, self.cat_offsets)):
+                pos = np.searchsorted(cats, cat[:, j])
+                pos_clipped = np.minimum(pos, len(cats) - 1)
+                known = cats[pos_clipped] == cat[:, j]
+                out[rows[known], offset + pos_clipped[known]] = 1.0
+        return out
+
+    def transform(self, raw: np.ndarray) -> np.ndarray:
+        out = np.empty((len(raw), self.n_outputs), dtype=np.float32)
+        return self.transform_into(np.asarray(raw, dtype=np.float64), out)
+
+
+def export_compiled_artifacts(pipeline, spec_path: str = None, booster_path: str = None) -> tuple[str, str]:
+    """
+    Writes the compiled preprocessor spec (JSON) and the booster in XGBoost's
+    native format so the service can score without pandas or sklearn.
+    """
+    spec_path = spec_path or settings.PREPROCESSOR_SPEC_PATH
+    booster_path = booster_path or settings.BOOSTER_PATH
+    compiled = CompiledPreprocessor.from_column_transformer(pipeline.named_steps['preprocessor'])
+    Path(spec_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(spec_path, "w") as f:
+        json.dump(compiled.to_dict(), f)
+    booster = pipeline.named_steps['classifier'].get_booster()
+    best_iteration = getattr(booster, "best_iteration", None)
+    if best_iteration is not None:
+        # Trained with early stopping: the classifier predicts with the best
+        # iteration only, so drop the trees after it
+        booster = booster[: best_iteration + 1]
+    booster.save_model(booster_path)
+    return spec_path, booster_path
+
+
+class CompiledScorer(BaseScorer):
+    """
+    Fast-path engine: request fields go straight into a float64 row buffer, the
+    compiled preprocessor writes a float32 matrix and the booster is called directly.
+    """
+    def __init__(self, preprocessor: CompiledPreprocessor, booster: xgb.Booster, threshold: float | None = None):
+        super().__init__(threshold)
+        self.compiled = preprocessor
+        self.booster = booster
+        self.feature_names = preprocessor.feature_names
+        # Per-thread single-row buffers so concurrent requests never share memory
+        self._buffers = threading.local()
+
+    @classmethod
+    def load(cls, spec_path: str = None, booster_path: str = None, threshold: float | None = None) -> "CompiledScorer":
+        with open(spec_path or settings.PREPROCESSOR_SPEC_PATH) as f:
+            compiled = CompiledPreprocessor.from_dict(json.load(f))
+        booster = xgb.Booster()
+        booster.load_model(booster_path or settings.BOOSTER_PATH)
+        return cls(compiled, booster, threshold)
+
+    def _row_buffers(self) -> tuple[np.ndarray, np.ndarray]:
+        buffers = getattr(self._buffers, "value", None)
+        if buffers is None:
+            buffers = (np.empty((1, len(FEATURE_COLUMNS)), dtype=np.float64),
+                       np.empty((1, self.compiled.n_outputs), dtype=np.float32))
+            self._buffers.value = buffers
+        return buffers
+
+    def features_from_requests(self, requests) -> np.ndarray:
+        if len(requests) == 1:
+            raw, _ = self._row_buffers()
+            raw[0] = [getattr(requests[0], c) for c in FEATURE_COLUMNS]
+            return raw
+        return np.array([[getattr(r, c) for c in FEATURE_COLUMNS] for r in requests], dtype=np.float64)
+
+    def transform(self, features) -> np.ndarray:
+        if hasattr(features, "columns"):
+            features = features[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+        if len(features) == 1:
+            _, out = self._row_buffers()
+            return self.compiled.transform_into(np.asarray(features, dtype=np.float64), out)
+        return self.compiled.transform(features)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        return self.booster.inplace_predict(X)
+
+    def set_nthread(self, nthread: int):
+        self.booster.set_param({"nthread": nthread})
+
+    def contributions(self, X: np.ndarray) -> np.ndarray:
+        return self.booster.predict(xgb.DMatrix(X), pred_contribs=True)[:, :-1]
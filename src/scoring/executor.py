@@ -0,0 +1,125 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable
+
+from starlette.concurrency import run_in_threadpool
+
+from src.utils.config import settings
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("threadpool", "thread", "process")
+
+# Settings a process worker needs to load the same model as the parent
+_WORKER_SETTINGS = (
+    "INFERENCE_ENGINE", "MODEL_PATH", "PREPROCESSOR_SPEC_PATH", "BOOSTER_PATH", "DECISION_THRESHOLD",
+    "XGB_NTHREAD", "MODEL_VERSION", "EARLY_EXIT_ENABLED", "EARLY_EXIT_PATH"
+)
+
+# Models loaded once per worker process, keyed by (source, version); a new
+# version of the same artifacts (hot reload) triggers a fresh load
+_worker_scorers = {}
+_WORKER_MAX_MODELS = 4
+
+
+class Overloaded(Exception):
+    """Raised when the inference queue is full; the API maps it to 503 + Retry-After."""
+
+
+def _init_worker(overrides: dict):
+    for key, value in overrides.items():
+        setattr(settings, key, value)
+    _worker_scorer((settings.INFERENCE_ENGINE, None), settings.MODEL_VERSION)
+
+
+def _worker_scorer(source: tuple, version: str):
+    from src.scoring.scorer import load_scorer
+    scorer = _worker_scorers.get((source, version))
+    if scorer is None:
+        scorer = load_scorer(*source)
+        scorer.set_nthread(settings.XGB_NTHREAD)
+        scorer.version = version
+        _worker_scorers[(source, version)] = scorer
+        while len(_worker_scorers) > _WORKER_MAX_MODELS:
+            _worker_scorers.pop(next(iter(_worker_scorers)))
+    return scorer
+
+
+def _call_in_worker(fn: Callable, source: tuple, version: str, args: tuple) -> Any:
+    return fn(_worker_scorer(source, version), *args)
+
+
+class InferenceExecutor:
+    """
+    Runs CPU-bound scoring off the event loop with bounded concurrency.
+
+    Backends:
+      - "threadpool": Starlette's shared default threadpool (no dedicated pool).
+      - "thread": a dedicated pool of `workers` threads.
+      - "process": `workers` processes, each loading the model once at start.
+
+    Work is submitted as `fn(scorer, *args)` where `fn` is a module-level
+    function, so the same call works in-process and in a worker process.
+    At most `max_pending` calls may be queued or running; beyond that
+    `run` raises Overloaded instead of letting latency grow unbounded.
+    """
+    def __init__(self, backend: str = "threadpool", workers: int = 1, max_pending: int = 64):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown INFERENCE_BACKEND '{backend}', expected one of {BACKENDS}")
+        self.backend = backend
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.rejected_total = 0
+        self._pool = None
+
+    def start(self):
+        if self.backend == "thread":
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="inference")
+        elif self.backend == "process":
+            overrides = {key: getattr(settings, key) for key in _WORKER_SETTINGS}
+            # spawn avoids forking a parent that already initialised OpenMP threads
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(overrides,),
+            )
+        logger.info(f"Inference backend: {self.backend} (workers={self.workers}, max_pending={self.max_pending})")
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    async def run(self, fn: Callable, scorer, *args) -> Any:
+        """
+        Runs fn(scorer, *args) on the configured backend. In process mode the
+        worker uses its own copy of the model, loaded (once) from `scorer.source`.
+        """
+        if self.pending >= self.max_pending:
+            self.rejected_total += 1
+            raise Overloaded(f"Inference queue full ({self.pending} pending)")
+        self.pending += 1
+        try:
+            if self.backend == "threadpool":
+                return await run_in_threadpool(fn, scorer, *args)
+            loop = asyncio.get_running_loop()
+            if self.backend == "thread":
+                return await loop.run_in_executor(self._pool, fn, scorer, *args)
+            if scorer.source is None:
+                raise ValueError("Process backend needs a scorer loaded from artifacts (load_scorer)")
+            return await loop.run_in_executor(self._pool, _call_in_worker, fn, scorer.source, scorer.version, args)
+        finally:
+            self.pending -= 1
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend,
+            "workers": self.workers,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "rejected_total": self.rejected_total,
+        }
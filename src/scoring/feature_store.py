@@ -0,0 +1,547 @@
+"""
+Local feature store: preprocessed model input rows keyed by account ID.
+
+    python -m src.scoring.feature_store build [accounts.csv] --id-column account_id
+    python -m src.scoring.feature_store upsert changed.csv --id-column account_id
+    python -m src.scoring.feature_store refresh
+    python -m src.scoring.feature_store stats
+
+`build` reads `load_data()` (or an input file), transforms every row once with
+the fitted preprocessor (PREPROCESSOR_SPEC_PATH) and writes FEATURE_STORE_DIR:
+
+- features.f32: float32 (capacity, n_outputs), the matrix the booster scores,
+- raw.f32: float32 (capacity, 23) input features, for drift/audit and `refresh`,
+- ids.i64: the account ID of each row,
+- index.keys.i64 / index.rows.i64: open-addressing hash table (linear probing,
+  at most half full) from account ID to row,
+- meta.json: row counts, capacities and the preprocessor spec with its fingerprint.
+
+Every array is memory-mapped, so opening a store of tens of millions of
+accounts reads nothing up front and a lookup touches a few pages: the hash
+slots, then the row. A single-account lookup returns a view of the mapped row.
+
+Upserts append rows. An account that already exists is pointed at its new row,
+and the old row stays on disk as stale until the next `build`. Rows are never
+overwritten in place, so readers take no lock and never see a half-written row.
+When the hash table passes half full it is rebuilt into new files and swapped in.
+Writers (the CLI and the service's upsert endpoint) serialize on an flock of
+`write.lock` in the store directory and re-read meta.json under it, so each
+appends after the other's rows. `build` and `refresh` swap the directory under
+the same lock; a process still holding the replaced store refuses to write
+until it reopens it (POST /admin/feature-store/reload). Accounts another
+process adds are visible to lookups at once, unless that upsert grew the hash
+table; then they show up after this process's next upsert or a reload.
+
+Stored rows are only valid for the preprocessor that produced them. The
+service refuses by-id scoring when the active model's preprocessor has a
+different fingerprint. After a retrain, `refresh` re-transforms the stored
+raw rows into a new store. Account IDs are non-negative 64-bit integers. When
+the input has no ID column, row i gets ID i + 1, which matches the UCI
+dataset's ID column.
+"""
+import argparse
+import contextlib
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from src.api.schemas import FEATURE_COLUMNS
+from src.scoring.engine import CompiledPreprocessor
+from src.utils.config import settings
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+EMPTY = -1
+MIN_CAPACITY = 1024
+LOCK_FILE = "write.lock"
+# Fibonacci hashing: multiply by 2^64 / golden ratio, keep the top bits
+_HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+class StoreReplaced(RuntimeError):
+    """Raised when writing to a store whose directory has been rebuilt by `build` or `refresh`."""
+
+
+@contextlib.contextmanager
+def _locked(directory: str):
+    """
+    Exclusive write lock on a store directory, shared by every process (no-op
+    while the directory does not exist yet).
+    """
+    if not os.path.isdir(directory):
+        yield
+        return
+    with open(os.path.join(directory, LOCK_FILE), "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def preprocessor_spec(scorer) -> dict | None:
+    """
+    The compiled preprocessor spec a scorer transforms requests with, or None if it cannot be compiled.
+    """
+    if hasattr(scorer, "compiled"):
+        return scorer.compiled.to_dict()
+    try:
+        return CompiledPreprocessor.from_column_transformer(scorer.preprocessor).to_dict()
+    except (AttributeError, ValueError):
+        return None
+
+
+def fingerprint(spec: dict) -> str:
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def _open_array(path: str, dtype, shape: tuple, create: bool = False) -> np.ndarray:
+    nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+    if create or os.path.getsize(path) < nbytes:
+        # Sparse on most filesystems; pages are allocated when written
+        with open(path, "r+b" if os.path.exists(path) and not create else "w+b") as f:
+            f.truncate(nbytes)
+    # Plain ndarray view of the mapping: indexing skips np.memmap's subclass overhead
+    return np.asarray(np.memmap(path, dtype=dtype, mode="r+", shape=shape))
+
+
+def _flush(*arrays: np.ndarray):
+    for array in arrays:
+        array.base.flush()
+
+
+def _table_bits(n_keys: int) -> int:
+    # Keeps the table at most half full
+    return max(int(np.log2(MIN_CAPACITY)), int(np.ceil(np.log2(max(2 * n_keys, 1)))))
+
+
+def _hash(ids: np.ndarray, bits: int) -> np.ndarray:
+    return ((ids.astype(np.uint64) * _HASH_MULTIPLIER) >> np.uint64(64 - bits)).astype(np.int64)
+
+
+def _probe(keys: np.ndarray, bits: int, ids: np.ndarray) -> np.ndarray:
+    """
+    Table position of each ID, or -1 when it is absent.
+    """
+    mask = (1 << bits) - 1
+    found = np.full(len(ids), -1, dtype=np.int64)
+    pos = _hash(ids, bits)
+    # Negative IDs are never stored (-1 marks empty slots)
+    pending = np.flatnonzero(ids >= 0)
+    while len(pending):
+        p = pos[pending]
+        k = keys[p]
+        hit = k == ids[pending]
+        found[pending[hit]] = p[hit]
+        pending = pending[~(hit | (k == EMPTY))]
+        pos[pending] = (pos[pending] + 1) & mask
+    return found
+
+
+def _probe_one(keys: np.ndarray, bits: int, account_id: int) -> int:
+    """
+    Scalar `_probe` for a single ID: plain integer arithmetic, no temporary arrays.
+    """
+    if account_id < 0:
+        return -1
+    mask = (1 << bits) - 1
+    pos = ((account_id * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> (64 - bits)
+    while True:
+        key = keys[pos]
+        if key == account_id:
+            return pos
+        if key == EMPTY:
+            return -1
+        pos = (pos + 1) & mask
+
+
+def _insert(keys: np.ndarray, rows: np.ndarray, bits: int, ids: np.ndarray, values: np.ndarray):
+    """
+    Inserts IDs known to be absent (and unique). Each round places the first
+    claimant of every empty slot; the others move on to the next slot. The row
+    is written before the key, so a concurrent reader never finds a key
+    without its row.
+    """
+    mask = (1 << bits) - 1
+    pos = _hash(ids, bits)
+    pending = np.arange(len(ids))
+    while len(pending):
+        p = pos[pending]
+        empty = keys[p] == EMPTY
+        slots, first = np.unique(p[empty], return_index=True)
+        winners = pending[empty][first]
+        rows[slots] = values[winners]
+        keys[slots] = ids[winners]
+        placed = np.zeros(len(ids), dtype=bool)
+        placed[winners] = True
+        pending = pending[~placed[pending]]
+        pos[pending] = (pos[pending] + 1) & mask
+
+
+class FeatureStore:
+    """
+    Memory-mapped, append-only rows plus a hash index. Any number of threads
+    can look up concurrently; upserts are serialized across threads and processes.
+    """
+    def __init__(self, directory: str | None = None):
+        self.directory = directory or settings.FEATURE_STORE_DIR
+        self._inode = os.stat(self.directory).st_ino
+        self.meta = self._read_meta()
+        if self.meta["format_version"] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported feature store format {self.meta['format_version']}")
+        self.preprocessor = CompiledPreprocessor.from_dict(self.meta["spec"])
+        self.fingerprint = self.meta["fingerprint"]
+        self._open_rows(self.meta["capacity"])
+        self._table = self._open_table(self.meta["table_bits"])
+        self._write_lock = threading.Lock()
+        self._count_lock = threading.Lock()
+        self._counts = {"hits": 0, "misses": 0, "inserted": 0, "updated": 0}
+        self._compatible = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def create(cls, directory: str, preprocessor: CompiledPreprocessor, capacity: int = MIN_CAPACITY,
+               expected_accounts: int = 0) -> "FeatureStore":
+        """
+        Writes an empty store sized for `capacity` rows and `expected_accounts` keys.
+        """
+        os.makedirs(directory, exist_ok=True)
+        spec = preprocessor.to_dict()
+        meta = {
+            "format_version": FORMAT_VERSION,
+            "n_outputs": preprocessor.n_outputs,
+            "feature_names": preprocessor.feature_names,
+            "capacity": max(capacity, MIN_CAPACITY),
+            "table_bits": _table_bits(expected_accounts),
+            "n_rows": 0,
+            "n_accounts": 0,
+            "spec": spec,
+            "fingerprint": fingerprint(spec),
+            "updated_at": time.time(),
+        }
+        for name in ("features.f32", "raw.f32", "ids.i64", "index.keys.i64", "index.rows.i64"):
+            open(os.path.join(directory, name), "wb").close()
+        cls._write_meta(directory, meta)
+        store = cls(directory)
+        store._table[0][:] = EMPTY
+        _flush(store._table[0])
+        return store
+
+    def _read_meta(self) -> dict:
+        with open(os.path.join(self.directory, "meta.json")) as f:
+            return json.load(f)
+
+    def _sync(self):
+        """
+        Picks up rows and index files written by another process (callers hold
+        the write lock, or only need to see rows that already exist).
+        """
+        meta = self._read_meta()
+        if meta["n_rows"] == self.meta["n_rows"] and meta["table_bits"] == self.meta["table_bits"]:
+            return
+        if meta["capacity"] != self.meta["capacity"]:
+            self._open_rows(meta["capacity"])
+        if meta["table_bits"] != self.meta["table_bits"]:
+            self._table = self._open_table(meta["table_bits"])
+        self.meta = meta
+
+    @staticmethod
+    def _write_meta(directory: str, meta: dict):
+        path = os.path.join(directory, "meta.json")
+        with open(path + ".tmp", "w") as f:
+            json.dump(meta, f)
+        os.replace(path + ".tmp", path)
+
+    def _open_rows(self, capacity: int):
+        # New references are assigned only after the files have grown, so readers
+        # holding the previous mappings keep working
+        self._features = _open_array(os.path.join(self.directory, "features.f32"), np.float32,
+                                     (capacity, self.meta["n_outputs"]))
+        self._raw = _open_array(os.path.join(self.directory, "raw.f32"), np.float32, (capacity, len(FEATURE_COLUMNS)))
+        self._ids = _open_array(os.path.join(self.directory, "ids.i64"), np.int64, (capacity,))
+
+    def _open_table(self, bits: int, suffix: str = "") -> tuple[np.ndarray, np.ndarray, int]:
+        keys = _open_array(os.path.join(self.directory, "index.keys.i64" + suffix), np.int64, (1 << bits,), create=bool(suffix))
+        rows = _open_array(os.path.join(self.directory, "index.rows.i64" + suffix), np.int64, (1 << bits,), create=bool(suffix))
+        return keys, rows, bits
+
+    @property
+    def n_accounts(self) -> int:
+        return self.meta["n_accounts"]
+
+    def lookup(self, account_ids) -> np.ndarray:
+        """
+        Row number of each account, -1 for unknown accounts.
+        """
+        keys, rows, bits = self._table
+        if len(account_ids) == 1:
+            pos = _probe_one(keys, bits, int(account_ids[0]))
+            with self._count_lock:
+                self._counts["hits" if pos >= 0 else "misses"] += 1
+            return np.array([rows[pos] if pos >= 0 else -1], dtype=np.int64)
+        ids = np.asarray(account_ids, dtype=np.int64).reshape(-1)
+        pos = _probe(keys, bits, ids)
+        found = pos >= 0
+        result = np.full(len(ids), -1, dtype=np.int64)
+        result[found] = rows[pos[found]]
+        with self._count_lock:
+            self._counts["hits"] += int(found.sum())
+            self._counts["misses"] += int(len(ids) - found.sum())
+        return result
+
+    def view(self, row: int) -> np.ndarray:
+        """
+        One transformed row as a (1, n_outputs) view of the mapped file (no copy).
+        """
+        if row >= len(self._features):
+            # Appended by another process past the capacity mapped here
+            self._sync()
+        return self._features[row:row + 1]
+
+    def get(self, account_id: int) -> np.ndarray | None:
+        [row] = self.lookup([account_id])
+        return None if row < 0 else self.view(row)
+
+    def features(self, rows: np.ndarray) -> np.ndarray:
+        """
+        Gathers rows (all known) into one contiguous float32 matrix.
+        """
+        rows = np.asarray(rows)
+        if len(rows) and rows.max() >= len(self._features):
+            self._sync()
+        return self._features[rows]
+
+    def raw_frame(self, rows: np.ndarray) -> pd.DataFrame:
+        rows = np.asarray(rows)
+        if len(rows) and rows.max() >= len(self._raw):
+            self._sync()
+        return pd.DataFrame(self._raw[rows], columns=FEATURE_COLUMNS)
+
+    def compatible(self, scorer) -> bool:
+        """
+        True if `scorer` transforms requests exactly as the stored rows were transformed.
+        """
+        result = self._compatible.get(scorer)
+        if result is None:
+            spec = preprocessor_spec(scorer)
+            result = spec is not None and fingerprint(spec) == self.fingerprint
+            self._compatible[scorer] = result
+        return result
+
+    def upsert(self, account_ids, raw) -> dict:
+        """
+        Transforms and appends the given accounts' raw features (rows in
+        FEATURE_COLUMNS order); existing accounts are pointed at their new row.
+        If an ID repeats, its last row wins. Raises StoreReplaced if the
+        directory has been rebuilt since this store was opened.
+        """
+        ids = np.asarray(account_ids, dtype=np.int64).reshape(-1)
+        raw = np.asarray(raw, dtype=np.float64).reshape(len(ids), len(FEATURE_COLUMNS))
+        if len(ids) and ids.min() < 0:
+            raise ValueError("Account IDs must be non-negative")
+        _, last = np.unique(ids[::-1], return_index=True)
+        keep = np.sort(len(ids) - 1 - last)
+        ids, raw = ids[keep], raw[keep]
+        transformed = self.preprocessor.transform(raw)
+
+        with self._write_lock, _locked(self.directory):
+            try:
+                replaced = os.stat(self.directory).st_ino != self._inode
+            except FileNotFoundError:
+                replaced = True
+            if replaced:
+                raise StoreReplaced(f"{self.directory} was rebuilt; reopen the feature store before writing")
+            # Another process may have appended or rehashed since our last write
+            self._sync()
+            start = self.meta["n_rows"]
+            end = start + len(ids)
+            if end > self.meta["capacity"]:
+                self.meta["capacity"] = max(end, 2 * self.meta["capacity"])
+                self._open_rows(self.meta["capacity"])
+            self._features[start:end] = transformed
+            self._raw[start:end] = raw
+            self._ids[start:end] = ids
+            new_rows = np.arange(start, end, dtype=np.int64)
+            # Commit the rows before any key points at them: a write cut short here
+            # leaves unreferenced rows, never keys past n_rows that the next append would overwrite
+            _flush(self._features, self._raw, self._ids)
+            self.meta.update(n_rows=end, updated_at=time.time())
+            self._write_meta(self.directory, self.meta)
+
+            keys, rows, bits = self._table
+            pos = _probe(keys, bits, ids)
+            existing = pos >= 0
+            n_new = int((~existing).sum())
+            # Repointing an existing key is one aligned 8-byte store
+            rows[pos[existing]] = new_rows[existing]
+            if 2 * (self.meta["n_accounts"] + n_new) > (1 << bits):
+                self._rehash(_table_bits(self.meta["n_accounts"] + n_new))
+                keys, rows, bits = self._table
+            _insert(keys, rows, bits, ids[~existing], new_rows[~existing])
+
+            _flush(keys, rows)
+            self.meta.update(n_accounts=self.meta["n_accounts"] + n_new, table_bits=bits,
+                             updated_at=time.time())
+            self._write_meta(self.directory, self.meta)
+        with self._count_lock:
+            self._counts["inserted"] += n_new
+            self._counts["updated"] += len(ids) - n_new
+        return {"inserted": n_new, "updated": len(ids) - n_new}
+
+    def _rehash(self, bits: int):
+        old_keys, old_rows, _ = self._table
+        keys, rows, _ = self._open_table(bits, suffix=".tmp")
+        keys[:] = EMPTY
+        live = np.flatnonzero(old_keys != EMPTY)
+        _insert(keys, rows, bits, old_keys[live], old_rows[live])
+        _flush(keys, rows)
+        for name in ("index.keys.i64", "index.rows.i64"):
+            os.replace(os.path.join(self.directory, name + ".tmp"), os.path.join(self.directory, name))
+        self._table = (keys, rows, bits)
+        logger.info(f"Feature store index grown to {1 << bits} slots")
+
+    def live_rows(self) -> np.ndarray:
+        """
+        The current row of every account, in row order.
+        """
+        keys, rows, _ = self._table
+        return np.sort(rows[keys != EMPTY])
+
+    def stats(self) -> dict:
+        with self._count_lock:
+            counts = dict(self._counts)
+        keys, _, bits = self._table
+        return {
+            **counts,
+            "directory": self.directory,
+            "accounts": self.meta["n_accounts"],
+            "rows": self.meta["n_rows"],
+            "stale_rows": self.meta["n_rows"] - self.meta["n_accounts"],
+            "capacity": self.meta["capacity"],
+            "index_slots": 1 << bits,
+            "fingerprint": self.fingerprint,
+        }
+
+
+def _swap_directory(tmp: str, directory: str):
+    # Callers hold the old directory's write lock. A running service keeps
+    # reading the old files until it reloads, and refuses to write to them.
+    if os.path.exists(directory):
+        shutil.rmtree(directory)
+    os.replace(tmp, directory)
+
+
+def build(df: pd.DataFrame, preprocessor: CompiledPreprocessor, directory: str | None = None,
+          ids: np.ndarray | None = None, chunk_size: int = 1_000_000) -> FeatureStore:
+    """
+    Writes a new store from `df` (FEATURE_COLUMNS; account IDs in `ids`,
+    default row number + 1) into a temporary directory and swaps it in.
+    """
+    directory = directory or settings.FEATURE_STORE_DIR
+    tmp = directory.rstrip("/") + ".building"
+    if os.path.exists(tmp):
+        shutil.rmtree(tmp)
+    ids = np.arange(1, len(df) + 1, dtype=np.int64) if ids is None else np.asarray(ids, dtype=np.int64)
+    store = FeatureStore.create(tmp, preprocessor, capacity=len(df), expected_accounts=len(df))
+    for start in range(0, len(df), chunk_size):
+        chunk = df.iloc[start:start + chunk_size]
+        store.upsert(ids[start:start + chunk_size], chunk[FEATURE_COLUMNS].to_numpy(dtype=np.float64))
+        logger.info(f"Feature store: {min(start + chunk_size, len(df))}/{len(df)} rows")
+    with _locked(directory):
+        _swap_directory(tmp, directory)
+    return FeatureStore(directory)
+
+
+def refresh(preprocessor: CompiledPreprocessor, directory: str | None = None,
+            chunk_size: int = 1_000_000) -> FeatureStore:
+    """
+    Rebuilds the store for a new preprocessor from its own live raw rows (stale rows are dropped).
+    """
+    old = FeatureStore(directory)
+    # Held throughout, so no upsert lands in the old store after its rows are read
+    with _locked(old.directory):
+        old._sync()
+        live = old.live_rows()
+        tmp = old.directory.rstrip("/") + ".building"
+        if os.path.exists(tmp):
+            shutil.rmtree(tmp)
+        store = FeatureStore.create(tmp, preprocessor, capacity=len(live), expected_accounts=len(live))
+        for start in range(0, len(live), chunk_size):
+            rows = live[start:start + chunk_size]
+            store.upsert(old._ids[rows], old._raw[rows])
+        _swap_directory(tmp, old.directory)
+    return FeatureStore(old.directory)
+
+
+def _load_spec(path: str | None = None) -> CompiledPreprocessor:
+    with open(path or settings.PREPROCESSOR_SPEC_PATH) as f:
+        return CompiledPreprocessor.from_dict(json.load(f))
+
+
+def read_accounts(path: str, id_column: str | None = None) -> tuple[pd.DataFrame, np.ndarray | None]:
+    """
+    Reads an accounts file (.csv, .xls(x), .parquet or .jsonl) into the
+    training schema. The ID column is taken out before normalize_columns,
+    which drops "id".
+    """
+    lowered = path.lower()
+    if lowered.endswith(".parquet"):
+        df = pd.read_parquet(path)
+    elif lowered.endswith((".jsonl", ".ndjson", ".json")):
+        df = pd.read_json(path, lines=True)
+    elif lowered.endswith(".csv"):
+        df = pd.read_csv(path)
+    else:
+        df = pd.read_excel(path, header=1)
+    # Imported here so serving, which imports this module, does not pull in the training package
+    from src.training.data_loader import normalize_columns
+    ids = df.pop(id_column).to_numpy(dtype=np.int64) if id_column else None
+    return normalize_columns(df), ids
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["build", "upsert", "refresh", "stats"])
+    parser.add_argument("input", nargs="?", help="Accounts file (.csv, .xls(x), .parquet, .jsonl); build defaults to load_data()")
+    parser.add_argument("--id-column", default=None,
+                        help="Account ID column, e.g. ID (required for upsert; build defaults to row number + 1)")
+    parser.add_argument("--directory", default=None, help="Store directory (default: FEATURE_STORE_DIR)")
+    parser.add_argument("--spec", default=None, help="Preprocessor spec (default: PREPROCESSOR_SPEC_PATH)")
+    parser.add_argument("--chunk-size", type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    start = time.perf_counter()
+    if args.command == "build":
+        if args.input:
+            df, ids = read_accounts(args.input, args.id_column)
+        else:
+            from src.training.data_loader import load_data
+            df, ids = load_data(), None
+        store = build(df, _load_spec(args.spec), args.directory, ids, args.chunk_size)
+    elif args.command == "upsert":
+        if not args.input or not args.id_column:
+            parser.error("upsert needs an input file and --id-column")
+        df, ids = read_accounts(args.input, args.id_column)
+        store = FeatureStore(args.directory)
+        for chunk_start in range(0, len(df), args.chunk_size):
+            chunk = slice(chunk_start, chunk_start + args.chunk_size)
+            store.upsert(ids[chunk], df[FEATURE_COLUMNS].iloc[chunk].to_numpy(dtype=np.float64))
+    elif args.command == "refresh":
+        store = refresh(_load_spec(args.spec), args.directory, args.chunk_size)
+    else:
+        store = FeatureStore(args.directory)
+    print(json.dumps({**store.stats(), "seconds": time.perf_counter() - start}, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from starlette.concurrency import run_in_threadpool
+
+from src.api.schemas import PredictionRequest
+from src.scoring.scorer import BaseScorer, load_scorer
+from src.utils.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Plausible applicant used to pre-warm a model before it takes traffic
+_WARMUP_ROW = {
+    "limit_bal": 50000.0, "sex": 2, "education": 2, "marriage": 1, "age": 35,
+    **{f"pay_{i}": 0 for i in range(1, 7)},
+    **{f"bill_amt{i}": 20000.0 for i in range(1, 7)},
+    **{f"pay_amt{i}": 2000.0 for i in range(1, 7)},
+}
+
+
+def warmup(scorer: BaseScorer, n_rows: int = 8):
+    """
+    Runs the single-row, batch and explanation paths once so the first real
+    request does not pay for lazy initialisation (buffers, booster caches).
+    """
+    requests = [PredictionRequest(**_WARMUP_ROW)] * n_rows
+    scorer.score(scorer.features_from_requests(requests[:1]))
+    scorer.score(scorer.features_from_requests(requests), top_k=1)
+
+
+class ModelRegistry:
+    """
+    Holds several loaded model versions and which one is active (serving) or
+    shadow (scored off the request path for comparison).
+
+    Swapping the active version is a single reference assignment under a lock,
+    so in-flight requests finish on the model they started with and new
+    requests see the new one. Listeners (e.g. the prediction cache) are called
+    after every activation.
+    """
+    def __init__(self, max_versions: int = 3):
+        self.max_versions = max_versions
+        self._models: dict[str, BaseScorer] = {}
+        self._loaded_at: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._listeners: list[Callable[[str | None, str], None]] = []
+        self.active_version: str | None = None
+        self.shadow_version: str | None = None
+
+    @property
+    def active(self) -> BaseScorer | None:
+        return self._models.get(self.active_version)
+
+    @property
+    def shadow(self) -> BaseScorer | None:
+        return self._models.get(self.shadow_version) if self.shadow_version else None
+
+    def __contains__(self, version: str) -> bool:
+        return version in self._models
+
+    def add_listener(self, listener: Callable[[str | None, str], None]):
+        self._listeners.append(listener)
+
+    def register(self, version: str, scorer: BaseScorer, warm: bool = True) -> BaseScorer:
+        """
+        Adds a new version. Labels are never reused for another model: caches
+        and drift references are keyed by version, and replacing the active
+        model under the same label would bypass activation.
+        """
+        self._check_new(version)
+        scorer.version = version
+        if warm:
+            warmup(scorer)
+        with self._lock:
+            self._check_new(version)
+            self._models[version] = scorer
+            self._loaded_at[version] = time.time()
+            self._evict_locked(keep=version)
+        logger.info(f"Registered model version {version}")
+        return scorer
+
+    def load(self, version: str, engine: str | None = None, model_dir: str | None = None) -> BaseScorer:
+        """
+        Loads artifacts (default paths or a versioned `model_dir`), pre-warms and registers them.
+        Does not activate.
+        """
+        self._check_new(version)
+        scorer = load_scorer(engine, model_dir)
+        scorer.set_nthread(settings.XGB_NTHREAD)
+        return self.register(version, scorer)
+
+    def activate(self, version: str):
+        with self._lock:
+            if version not in self._models:
+                raise KeyError(f"Unknown model version '{version}'")
+            previous, self.active_version = self.active_version, version
+            if self.shadow_version == version:
+                self.shadow_version = None
+        logger.info(f"Activated model version {version} (previous: {previous})")
+        for listener in self._listeners:
+            listener(previous, version)
+
+    def set_shadow(self, version: str | None):
+        with self._lock:
+            if version is not None and version not in self._models:
+                raise KeyError(f"Unknown model version '{version}'")
+            if version is not None and version == self.active_version:
+                raise ValueError("The active version cannot also be the shadow")
+            self.shadow_version = version
+
+    def remove(self, version: str):
+        with self._lock:
+            if version in (self.active_version, self.shadow_version):
+                raise ValueError(f"Version '{version}' is active or shadow and cannot be removed")
+            self._models.pop(version, None)
+            self._loaded_at.pop(version, None)
+
+    def _check_new(self, version: str):
+        if version in self._models:
+            raise ValueError(f"Model version '{version}' is already loaded; remove it or use a new label")
+
+    def _evict_locked(self, keep: str | None = None):
+        # Drop the oldest versions that are neither active, shadow nor just registered
+        candidates = sorted(
+            (v for v in self._models if v not in (self.active_version, self.shadow_version, keep)),
+            key=self._loaded_at.get,
+        )
+        while len(self._models) > self.max_versions and candidates:
+            victim = candidates.pop(0)
+            del self._models[victim]
+            del self._loaded_at[victim]
+            logger.info(f"Evicted model version {victim}")
+
+    def describe(self) -> dict:
+        with self._lock:
+            return {
+                "active": self.active_version,
+                "shadow": self.shadow_version,
+                "versions": [
+                    {"version": v, "engine": s.source[0] if s.source else None,
+                     "model_dir": s.source[1] if s.source else None, "loaded_at": self._loaded_at[v]}
+                    for v, s in self._models.items()
+                ],
+            }
+
+
+class ShadowRunner:
+    """
+    Scores the registry's shadow model on a dedicated thread after the caller
+    has been answered, and tracks agreement with the active model. When more
+    than `max_pending` shadow jobs are queued, new ones are dropped (and counted)
+    rather than building up memory or CPU debt.
+    """
+    def __init__(self, registry: ModelRegistry, max_pending: int = 256):
+        self.registry = registry
+        self.max_pending = max_pending
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shadow")
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.scored = 0
+        self.dropped = 0
+        self.errors = 0
+        self.label_disagreements = 0
+        self.abs_diff_sum = 0.0
+        self.latency_sum = 0.0
+
+    def submit(self, requests: list[PredictionRequest], active_probs: list[float], active_labels: list[int]):
+        scorer = self.registry.shadow
+        if scorer is None:
+            return
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.dropped += len(requests)
+                return
+            self.pending += 1
+        self._pool.submit(self._score, scorer, requests, active_probs, active_labels)
+
+    def _score(self, scorer: BaseScorer, requests: list[PredictionRequest], active_probs: list[float],
+               active_labels: list[int]):
+        try:
+            start = time.perf_counter()
+            result = scorer.score(scorer.features_from_requests(requests))
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.scored += len(requests)
+                self.latency_sum += elapsed
+                self.label_disagreements += sum(int(a != b) for a, b in zip(active_labels, result.labels))
+                self.abs_diff_sum += float(sum(abs(a - b) for a, b in zip(active_probs, result.probabilities)))
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+            logger.warning(f"Shadow scoring with {scorer.version} failed: {e}")
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "shadow_version": self.registry.shadow_version,
+                "scored": self.scored,
+                "dropped": self.dropped,
+                "errors": self.errors,
+                "pending": self.pending,
+                "label_disagreement_rate": self.label_disagreements / self.scored if self.scored else 0.0,
+                "mean_abs_probability_diff": self.abs_diff_sum / self.scored if self.scored else 0.0,
+            }
+
+
+def watched_artifact_path(engine: str | None = None) -> str:
+    """
+    File whose modification signals a new model: the booster for the compiled
+    engine (written last by the export step), the pipeline pickle otherwise.
+    """
+    engine = engine or settings.INFERENCE_ENGINE
+    return settings.BOOSTER_PATH if engine == "compiled" else settings.MODEL_PATH
+
+
+class ModelFileWatcher:
+    """
+    Polls the model artifact and hot-swaps in a new version when it changes.
+    A change is only acted on once the file's mtime/size have been stable for
+    one interval, so a half-written artifact is never loaded; a failed load
+    keeps the current model serving.
+    """
+    def __init__(self, registry: ModelRegistry, path: str, interval_seconds: float = 10.0):
+        self.registry = registry
+        self.path = path
+        self.interval = interval_seconds
+        self._task: asyncio.Task | None = None
+        self._loaded_signature = self._signature()
+
+    def _signature(self) -> tuple | None:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        pending = None
+        while True:
+            await asyncio.sleep(self.interval)
+            signature = self._signature()
+            if signature is None or signature == self._loaded_signature:
+                pending = None
+                continue
+            if signature != pending:
+                # Changed since last poll; wait for it to settle
+                pending = signature
+                continue
+            # Nanosecond mtime: two writes within the same second still get distinct labels
+            version = f"auto-{signature[0]}"
+            try:
+                if version not in self.registry:
+                    await run_in_threadpool(self.registry.load, version)
+                self.registry.activate(version)
+            except Exception as e:
+                # The signature is not recorded, so the load is retried once the file is stable again
+                logger.error(f"Hot reload of {self.path} failed, keeping {self.registry.active_version}: {e}")
+            else:
+                self._loaded_signature = signature
+            pending = None
@@ -0,0 +1,194 @@
+import logging
+import os
+from abc import ABC, abstractmethod
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+from src.api.schemas import FEATURE_COLUMNS
+from src.explainability.shap_utils import get_feature_names
+from src.scoring.early_exit import EarlyExitConfig, load_early_exit, predict_early_exit
+from src.utils.config import settings
+from src.utils.metrics import EARLY_EXIT_ROWS, TREES_EVALUATED
+from src.utils.timing import StageTimer
+
+logger = logging.getLogger(__name__)
+
+
+class ScoreResult(NamedTuple):
+    probabilities: np.ndarray
+    labels: np.ndarray
+    # Per-row (shap_values, top_features), None unless explanations were requested
+    explanations: list[tuple[dict[str, float], list[str]]] | None = None
+
+
+class BaseScorer(ABC):
+    """
+    Shared scoring flow: transform once, run the classifier once, derive the
+    label from the probability and optionally explain from the same matrix.
+    Subclasses provide transform, predict_proba and contributions.
+    """
+    feature_names: list[str] = []
+    # Identifies the loaded model (cache keys, logs); replaced by the registry's version label
+    version: str = settings.VERSION
+    # (engine, model_dir) the scorer was loaded from; None when built in-process
+    source: tuple[str, str | None] | None = None
+    # Set when early-exit scoring is enabled (XGBoost models only)
+    early_exit: EarlyExitConfig | None = None
+    booster: xgb.Booster | None = None
+
+    def __init__(self, threshold: float | None = None):
+        self.threshold = settings.DECISION_THRESHOLD if threshold is None else threshold
+
+    @abstractmethod
+    def features_from_requests(self, requests):
+        """
+        Builds the model input for a list of PredictionRequest objects.
+        """
+
+    @abstractmethod
+    def transform(self, features) -> np.ndarray:
+        ...
+
+    @abstractmethod
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        ...
+
+    @abstractmethod
+    def contributions(self, X: np.ndarray) -> np.ndarray:
+        ...
+
+    def set_nthread(self, nthread: int):
+        """
+        Pins the number of threads XGBoost uses per prediction call.
+        """
+
+    def predict_proba_early_exit(self, X: np.ndarray) -> np.ndarray:
+        """
+        Scores with a prefix of the trees and finishes only rows near the threshold.
+        """
+        probs, trees = predict_early_exit(self.booster, X, self.early_exit)
+        finished = int((trees == self.early_exit.n_trees).sum())
+        EARLY_EXIT_ROWS.inc(len(trees) - finished, outcome="exited", model_version=self.version)
+        EARLY_EXIT_ROWS.inc(finished, outcome="full", model_version=self.version)
+        TREES_EVALUATED.inc(int(trees.sum()), model_version=self.version)
+        return probs
+
+    def label(self, probs: np.ndarray) -> np.ndarray:
+        return (probs >= self.threshold).astype(int)
+
+    def explain(self, X: np.ndarray, top_k: int) -> list[tuple[dict[str, float], list[str]]]:
+        """
+        Returns a (shap_values, top_features) pair per row, top features ranked by |contribution|.
+        """
+        contribs = self.contributions(X)
+        k = min(top_k, contribs.shape[1])
+        top_idx = np.argsort(-np.abs(contribs), axis=1)[:, :k]
+        names = self.feature_names
+        return [
+            (dict(zip(names, row.tolist())), [names[i] for i in idx])
+            for row, idx in zip(contribs, top_idx)
+        ]
+
+    def score(self, features, timer: StageTimer | None = None, top_k: int = 0) -> ScoreResult:
+        """
+        Scores every row in `features`. Explanations are only computed when top_k > 0.
+        """
+        timer = timer or StageTimer()
+        with timer.stage("transform"):
+            X = self.transform(features)
+        return self.score_transformed(X, timer, top_k)
+
+    def score_transformed(self, X: np.ndarray, timer: StageTimer | None = None, top_k: int = 0) -> ScoreResult:
+        """
+        Scores rows already in the model's input space (e.g. from the feature store).
+        Explained requests always use the full ensemble, so the SHAP values add
+        up to the returned probability.
+        """
+        timer = timer or StageTimer()
+        with timer.stage("model"):
+            early_exit = self.early_exit is not None and top_k == 0
+            probs = self.predict_proba_early_exit(X) if early_exit else self.predict_proba(X)
+        explanations = None
+        if top_k > 0:
+            with timer.stage("explain"):
+                explanations = self.explain(X, top_k)
+        return ScoreResult(probs, self.label(probs), explanations)
+
+
+class Scorer(BaseScorer):
+    """
+    Wraps the fitted sklearn pipeline so that each request (or batch) runs the
+    preprocessor once and the classifier once. The label is derived from the
+    probability instead of calling pipeline.predict a second time.
+    """
+    def __init__(self, pipeline, threshold: float | None = None):
+        super().__init__(threshold)
+        self.pipeline = pipeline
+        self.preprocessor = pipeline.named_steps['preprocessor']
+        self.model = pipeline.named_steps['classifier']
+        # Resolved once here rather than per request
+        self.feature_names = [str(name) for name in get_feature_names(self.preprocessor)]
+        self.booster = self.model.get_booster() if hasattr(self.model, "get_booster") else None
+
+    def features_from_requests(self, requests) -> pd.DataFrame:
+        return pd.DataFrame([r.model_dump() for r in requests], columns=FEATURE_COLUMNS)
+
+    def transform(self, features) -> np.ndarray:
+        if not hasattr(features, "columns"):
+            features = pd.DataFrame(features, columns=FEATURE_COLUMNS)
+        return self.preprocessor.transform(features)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        return self.model.predict_proba(X)[:, 1]
+
+    def set_nthread(self, nthread: int):
+        if hasattr(self.model, "get_booster"):
+            self.model.set_params(n_jobs=nthread)
+
+    def contributions(self, X: np.ndarray) -> np.ndarray:
+        """
+        Exact TreeSHAP contributions from XGBoost's native pred_contribs output,
+        one column per transformed feature (the bias column is dropped).
+        """
+        if self.booster is None:
+            raise ValueError("Explanations require an XGBoost classifier")
+        contribs = self.booster.predict(xgb.DMatrix(X, feature_names=self.booster.feature_names), pred_contribs=True)
+        return contribs[:, :-1]
+
+
+def load_scorer(engine: str | None = None, model_dir: str | None = None) -> BaseScorer:
+    """
+    Loads the configured inference engine: "pipeline" (joblib sklearn pipeline)
+    or "compiled" (NumPy preprocessor spec + native booster).
+    By default artifacts come from the paths in settings; `model_dir` points at a
+    versioned directory holding model.pkl / preprocessor_spec.json / booster.ubj.
+    """
+    engine = engine or settings.INFERENCE_ENGINE
+    model_path, spec_path, booster_path = settings.MODEL_PATH, settings.PREPROCESSOR_SPEC_PATH, settings.BOOSTER_PATH
+    early_exit_path = settings.EARLY_EXIT_PATH
+    if model_dir is not None:
+        model_path = os.path.join(model_dir, os.path.basename(model_path))
+        spec_path = os.path.join(model_dir, os.path.basename(spec_path))
+        booster_path = os.path.join(model_dir, os.path.basename(booster_path))
+        early_exit_path = os.path.join(model_dir, os.path.basename(early_exit_path))
+
+    if engine == "compiled":
+        from src.scoring.engine import CompiledScorer
+        scorer = CompiledScorer.load(spec_path, booster_path)
+    elif engine == "pipeline":
+        import joblib
+        scorer = Scorer(joblib.load(model_path))
+    else:
+        raise ValueError(f"Unknown INFERENCE_ENGINE '{engine}'")
+    if settings.EARLY_EXIT_ENABLED and scorer.booster is not None and os.path.exists(early_exit_path):
+        config = load_early_exit(early_exit_path)
+        if config.matches(scorer.booster, scorer.threshold):
+            scorer.early_exit = config
+        else:
+            logger.warning(f"Ignoring {early_exit_path}: calibrated for a different ensemble or threshold")
+    # Lets process workers load the same artifacts as the parent
+    scorer.source = (engine, model_dir)
+    return scorer
@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+
+from src.api.codecs import JSON, encode_batch
+from src.api.schemas import PredictionRequest, PredictionResponse, validate_frame
+from src.scoring.scorer import BaseScorer
+from src.utils.timing import StageTimer
+
+
+def score_requests(scorer: BaseScorer, items: list[tuple[PredictionRequest, int]]) -> list[tuple[PredictionResponse, StageTimer]]:
+    """
+    Scores (request, top_k) pairs as one matrix. Used directly for a single
+    request and as the micro-batcher's score function.
+    """
+    timer = StageTimer()
+    features = scorer.features_from_requests([req for req, _ in items])
+    result = scorer.score(features, timer, top_k=max(k for _, k in items))
+
+    responses = []
+    for i, (_, k) in enumerate(items):
+        shap_dict, top_feats = None, None
+        if k and result.explanations:
+            shap_dict, top_feats = result.explanations[i]
+            top_feats = top_feats[:k]
+        response = PredictionResponse(
+            default_probability=float(result.probabilities[i]),
+            is_default=int(result.labels[i]),
+            shap_values=shap_dict,
+            top_features=top_feats
+        )
+        responses.append((response, timer.copy() if len(items) > 1 else timer))
+    return responses
+
+
+def score_batch(scorer: BaseScorer, raw_df: pd.DataFrame, decode_errors: dict[int, list[str]], top_k: int = 0,
+                media_type: str = JSON) -> tuple[bytes, StageTimer, np.ndarray]:
+    """
+    Validates all rows at once, then scores the valid ones in a single pass.
+    Returns the BatchPredictionResponse encoded as `media_type`, the stage
+    timings and the probability per input row (NaN for rows that failed).
+    """
+    timer = StageTimer()
+    with timer.stage("validate"):
+        features, row_errors = validate_frame(raw_df)
+        # Decoding errors (malformed line, non-object row) are more useful than "field required"
+        row_errors.update(decode_errors)
+        features = features.drop(index=[pos for pos in decode_errors if pos in features.index])
+
+    positions = features.index.to_numpy(dtype=np.int64)
+    probabilities = np.full(len(raw_df), np.nan)
+    if len(features):
+        result = scorer.score(features, timer, top_k=top_k)
+        probabilities[positions] = result.probabilities
+        labels, explanations = result.labels, result.explanations
+    else:
+        labels, explanations = np.empty(0, dtype=np.int64), None
+
+    with timer.stage("serialize"):
+        body = encode_batch(len(raw_df), positions, probabilities[positions], labels, explanations,
+                            row_errors, media_type)
+    return body, timer, probabilities
+
+
+def score_account_row(scorer: BaseScorer, X: np.ndarray, top_k: int = 0) -> tuple[PredictionResponse, StageTimer]:
+    """
+    Scores one feature-store row (already transformed) for /predict/by-id.
+    """
+    timer = StageTimer()
+    result = scorer.score_transformed(X, timer, top_k=top_k)
+    shap_dict, top_feats = result.explanations[0] if result.explanations else (None, None)
+    response = PredictionResponse(
+        default_probability=float(result.probabilities[0]),
+        is_default=int(result.labels[0]),
+        shap_values=shap_dict,
+        top_features=top_feats
+    )
+    return response, timer
+
+
+def score_account_rows(scorer: BaseScorer, X: np.ndarray, n_rows: int, positions: np.ndarray,
+                       row_errors: dict[int, list[str]], top_k: int = 0,
+                       media_type: str = JSON) -> tuple[bytes, StageTimer, np.ndarray]:
+    """
+    Scores feature-store rows for /predict/by-id/batch: `X` holds the rows of
+    the found accounts at `positions`, the others are reported in `row_errors`.
+    Returns the same (body, timings, probability per position) as score_batch.
+    """
+    timer = StageTimer()
+    probabilities = np.full(n_rows, np.nan)
+    if len(X):
+        result = scorer.score_transformed(X, timer, top_k=top_k)
+        probabilities[positions] = result.probabilities
+        labels, explanations = result.labels, result.explanations
+    else:
+        labels, explanations = np.empty(0, dtype=np.int64), None
+
+    with timer.stage("serialize"):
+        body = encode_batch(n_rows, positions, probabilities[positions], labels, explanations,
+                            row_errors, media_type)
+    return body, timer, probabilities
@@ -2,42 +2,80 @@ import pandas as pd
 from ucimlrepo import fetch_ucirepo
 from src.utils.config import settings
 from src.training.mock_data import generate_synthetic_data
+from src.training.dataset_cache import load_cached
 import logging
 import os
 
 logger = logging.getLogger(__name__)
 
+# Mapping for raw UCI columns (X1...X23)
+UCI_COLUMN_MAPPING = {
+    'X1': 'limit_bal',
+    'X2': 'sex',
+    'X3': 'education',
+    'X4': 'marriage',
+    'X5': 'age',
+    'X6': 'pay_1',
+    'X7': 'pay_2',
+    'X8': 'pay_3',
+    'X9': 'pay_4',
+    'X10': 'pay_5',
+    'X11': 'pay_6',
+    'X12': 'bill_amt1',
+    'X13': 'bill_amt2',
+    'X14': 'bill_amt3',
+    'X15': 'bill_amt4',
+    'X16': 'bill_amt5',
+    'X17': 'bill_amt6',
+    'X18': 'pay_amt1',
+    'X19': 'pay_amt2',
+    'X20': 'pay_amt3',
+    'X21': 'pay_amt4',
+    'X22': 'pay_amt5',
+    'X23': 'pay_amt6'
+}
+
+def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Brings either source layout (raw X1..X23/Y or the named Excel headers) to the
+    training schema: lowercase names, pay_0 -> pay_1, 'target', no id column.
+    """
+    df = df.rename(columns={'Y': 'target', **UCI_COLUMN_MAPPING})
+    df.columns = [c.lower() for c in df.columns]
+    df = df.rename(columns={'default payment next month': 'target', 'pay_0': 'pay_1'})
+    if 'id' in df.columns:
+        df = df.drop(columns=['id'])
+    return df
+
+def read_local_dataset(path: str) -> pd.DataFrame:
+    """
+    Parses a local copy of the dataset (.xls/.xlsx or .csv) and normalizes its columns.
+    """
+    if path.lower().endswith(".csv"):
+        df = pd.read_csv(path)
+    else:
+        # Header=1 because usually row 0 is just "X1, X2" and row 1 is actual names "ID, LIMIT_BAL"
+        df = pd.read_excel(path, header=1)
+    return normalize_columns(df)
+
 def load_data() -> pd.DataFrame:
     """
     Load the UCI Credit Default dataset.
     Uses 'USE_SYNTHETIC_DATA' env var to force synthetic data.
+    A local copy is parsed once and then read from the columnar cache in
+    PROCESSED_DATA_DIR (keyed by the file's checksum).
     Otherwise attempts to fetch from UCI ML Repo.
     """
     if os.getenv("USE_SYNTHETIC_DATA", "false").lower() == "true":
-        logger.warning("USE_SYNTHETIC_DATA is set! Using synthetic data (random noise).")
+        logger.warning("USE_SYNTHETIC_DATA is set! Using synthetic data from the correlated latent-factor generator (src.training.mock_data).")
         return generate_synthetic_data()
 
     logger.info("Checking for local dataset...")
     local_path = "data/default_of_credit_card_clients.xls"
     if os.path.exists(local_path):
         try:
-             # Header=1 because usually row 0 is just "X1, X2" and row 1 is actual names "ID, LIMIT_BAL"
-            df = pd.read_excel(local_path, header=1)
+            df = load_cached(local_path, read_local_dataset)
             logger.info(f"Loaded local dataset from {local_path}")
-            
-            # Normalize columns
-            df.columns = [c.lower() for c in df.columns]
-            
-            # Rename common targets
-            if 'default payment next month' in df.columns:
-                df = df.rename(columns={'default payment next month': 'target'})
-            
-            if 'pay_0' in df.columns:
-                df = df.rename(columns={'pay_0': 'pay_1'})
-                
-            if 'id' in df.columns:
-                df = df.drop(columns=['id'])
-                
             return df
         except Exception as e:
             logger.error(f"Failed to read local excel file: {e}")
@@ -50,49 +88,7 @@ def load_data() -> pd.DataFrame:
         X = dataset.data.features
         y = dataset.data.targets
         
-        X = dataset.data.features
-        y = dataset.data.targets
-        
-        df = pd.concat([X, y], axis=1)
-        # Verify valid columns
-        
-        if 'Y' in df.columns:
-            df = df.rename(columns={'Y': 'target'})
-            
-        # Mapping for raw UCI columns (X1...X23)
-        column_mapping = {
-            'X1': 'limit_bal',
-            'X2': 'sex',
-            'X3': 'education',
-            'X4': 'marriage',
-            'X5': 'age',
-            'X6': 'pay_1',
-            'X7': 'pay_2',
-            'X8': 'pay_3',
-            'X9': 'pay_4',
-            'X10': 'pay_5',
-            'X11': 'pay_6',
-            'X12': 'bill_amt1',
-            'X13': 'bill_amt2',
-            'X14': 'bill_amt3',
-            'X15': 'bill_amt4',
-            'X16': 'bill_amt5',
-            'X17': 'bill_amt6',
-            'X18': 'pay_amt1',
-            'X19': 'pay_amt2',
-            'X20': 'pay_amt3',
-            'X21': 'pay_amt4',
-            'X22': 'pay_amt5',
-            'X23': 'pay_amt6'
-        }
-        df = df.rename(columns=column_mapping)
-        
-        # Lowercase any remaining
-        df.columns = [c.lower() for c in df.columns]
-
-        # Handle legacy names just in case
-        if 'default payment next month' in df.columns:
-            df = df.rename(columns={'default payment next month': 'target'})
+        df = normalize_columns(pd.concat([X, y], axis=1))
             
         logger.info(f"Dataset loaded from UCI. Shape: {df.shape}")
         return df
@@ -0,0 +1,157 @@
+"""
+Columnar cache for the training dataset.
+
+The source (e.g. the UCI Excel file) is parsed once and written to
+PROCESSED_DATA_DIR/<name>-<checksum>/ as one .npy file per column with
+explicit compact dtypes. Later loads memory-map those files and wrap them in a
+DataFrame without copying, so a retrain no longer pays for Excel parsing.
+
+    python -m src.training.dataset_cache prepare data/default_of_credit_card_clients.xls
+
+`load_data` does this automatically on first use; compare load times with
+`python -m benchmarks.bench_data_load`.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.utils.config import settings
+
+logger = logging.getLogger(__name__)
+
+CACHE_NAME = "credit_default"
+CACHE_FORMAT_VERSION = 1
+
+# Explicit storage dtypes; values in the UCI data fit these ranges exactly
+COLUMN_DTYPES = {
+    "limit_bal": "float32",
+    "sex": "int8",
+    "education": "int8",
+    "marriage": "int8",
+    "age": "int8",
+    **{f"pay_{i}": "int8" for i in range(1, 7)},
+    **{f"bill_amt{i}": "float32" for i in range(1, 7)},
+    **{f"pay_amt{i}": "float32" for i in range(1, 7)},
+    "target": "int8",
+}
+
+
+def file_checksum(path: str, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_dir_for(checksum: str, processed_dir: str | None = None) -> str:
+    processed_dir = processed_dir or settings.PROCESSED_DATA_DIR
+    return os.path.join(processed_dir, f"{CACHE_NAME}-{checksum[:16]}")
+
+
+def _storage_dtype(name: str, values: pd.Series) -> np.dtype:
+    dtype = np.dtype(COLUMN_DTYPES.get(name, values.dtype))
+    if values.isna().any() and dtype.kind in "iu":
+        # Missing values cannot be represented in an integer column
+        return np.dtype("float32")
+    if dtype.kind in "iu":
+        info = np.iinfo(dtype)
+        if values.min() < info.min or values.max() > info.max:
+            raise ValueError(f"Column '{name}' does not fit in {dtype} (range {values.min()}..{values.max()})")
+    return dtype
+
+
+def write_cache(df: pd.DataFrame, checksum: str, source: str, processed_dir: str | None = None) -> str:
+    """
+    Writes `df` as a typed columnar cache and removes caches for older checksums.
+    The directory is written under a temporary name and renamed into place, so
+    readers never see a partial cache.
+    """
+    target = cache_dir_for(checksum, processed_dir)
+    parent = os.path.dirname(target)
+    os.makedirs(parent, exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix=f".{CACHE_NAME}-", dir=parent)
+    try:
+        columns = []
+        for name in df.columns:
+            dtype = _storage_dtype(name, df[name])
+            np.save(os.path.join(tmp, f"{name}.npy"), np.ascontiguousarray(df[name].to_numpy(dtype=dtype)))
+            columns.append({"name": name, "dtype": dtype.str})
+        meta = {
+            "format_version": CACHE_FORMAT_VERSION, "source": source, "checksum": checksum,
+            "n_rows": len(df), "columns": columns, "created_at": time.time(),
+        }
+        with open(os.path.join(tmp, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=4)
+        if os.path.exists(target):
+            shutil.rmtree(target)
+        os.replace(tmp, target)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+    for entry in os.listdir(parent):
+        path = os.path.join(parent, entry)
+        if entry.startswith(f"{CACHE_NAME}-") and path != target and os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+    logger.info(f"Wrote dataset cache {target} ({len(df)} rows)")
+    return target
+
+
+def read_cache(checksum: str, processed_dir: str | None = None) -> pd.DataFrame | None:
+    """
+    Returns the cached frame for `checksum` backed by read-only memory maps,
+    or None if there is no (compatible) cache.
+    """
+    path = cache_dir_for(checksum, processed_dir)
+    meta_path = os.path.join(path, "meta.json")
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path) as f:
+        meta = json.load(f)
+    if meta.get("format_version") != CACHE_FORMAT_VERSION or meta.get("checksum") != checksum:
+        return None
+    data = {col["name"]: np.load(os.path.join(path, f"{col['name']}.npy"), mmap_mode="r") for col in meta["columns"]}
+    # copy=False keeps one block per column pointing at the memory maps
+    return pd.DataFrame(data, copy=False)
+
+
+def load_cached(source_path: str, parse, processed_dir: str | None = None) -> pd.DataFrame:
+    """
+    Loads `source_path` through the cache: on a checksum hit the columnar copy is
+    memory-mapped, otherwise `parse(source_path)` runs once and its result is cached.
+    """
+    checksum = file_checksum(source_path)
+    df = read_cache(checksum, processed_dir)
+    if df is not None:
+        logger.info(f"Loaded {source_path} from dataset cache ({len(df)} rows)")
+        return df
+    df = parse(source_path)
+    write_cache(df, checksum, os.path.abspath(source_path), processed_dir)
+    return read_cache(checksum, processed_dir)
+
+
+def main(argv=None):
+    from src.training.data_loader import read_local_dataset
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["prepare"])
+    parser.add_argument("source", help="Source dataset file (.xls/.xlsx or .csv)")
+    parser.add_argument("--processed-dir", default=None)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    df = read_local_dataset(args.source)
+    print(write_cache(df, file_checksum(args.source), os.path.abspath(args.source), args.processed_dir))
+
+
+if __name__ == "__main__":
+    main()
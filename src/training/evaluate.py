@@ -0,0 +1,148 @@
+"""
+Single-pass evaluation of a binary classifier from its predicted probabilities.
+
+Each model is scored once (predict_proba); every metric is then derived from
+those probabilities with vectorized counting instead of separate sklearn
+calls per metric:
+
+- one sort gives ROC AUC and average precision,
+- one bincount over a threshold grid gives the full threshold vs
+  precision/recall table,
+- one bincount over probability bins gives the calibration table,
+- the metrics at the decision threshold (labels use `prob >= threshold`, as in
+  the service) come from a single confusion matrix.
+"""
+import numpy as np
+
+from src.utils.config import settings
+
+# Clip for log loss, as probabilities of exactly 0 or 1 would make it infinite
+_EPS = 1e-15
+
+
+def _safe_div(num, den):
+    num, den = np.asarray(num, dtype=np.float64), np.asarray(den, dtype=np.float64)
+    return np.divide(num, den, out=np.zeros_like(num), where=den > 0)
+
+
+def _ranking_metrics(y_true: np.ndarray, y_prob: np.ndarray) -> tuple[float, float]:
+    """
+    ROC AUC and average precision from one descending sort, with tied scores
+    grouped (same definitions as sklearn's roc_auc_score / average_precision_score).
+    """
+    order = np.argsort(-y_prob, kind="mergesort")
+    scores, labels = y_prob[order], y_true[order]
+    # Last index of each run of equal scores
+    distinct = np.r_[np.flatnonzero(np.diff(scores)), len(scores) - 1]
+    tps = np.cumsum(labels)[distinct]
+    fps = distinct + 1 - tps
+    n_pos, n_neg = tps[-1], fps[-1]
+    if n_pos == 0 or n_neg == 0:
+        return float("nan"), float("nan")
+    tpr = np.r_[0.0, tps / n_pos]
+    fpr = np.r_[0.0, fps / n_neg]
+    roc_auc = float(np.trapz(tpr, fpr))
+    precision = tps / (tps + fps)
+    average_precision = float(np.sum(np.diff(np.r_[0.0, tps / n_pos]) * precision))
+    return roc_auc, average_precision
+
+
+def threshold_sweep(y_true: np.ndarray, y_prob: np.ndarray, thresholds: np.ndarray) -> dict[str, np.ndarray]:
+    """
+    Confusion counts at every threshold (predicted positive = prob >= t) in O(n + T):
+    each row is bucketed by how many thresholds it clears, then counts are
+    accumulated from the highest bucket down.
+    """
+    bucket = np.searchsorted(thresholds, y_prob, side="right")
+    n_buckets = len(thresholds) + 1
+    pos_per_bucket = np.bincount(bucket, weights=y_true, minlength=n_buckets)
+    all_per_bucket = np.bincount(bucket, minlength=n_buckets).astype(np.float64)
+    # Rows with bucket >= j + 1 satisfy prob >= thresholds[j]
+    tp = np.cumsum(pos_per_bucket[::-1])[::-1][1:]
+    predicted = np.cumsum(all_per_bucket[::-1])[::-1][1:]
+    fp = predicted - tp
+    n_pos = y_true.sum()
+    fn = n_pos - tp
+    tn = len(y_true) - n_pos - fp
+    return {"tp": tp, "fp": fp, "fn": fn, "tn": tn}
+
+
+def calibration_bins(y_true: np.ndarray, y_prob: np.ndarray, n_bins: int = 10) -> list[dict]:
+    """
+    Equal-width probability bins with mean predicted vs observed default rate.
+    """
+    bins = np.minimum((y_prob * n_bins).astype(np.int64), n_bins - 1)
+    count = np.bincount(bins, minlength=n_bins)
+    prob_sum = np.bincount(bins, weights=y_prob, minlength=n_bins)
+    pos_sum = np.bincount(bins, weights=y_true, minlength=n_bins)
+    mean_pred, observed = _safe_div(prob_sum, count), _safe_div(pos_sum, count)
+    return [
+        {"bin_lower": i / n_bins, "bin_upper": (i + 1) / n_bins, "count": int(count[i]),
+         "mean_predicted": float(mean_pred[i]), "observed_rate": float(observed[i])}
+        for i in range(n_bins)
+    ]
+
+
+def evaluate_predictions(y_true, y_prob, threshold: float | None = None,
+                         n_thresholds: int = 101, n_bins: int = 10) -> dict:
+    """
+    Returns {"metrics", "confusion_matrix", "threshold_sweep", "calibration"}
+    for one model's test-set probabilities.
+    """
+    threshold = settings.DECISION_THRESHOLD if threshold is None else threshold
+    y_true = np.asarray(y_true, dtype=np.float64)
+    y_prob = np.asarray(y_prob, dtype=np.float64)
+    n = len(y_true)
+
+    # Decision threshold goes in the grid so its confusion matrix comes from the same sweep
+    grid = np.unique(np.r_[np.linspace(0.0, 1.0, n_thresholds), threshold])
+    counts = threshold_sweep(y_true, y_prob, grid)
+    precision = _safe_div(counts["tp"], counts["tp"] + counts["fp"])
+    recall = _safe_div(counts["tp"], counts["tp"] + counts["fn"])
+    f1 = _safe_div(2 * precision * recall, precision + recall)
+    fpr = _safe_div(counts["fp"], counts["fp"] + counts["tn"])
+
+    at = int(np.searchsorted(grid, threshold))
+    tp, fp, fn, tn = (int(counts[k][at]) for k in ("tp", "fp", "fn", "tn"))
+    roc_auc, average_precision = _ranking_metrics(y_true, y_prob)
+    clipped = np.clip(y_prob, _EPS, 1 - _EPS)
+
+    metrics = {
+        "threshold": float(threshold),
+        "accuracy": (tp + tn) / n if n else 0.0,
+        "roc_auc": roc_auc,
+        "average_precision": average_precision,
+        "precision": float(precision[at]),
+        "recall": float(recall[at]),
+        "f1": float(f1[at]),
+        "log_loss": float(-np.mean(y_true * np.log(clipped) + (1 - y_true) * np.log(1 - clipped))),
+        "brier": float(np.mean((y_prob - y_true) ** 2)),
+        "n_samples": n,
+        "positive_rate": float(y_true.mean()) if n else 0.0,
+    }
+    sweep = [
+        {"threshold": float(t), "precision": float(p), "recall": float(r), "f1": float(f),
+         "fpr": float(fp_rate), "predicted_positive_rate": float((tp_ + fp_) / n) if n else 0.0}
+        for t, p, r, f, fp_rate, tp_, fp_ in zip(grid, precision, recall, f1, fpr, counts["tp"], counts["fp"])
+    ]
+    return {
+        "metrics": metrics,
+        # sklearn layout: [[tn, fp], [fn, tp]]
+        "confusion_matrix": [[tn, fp], [fn, tp]],
+        "threshold_sweep": sweep,
+        "calibration": calibration_bins(y_true, y_prob, n_bins),
+    }
+
+
+def build_report(evaluations: dict[str, dict], champion: str = "champion") -> dict:
+    """
+    Assembles reports/metrics.json: scalar metrics per model at the top level
+    (as before), the champion's confusion matrix, and per-model sweep and
+    calibration tables.
+    """
+    return {
+        **{name: result["metrics"] for name, result in evaluations.items()},
+        "confusion_matrix": evaluations[champion]["confusion_matrix"],
+        "threshold_sweep": {name: result["threshold_sweep"] for name, result in evaluations.items()},
+        "calibration": {name: result["calibration"] for name, result in evaluations.items()},
+    }
@@ -0,0 +1,256 @@
+"""
+Incremental (warm-start) retraining of the XGBoost champion.
+
+    python -m src.training.incremental new_labels.csv --rounds 50 --compare
+
+Instead of refitting the preprocessor and growing every tree from zero, the
+current champion (MODEL_PATH) is updated with the newly labelled rows only:
+
+- Scaler statistics are updated from running moments. A fitted StandardScaler
+  keeps (n_samples_seen_, mean_, var_), and `partial_fit` merges the new rows
+  into them without rescanning history. The existing trees were grown on the
+  old scaling, so every split threshold on a scaled column is moved to the new
+  scale (t' = (t * s_old + m_old - m_new) / s_new). The updated preprocessor
+  plus the remapped trees score any row exactly as before.
+- Imputer fill values (medians, most frequent categories) are kept. A median
+  cannot be merged from summary statistics, and the history is not rescanned.
+- Boosting continues from the existing booster for `rounds` more trees fitted
+  on the new rows, with the champion's own parameters.
+
+20% of the new rows are held out for evaluation, early-exit calibration and
+the drift reference score histogram. The reference's feature histograms keep
+the previous model's counts, with the new training rows added on the same
+edges, so drift is still measured against everything the ensemble learned
+from. The result is exported as a new model version through the same path as
+`make train`. `--compare` also runs a full retrain (the `make train` model on
+the training split of `load_data()` plus the new rows) and reports wall-clock
+time and ROC AUC of the previous, incremental and fully retrained models on
+the new hold-out and on the historical test split. The report goes to
+`reports/incremental.json`.
+"""
+import argparse
+import copy
+import json
+import logging
+import os
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from src.training.data_loader import load_data, normalize_columns, read_local_dataset
+from src.training.evaluate import evaluate_predictions
+from src.training.preprocess import get_preprocessor, infer_column_types, split_features_target
+from src.utils.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def read_labelled_data(path: str) -> pd.DataFrame:
+    """
+    Newly labelled rows (CSV, Excel, Parquet or NDJSON) in the training schema.
+    """
+    lowered = path.lower()
+    if lowered.endswith(".parquet"):
+        return normalize_columns(pd.read_parquet(path))
+    if lowered.endswith((".jsonl", ".ndjson", ".json")):
+        return normalize_columns(pd.read_json(path, lines=True))
+    return read_local_dataset(path)
+
+
+def update_scalers(preprocessor, X_new: pd.DataFrame) -> dict[int, tuple[float, float]]:
+    """
+    Merges `X_new` into the running moments of every StandardScaler in the
+    fitted ColumnTransformer (in place). Returns {output column: (a, b)} such
+    that a value scaled the old way, x, is scaled the new way as a * x + b.
+    """
+    output_names = list(preprocessor.get_feature_names_out())
+    remap = {}
+    for name, pipe, columns in preprocessor.transformers_:
+        if name == 'remainder' or not hasattr(pipe, 'steps'):
+            continue
+        position = next((i for i, (_, step) in enumerate(pipe.steps) if isinstance(step, StandardScaler)), None)
+        if position is None:
+            continue
+        scaler = pipe.steps[position][1]
+        old_mean, old_scale = _moments(scaler, len(columns))
+        # Steps before the scaler (the imputer) are applied with their fitted statistics
+        values = pipe[:position].transform(X_new[columns]) if position else X_new[columns].to_numpy()
+        scaler.partial_fit(values)
+        new_mean, new_scale = _moments(scaler, len(columns))
+        for i, column in enumerate(columns):
+            remap[output_names.index(f"{name}__{column}")] = (
+                old_scale[i] / new_scale[i], (old_mean[i] - new_mean[i]) / new_scale[i]
+            )
+    return remap
+
+
+def _moments(scaler: StandardScaler, n: int) -> tuple[np.ndarray, np.ndarray]:
+    mean = scaler.mean_.copy() if scaler.with_mean else np.zeros(n)
+    scale = scaler.scale_.copy() if scaler.with_std else np.ones(n)
+    return mean, scale
+
+
+def remap_thresholds(booster: xgb.Booster, remap: dict[int, tuple[float, float]]) -> xgb.Booster:
+    """
+    Returns a copy of `booster` whose split thresholds on column j become
+    a_j * t + b_j, so trees keep routing rows the same way after rescaling.
+    """
+    model = json.loads(booster.save_raw("json"))
+    scale = np.ones(booster.num_features())
+    shift = np.zeros(booster.num_features())
+    for j, (a, b) in remap.items():
+        scale[j], shift[j] = a, b
+    for tree in model["learner"]["gradient_booster"]["model"]["trees"]:
+        features = np.asarray(tree["split_indices"], dtype=np.intp)
+        conditions = np.asarray(tree["split_conditions"], dtype=np.float64)
+        # Leaves reuse split_conditions for their leaf value
+        internal = np.asarray(tree["left_children"]) != -1
+        f = features[internal]
+        old = conditions[internal]
+        moved = old * scale[f] + shift[f]
+        # Thresholds sit on observed values, which go right (x >= t). The old
+        # threshold and the rescaled feature values are float32-rounded, so move
+        # the new threshold down by twice that rounding error to keep ties right.
+        slack = np.spacing(np.abs(old).astype(np.float32)) * scale[f] + np.spacing(np.abs(moved).astype(np.float32))
+        conditions[internal] = np.where(np.isin(f, list(remap)), moved - 2 * slack, old)
+        tree["split_conditions"] = conditions.astype(np.float32).tolist()
+    remapped = xgb.Booster()
+    remapped.load_model(bytearray(json.dumps(model).encode()))
+    return remapped
+
+
+def warm_start(pipeline, X_new: pd.DataFrame, y_new, rounds: int = 50) -> Pipeline:
+    """
+    Returns a new pipeline: scaler moments updated with `X_new`, existing trees
+    remapped to the new scaling, then `rounds` more trees boosted on `X_new`.
+    The input pipeline is left unchanged.
+    """
+    preprocessor = copy.deepcopy(pipeline.named_steps['preprocessor'])
+    classifier = pipeline.named_steps['classifier']
+    booster = classifier.get_booster()
+    n_trees = booster.num_boosted_rounds()
+
+    remap = update_scalers(preprocessor, X_new)
+    booster = remap_thresholds(booster, remap)
+
+    model = xgb.XGBClassifier(**{**classifier.get_params(), "n_estimators": rounds})
+    model.fit(preprocessor.transform(X_new).astype(np.float32), np.asarray(y_new), xgb_model=booster)
+    # Describe the whole ensemble, not just the rounds added here
+    model.set_params(n_estimators=n_trees + rounds)
+    return Pipeline([('preprocessor', preprocessor), ('classifier', model)])
+
+
+def full_retrain(X_train: pd.DataFrame, y_train) -> Pipeline:
+    """
+    The `make train` champion fitted from scratch.
+    """
+    from src.training.train import CHAMPION_PARAMS
+    categorical_cols, numerical_cols = infer_column_types(X_train)
+    pipeline = Pipeline([
+        ('preprocessor', get_preprocessor(categorical_cols, numerical_cols)),
+        ('classifier', xgb.XGBClassifier(**CHAMPION_PARAMS))
+    ])
+    return pipeline.fit(X_train, y_train)
+
+
+def _auc(pipeline, eval_sets: dict) -> dict:
+    return {name: evaluate_predictions(y, pipeline.predict_proba(X)[:, 1])["metrics"]["roc_auc"]
+            for name, (X, y) in eval_sets.items()}
+
+
+def updated_reference(model_path: str | None, X_fit: pd.DataFrame, scores: np.ndarray) -> dict:
+    """
+    The previous model's drift reference with `X_fit` merged into its feature
+    counts and a new score histogram. Falls back to a reference of `X_fit`
+    alone when the previous model has none.
+    """
+    from src.monitoring.drift import build_reference, load_reference, merge_reference, reference_path
+    path = reference_path(os.path.dirname(model_path)) if model_path else reference_path()
+    if not os.path.exists(path):
+        logger.warning(f"No drift reference at {path}; building one from the {len(X_fit)} new rows only")
+        return build_reference(X_fit, scores)
+    return merge_reference(load_reference(path), X_fit, scores)
+
+
+def incremental_train(new_df: pd.DataFrame, rounds: int = 50, model_path: str | None = None,
+                      compare: bool = False, history_df: pd.DataFrame | None = None,
+                      output_path: str = "reports/incremental.json", export: bool = True) -> dict:
+    """
+    Warm-starts the champion at `model_path` on `new_df`, optionally compares
+    it with a full retrain on `history_df` (default `load_data()`) plus the new
+    rows, writes the report and exports the updated model.
+    """
+    previous = joblib.load(model_path or settings.MODEL_PATH)
+    X_new, y_new = split_features_target(new_df)
+    X_fit, X_hold, y_fit, y_hold = train_test_split(X_new, y_new, test_size=0.2, random_state=42, stratify=y_new)
+    eval_sets = {"new_holdout": (X_hold, y_hold)}
+
+    start = time.perf_counter()
+    pipeline = warm_start(previous, X_fit, y_fit, rounds)
+    seconds = time.perf_counter() - start
+    n_trees = pipeline.named_steps['classifier'].get_booster().num_boosted_rounds()
+    logger.info(f"Incremental update: {rounds} rounds on {len(X_fit)} rows in {seconds:.2f}s ({n_trees} trees)")
+
+    report = {
+        "n_new_rows": len(X_new),
+        "n_fit_rows": len(X_fit),
+        "rounds": rounds,
+        "n_trees": n_trees,
+        "incremental": {"seconds": seconds},
+    }
+    full = None
+    if compare:
+        history_df = load_data() if history_df is None else history_df
+        X_hist, y_hist = split_features_target(history_df)
+        # Same hold-out split as train(), so the previous model has not seen the test part
+        X_hist_train, X_hist_test, y_hist_train, y_hist_test = train_test_split(
+            X_hist, y_hist, test_size=0.2, random_state=42, stratify=y_hist)
+        eval_sets["history_test"] = (X_hist_test, y_hist_test)
+
+        start = time.perf_counter()
+        full = full_retrain(pd.concat([X_hist_train, X_fit], ignore_index=True),
+                            pd.concat([y_hist_train, y_fit], ignore_index=True))
+        report["full_retrain"] = {"seconds": time.perf_counter() - start, "n_fit_rows": len(X_hist_train) + len(X_fit)}
+        report["full_retrain"]["auc"] = _auc(full, eval_sets)
+        report["speedup"] = report["full_retrain"]["seconds"] / seconds
+
+    report["previous"] = {"auc": _auc(previous, eval_sets)}
+    report["incremental"]["auc"] = _auc(pipeline, eval_sets)
+    logger.info(f"Incremental retrain report: {report}")
+
+    if export:
+        from src.training.train import calibrate_champion_early_exit, export_champion
+        early_exit, report["early_exit"] = calibrate_champion_early_exit(pipeline, X_hold, y_hold)
+        reference = updated_reference(model_path, X_fit, pipeline.predict_proba(X_hold)[:, 1])
+        report["model_version"] = export_champion(pipeline, reference, early_exit)
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(output_path, "w") as f:
+        json.dump(report, f, indent=4)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="Newly labelled rows: .csv, .xls(x), .parquet or .jsonl with a target column")
+    parser.add_argument("--rounds", type=int, default=50, help="Trees added on top of the current booster")
+    parser.add_argument("--model-path", default=None, help="Pipeline to update (default: MODEL_PATH)")
+    parser.add_argument("--compare", action="store_true", help="Also time and score a full retrain")
+    parser.add_argument("--output", default="reports/incremental.json")
+    parser.add_argument("--no-export", action="store_true", help="Only report; do not overwrite model artifacts")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    report = incremental_train(read_labelled_data(args.input), args.rounds, args.model_path, args.compare,
+                               output_path=args.output, export=not args.no_export)
+    print(json.dumps(report, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,35 +1,178 @@
-import pandas as pd
-import numpy as np
-from src.utils.config import settings
+"""
+Synthetic data matching the UCI Credit Default schema.
+
+Rows are generated from a latent credit-risk factor, so repayment status,
+bill amounts, payments and the default label are correlated roughly like the
+real data (about 22% defaults, driven mostly by recent delinquency). Large
+datasets are produced in fixed-size chunks and streamed to disk:
+
+    python -m src.training.mock_data dataset data/synthetic.csv --rows 20000000 --chunk-size 1000000
+    python -m src.training.mock_data payloads payloads.jsonl --rows 100000
+
+`payloads` writes one /predict request body per line (NDJSON), the format read
+by `benchmarks.bench_load --payloads`, `/predict/batch` and `src.scoring.batch`.
+"""
+import argparse
+import json
 import logging
+import os
+import time
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
 
 logger = logging.getLogger(__name__)
 
-def generate_synthetic_data(n_rows=1000):
+N_MONTHS = 6
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def _generate_chunk(n_rows: int, rng: np.random.Generator) -> pd.DataFrame:
+    # Latent risk: higher means more likely to be late and to default
+    risk = rng.standard_normal(n_rows)
+
+    age = np.clip(np.round(21 + rng.gamma(4.0, 3.5, n_rows) - 2 * risk), 21, 79).astype(np.int64)
+    limit_bal = np.clip(np.round(np.exp(11.7 + 0.5 * (age - 35) / 15 - 0.35 * risk + 0.7 * rng.standard_normal(n_rows)), -4),
+                        10000, 1000000)
+    data = {
+        'limit_bal': limit_bal,
+        'sex': rng.choice([1, 2], n_rows, p=[0.4, 0.6]),
+        'education': np.clip(rng.choice([1, 2, 3, 4], n_rows, p=[0.35, 0.47, 0.16, 0.02]) + (risk > 1.5), 1, 4),
+        'marriage': rng.choice([1, 2, 3], n_rows, p=[0.46, 0.53, 0.01]),
+        'age': age,
+    }
+
+    # Month 6 is the oldest; each month follows from the previous one (AR(1)),
+    # so delinquency and utilisation persist over time
+    status = np.empty((N_MONTHS, n_rows))
+    utilisation = np.empty((N_MONTHS, n_rows))
+    s = rng.standard_normal(n_rows)
+    u = rng.standard_normal(n_rows)
+    for m in range(N_MONTHS - 1, -1, -1):
+        s = 0.8 * s + 0.6 * rng.standard_normal(n_rows)
+        u = 0.9 * u + 0.44 * rng.standard_normal(n_rows)
+        status[m] = 0.9 * risk + 0.7 * s
+        utilisation[m] = _sigmoid(0.8 * risk + u - 0.3)
+
+    # pay_i: -2 no consumption, -1 paid in full, 0 revolving, 1..8 months late
+    pay = np.where(status < -0.6, -1, 0)
+    pay = np.where(utilisation < 0.05, -2, pay)
+    late = np.ceil((status - 1.1) * 1.8)
+    pay = np.where(status > 1.1, np.clip(late, 1, 8), pay).astype(np.int64)
+
+    bill = np.round(limit_bal * utilisation * (1 + 0.05 * rng.standard_normal((N_MONTHS, n_rows))))
+    # Payment made in month i covers part of the previous month's bill; little or nothing when late
+    ratio = np.where(pay > 0, 0.02, np.where(pay < 0, 1.0, 0.08)) * rng.lognormal(0, 0.5, (N_MONTHS, n_rows))
+    ratio = np.minimum(ratio, 1.2)
+    previous_bill = np.vstack([bill[1:], bill[-1:]])
+    pay_amt = np.round(np.clip(previous_bill * ratio, 0, None))
+
+    for i in range(N_MONTHS):
+        data[f'pay_{i + 1}'] = pay[i]
+        data[f'bill_amt{i + 1}'] = bill[i].astype(np.int64)
+        data[f'pay_amt{i + 1}'] = pay_amt[i].astype(np.int64)
+
+    logit = (-1.85 + 0.55 * np.clip(pay[0], 0, None) + 0.2 * np.clip(pay[1], 0, None)
+             + 0.6 * utilisation[0] + 0.45 * risk - 0.15 * np.log(limit_bal / 1e5))
+    data['target'] = (rng.random(n_rows) < _sigmoid(logit)).astype(np.int64)
+    return pd.DataFrame(data)
+
+
+def iter_synthetic_chunks(n_rows: int, chunk_size: int = 1_000_000, seed: int = 42) -> Iterator[pd.DataFrame]:
+    """
+    Yields `n_rows` rows in chunks of at most `chunk_size`. Each chunk has its
+    own Generator derived from (seed, chunk index), so output is reproducible
+    and independent of any global NumPy state.
+    """
+    for index, start in enumerate(range(0, n_rows, chunk_size)):
+        rng = np.random.default_rng([seed, index])
+        yield _generate_chunk(min(chunk_size, n_rows - start), rng)
+
+
+def generate_synthetic_data(n_rows=1000, seed: int = 42):
     """
     Generates synthetic data matching the UCI Credit Default schema.
     Used when external download fails.
     """
     logger.info(f"Generating {n_rows} rows of synthetic data...")
-    np.random.seed(42)
-    
-    data = {
-        'limit_bal': np.random.randint(10000, 1000000, n_rows),
-        'sex': np.random.choice([1, 2], n_rows),
-        'education': np.random.choice([1, 2, 3, 4], n_rows),
-        'marriage': np.random.choice([1, 2, 3], n_rows),
-        'age': np.random.randint(21, 79, n_rows),
-    }
-    
-    for i in range(1, 7):
-        data[f'pay_{i}'] = np.random.randint(-2, 9, n_rows)
-        data[f'bill_amt{i}'] = np.random.randn(n_rows) * 50000 + 50000
-        data[f'pay_amt{i}'] = np.random.randn(n_rows) * 5000 + 2000
-        
-    data['target'] = np.random.randint(0, 2, n_rows)
-    
-    df = pd.DataFrame(data)
-    
-    # Ensure correct types for pay columns (int)
-    # The generated are int/float mixed potentially, verify
-    return df
+    return pd.concat(list(iter_synthetic_chunks(n_rows, seed=seed)), ignore_index=True)
+
+
+def _write_chunk(f, chunk: pd.DataFrame, fmt: str, first: bool):
+    if fmt == "ndjson":
+        f.write(chunk.to_json(orient="records", lines=True).rstrip("\n") + "\n")
+    else:
+        chunk.to_csv(f, index=False, header=first)
+
+
+def write_synthetic_dataset(path: str, n_rows: int, chunk_size: int = 1_000_000, seed: int = 42,
+                            include_target: bool = True) -> dict:
+    """
+    Streams a synthetic dataset to `path` chunk by chunk, so memory stays bounded
+    by `chunk_size`. Format follows the suffix: .parquet (needs pyarrow),
+    .jsonl/.ndjson, anything else CSV. Returns rows written and rows/sec.
+    """
+    lowered = path.lower()
+    fmt = "parquet" if lowered.endswith(".parquet") else "ndjson" if lowered.endswith((".jsonl", ".ndjson")) else "csv"
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    start = time.perf_counter()
+    written = 0
+    if fmt == "parquet":
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Parquet output requires pyarrow (pip install pyarrow)")
+        writer = None
+        try:
+            for chunk in iter_synthetic_chunks(n_rows, chunk_size, seed):
+                chunk = chunk if include_target else chunk.drop(columns=['target'])
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                writer = writer or pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+                written += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+    else:
+        with open(path, "w", newline="") as f:
+            for chunk in iter_synthetic_chunks(n_rows, chunk_size, seed):
+                chunk = chunk if include_target else chunk.drop(columns=['target'])
+                _write_chunk(f, chunk, fmt, first=written == 0)
+                written += len(chunk)
+                logger.info(f"Wrote {written:,}/{n_rows:,} rows to {path}")
+    elapsed = time.perf_counter() - start
+    return {"path": path, "rows": written, "seconds": elapsed, "rows_per_sec": written / elapsed if elapsed > 0 else 0.0}
+
+
+def write_request_payloads(path: str, n_rows: int, chunk_size: int = 1_000_000, seed: int = 7) -> dict:
+    """
+    Writes applicants without the label, one /predict body per line.
+    Uses a different default seed from the training data so load tests do not replay training rows.
+    """
+    return write_synthetic_dataset(path, n_rows, chunk_size, seed, include_target=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["dataset", "payloads"])
+    parser.add_argument("output", help="dataset: .csv/.jsonl/.parquet; payloads: .jsonl")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunk-size", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if args.command == "dataset":
+        summary = write_synthetic_dataset(args.output, args.rows, args.chunk_size, 42 if args.seed is None else args.seed)
+    else:
+        summary = write_request_payloads(args.output, args.rows, args.chunk_size, 7 if args.seed is None else args.seed)
+    print(json.dumps(summary, indent=4))
+
+
+if __name__ == "__main__":
+    main()
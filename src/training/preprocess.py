@@ -26,6 +26,15 @@ def get_preprocessor(categorical_features: list[str], numerical_features: list[s
     
     return preprocessor
 
+def infer_column_types(X: pd.DataFrame) -> tuple[list[str], list[str]]:
+    """
+    Returns (categorical, numerical) column names.
+    Numerical matches any numeric dtype, so compact int8/float32 columns count.
+    """
+    categorical_cols = X.select_dtypes(include=['object', 'category']).columns.tolist()
+    numerical_cols = X.select_dtypes(include='number').columns.tolist()
+    return categorical_cols, numerical_cols
+
 def split_features_target(df: pd.DataFrame, target_col: str = 'target'):
     """
     Separates features and target.
@@ -0,0 +1,229 @@
+"""
+Cross-validated hyperparameter search for the XGBoost champion.
+
+    python -m src.training.tune --trials 40 --folds 5 --trial-threads 2
+
+The preprocessor is fitted once per fold and the transformed folds are reused
+by every trial. Trials run in parallel, `parallel` at a time, and each XGBoost
+fit is limited to `trial_threads` threads, so together they use the cores
+without oversubscribing them. Each fold fit stops early on validation AUC, and
+a trial is pruned once its running CV AUC falls below the median of earlier
+trials at the same fold. Every trial is appended to
+`<output_dir>/trials.jsonl` (rewritten on each run). The best parameters are
+refitted on the training split and exported through the same artifact path as
+`make train`.
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+import numpy as np
+import xgboost as xgb
+from sklearn.model_selection import StratifiedKFold, train_test_split
+from sklearn.pipeline import Pipeline
+
+from src.training.data_loader import load_data
+from src.training.evaluate import evaluate_predictions
+from src.training.preprocess import get_preprocessor, infer_column_types, split_features_target
+
+logger = logging.getLogger(__name__)
+
+# name -> (kind, low, high); "log" samples uniformly in log space
+SEARCH_SPACE = {
+    "max_depth": ("int", 3, 8),
+    "learning_rate": ("log", 0.01, 0.3),
+    "subsample": ("float", 0.6, 1.0),
+    "colsample_bytree": ("float", 0.5, 1.0),
+    "min_child_weight": ("log", 1.0, 20.0),
+    "reg_lambda": ("log", 0.1, 10.0),
+}
+
+
+class Fold(NamedTuple):
+    X_train: np.ndarray
+    y_train: np.ndarray
+    X_valid: np.ndarray
+    y_valid: np.ndarray
+
+
+def sample_params(rng: random.Random, space: dict = SEARCH_SPACE) -> dict:
+    params = {}
+    for name, (kind, low, high) in space.items():
+        if kind == "int":
+            params[name] = rng.randint(low, high)
+        elif kind == "log":
+            params[name] = math.exp(rng.uniform(math.log(low), math.log(high)))
+        else:
+            params[name] = rng.uniform(low, high)
+    return params
+
+
+def prepare_folds(X, y, categorical_cols: list[str], numerical_cols: list[str],
+                  n_folds: int = 5, seed: int = 42) -> list[Fold]:
+    """
+    Fits the preprocessor on each fold's training part (no leakage into the
+    validation part) and keeps the transformed float32 matrices for all trials.
+    """
+    folds = []
+    y = np.asarray(y)
+    for train_idx, valid_idx in StratifiedKFold(n_folds, shuffle=True, random_state=seed).split(X, y):
+        preprocessor = get_preprocessor(categorical_cols, numerical_cols)
+        X_train = preprocessor.fit_transform(X.iloc[train_idx]).astype(np.float32)
+        X_valid = preprocessor.transform(X.iloc[valid_idx]).astype(np.float32)
+        folds.append(Fold(X_train, y[train_idx], X_valid, y[valid_idx]))
+    return folds
+
+
+class MedianPruner:
+    """
+    Prunes a trial whose running mean AUC after fold i is below the median of
+    the running means other trials reported at fold i. Never prunes before
+    `min_trials` trials have reported at that fold.
+    """
+    def __init__(self, min_trials: int = 5):
+        self.min_trials = min_trials
+        self._reported: dict[int, list[float]] = {}
+        self._lock = threading.Lock()
+
+    def should_prune(self, fold_index: int, running_mean: float) -> bool:
+        with self._lock:
+            history = self._reported.setdefault(fold_index, [])
+            prune = len(history) >= self.min_trials and running_mean < statistics.median(history)
+            history.append(running_mean)
+        return prune
+
+
+def run_trial(trial_id: int, params: dict, folds: list[Fold], nthread: int, max_rounds: int,
+              early_stopping_rounds: int, pruner: MedianPruner | None = None, seed: int = 42) -> dict:
+    start = time.perf_counter()
+    scores, best_iterations, status = [], [], "complete"
+    for i, fold in enumerate(folds):
+        model = xgb.XGBClassifier(
+            objective='binary:logistic', n_estimators=max_rounds, eval_metric='auc',
+            early_stopping_rounds=early_stopping_rounds, tree_method='hist',
+            random_state=seed, n_jobs=nthread, **params
+        )
+        model.fit(fold.X_train, fold.y_train, eval_set=[(fold.X_valid, fold.y_valid)], verbose=False)
+        scores.append(float(model.best_score))
+        best_iterations.append(int(model.best_iteration))
+        if pruner is not None and i < len(folds) - 1 and pruner.should_prune(i, float(np.mean(scores))):
+            status = "pruned"
+            break
+    return {
+        "trial": trial_id,
+        "status": status,
+        "params": params,
+        "fold_auc": scores,
+        "mean_auc": float(np.mean(scores)),
+        "best_iterations": best_iterations,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def tune(n_trials: int = 30, n_folds: int = 5, trial_threads: int = 1, parallel: int | None = None,
+         max_rounds: int = 1000, early_stopping_rounds: int = 30, min_trials_before_pruning: int = 5,
+         output_dir: str = "reports/tuning", seed: int = 42, export: bool = True, df=None) -> dict:
+    df = load_data() if df is None else df
+    X, y = split_features_target(df)
+    # Same hold-out split as train(), so test metrics are comparable
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+    categorical_cols, numerical_cols = infer_column_types(X)
+
+    start = time.perf_counter()
+    folds = prepare_folds(X_train, y_train, categorical_cols, numerical_cols, n_folds, seed)
+    logger.info(f"Prepared {n_folds} folds in {time.perf_counter() - start:.2f}s")
+
+    parallel = parallel or max(1, (os.cpu_count() or 1) // trial_threads)
+    rng = random.Random(seed)
+    trial_params = [sample_params(rng) for _ in range(n_trials)]
+    pruner = MedianPruner(min_trials_before_pruning)
+
+    os.makedirs(output_dir, exist_ok=True)
+    trials_path = os.path.join(output_dir, "trials.jsonl")
+    open(trials_path, "w").close()
+    write_lock = threading.Lock()
+    trials = []
+
+    def run_and_record(trial_id: int, params: dict) -> dict:
+        record = run_trial(trial_id, params, folds, trial_threads, max_rounds, early_stopping_rounds, pruner, seed)
+        with write_lock:
+            trials.append(record)
+            with open(trials_path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+        logger.info(f"Trial {trial_id} {record['status']}: AUC {record['mean_auc']:.4f} in {record['seconds']:.1f}s")
+        return record
+
+    logger.info(f"Running {n_trials} trials, {parallel} in parallel with {trial_threads} thread(s) each")
+    with ThreadPoolExecutor(max_workers=parallel, thread_name_prefix="trial") as pool:
+        list(pool.map(run_and_record, range(n_trials), trial_params))
+    search_seconds = time.perf_counter() - start
+
+    completed = [t for t in trials if t["status"] == "complete"]
+    best = max(completed, key=lambda t: t["mean_auc"])
+    n_estimators = int(np.mean(best["best_iterations"])) + 1
+    logger.info(f"Best trial {best['trial']}: CV AUC {best['mean_auc']:.4f}, {n_estimators} rounds")
+
+    # Refit on the full training split with the CV-chosen number of rounds
+    pipeline = Pipeline([
+        ('preprocessor', get_preprocessor(categorical_cols, numerical_cols)),
+        ('classifier', xgb.XGBClassifier(
+            objective='binary:logistic', n_estimators=n_estimators, eval_metric='auc',
+            tree_method='hist', random_state=seed, n_jobs=-1, **best["params"]
+        ))
+    ])
+    pipeline.fit(X_train, y_train)
+    y_prob = pipeline.predict_proba(X_test)[:, 1]
+
+    summary = {
+        "best_trial": best["trial"],
+        "params": {**best["params"], "n_estimators": n_estimators},
+        "cv_auc": best["mean_auc"],
+        "test": evaluate_predictions(y_test, y_prob)["metrics"],
+        "trials": {"total": len(trials), "complete": len(completed), "pruned": len(trials) - len(completed)},
+        "search_seconds": search_seconds,
+        "parallel": parallel,
+        "trial_threads": trial_threads,
+    }
+    if export:
+        from src.monitoring.drift import build_reference
+        from src.training.train import calibrate_champion_early_exit, export_champion
+        early_exit, summary["early_exit"] = calibrate_champion_early_exit(pipeline, X_test, y_test)
+        summary["model_version"] = export_champion(pipeline, build_reference(X_train, y_prob), early_exit)
+
+    with open(os.path.join(output_dir, "best.json"), "w") as f:
+        json.dump(summary, f, indent=4)
+    logger.info(f"Tuning complete: {summary}")
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trials", type=int, default=30)
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--trial-threads", type=int, default=1, help="XGBoost threads per trial")
+    parser.add_argument("--parallel", type=int, default=None, help="Concurrent trials (default: cores // trial-threads)")
+    parser.add_argument("--max-rounds", type=int, default=1000)
+    parser.add_argument("--early-stopping-rounds", type=int, default=30)
+    parser.add_argument("--min-trials-before-pruning", type=int, default=5)
+    parser.add_argument("--output-dir", default="reports/tuning")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-export", action="store_true", help="Only report; do not overwrite model artifacts")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    summary = tune(args.trials, args.folds, args.trial_threads, args.parallel, args.max_rounds,
+                   args.early_stopping_rounds, args.min_trials_before_pruning, args.output_dir,
+                   args.seed, not args.no_export)
+    print(json.dumps(summary, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import logging
+import queue
+import random
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+
+class AccessLog:
+    """
+    Per-request access logging kept off the hot path.
+
+    Lines are sampled at `sample_rate` (errors, status >= 500, are always kept)
+    and, when started in async mode, handed to a QueueListener thread so
+    request handlers never block on stdout.
+    """
+    def __init__(self, logger_name: str = "api.access", sample_rate: float = 1.0, use_async: bool = True):
+        self.logger = logging.getLogger(logger_name)
+        self.sample_rate = sample_rate
+        self.use_async = use_async
+        self._listener: QueueListener | None = None
+        self._queue_handler: QueueHandler | None = None
+
+    def start(self):
+        if not self.use_async or self._listener is not None:
+            return
+        records = queue.SimpleQueue()
+        stream = logging.StreamHandler(sys.stdout)
+        stream.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+        self._queue_handler = QueueHandler(records)
+        self._listener = QueueListener(records, stream)
+        self.logger.addHandler(self._queue_handler)
+        self.logger.propagate = False
+        self._listener.start()
+
+    def stop(self):
+        """
+        Flushes queued lines and restores synchronous logging.
+        """
+        if self._listener is None:
+            return
+        self._listener.stop()
+        self.logger.removeHandler(self._queue_handler)
+        self.logger.propagate = True
+        self._listener = None
+        self._queue_handler = None
+
+    def log(self, status_code: int, message: str, *args):
+        """
+        `message` is a %-style format string; it is only formatted with `args`
+        for lines that are kept, so sampled-out requests cost no string building.
+        """
+        if status_code >= 500 or self.sample_rate >= 1.0 or random.random() < self.sample_rate:
+            self.logger.info(message, *args)
@@ -8,12 +8,94 @@ class Settings(BaseSettings):
     # Model Paths
     MODEL_PATH: str = "models/model.pkl"
     PREPROCESSOR_PATH: str = "models/preprocessor.pkl"
+    # Label of the model loaded at startup (registry/cache/metrics)
+    MODEL_VERSION: str = "initial"
+    # Versioned model directories (each holds model.pkl / preprocessor_spec.json / booster.ubj)
+    MODEL_REGISTRY_DIR: str = "models/versions"
+    MODEL_REGISTRY_MAX_VERSIONS: int = 3
+    # Hot reload when the artifact at MODEL_PATH (or BOOSTER_PATH for the compiled engine) changes
+    MODEL_WATCH_ENABLED: bool = False
+    MODEL_WATCH_INTERVAL_SECONDS: float = 10.0
+    # Max queued shadow-scoring jobs before new ones are dropped
+    SHADOW_MAX_PENDING: int = 256
+    # Token for the /admin endpoints (X-Admin-Token header); empty disables them
+    ADMIN_TOKEN: str = ""
+    
+    # Compiled fast-path artifacts (written by src.training.train)
+    PREPROCESSOR_SPEC_PATH: str = "models/preprocessor_spec.json"
+    BOOSTER_PATH: str = "models/booster.ubj"
     
     # Data Paths
     # DATA_PATH DEPRECATED: We use ucimlrepo now. 
     # But we keep processed dir.
     PROCESSED_DATA_DIR: str = "data/processed"
     
+    # Inference
+    # "pipeline" (sklearn pipeline from MODEL_PATH) or "compiled" (NumPy fast path)
+    INFERENCE_ENGINE: str = "pipeline"
+    MAX_BATCH_SIZE: int = 10000
+    # Probability at or above which an applicant is labelled as a default
+    DECISION_THRESHOLD: float = 0.5
+    # Execution backend: "threadpool" (Starlette default), "thread" (dedicated pool) or "process"
+    INFERENCE_BACKEND: str = "threadpool"
+    INFERENCE_WORKERS: int = 1
+    # Admission control: calls beyond this many queued/running are rejected
+    INFERENCE_MAX_PENDING: int = 64
+    # Status returned when admission control rejects a request (503 or 429)
+    OVERLOAD_STATUS_CODE: int = 503
+    # Threads per XGBoost predict call (training uses n_jobs=-1, which oversubscribes under concurrency)
+    XGB_NTHREAD: int = 1
+    # Dynamic micro-batching of concurrent /predict calls
+    BATCHING_ENABLED: bool = False
+    BATCH_MAX_SIZE: int = 64
+    BATCH_MAX_WAIT_MS: float = 2.0
+
+    # Early-exit scoring: a prefix of the trees first, the full ensemble only near the threshold
+    EARLY_EXIT_ENABLED: bool = False
+    EARLY_EXIT_PATH: str = "models/early_exit.json"
+    # Training-time calibration: max share of labels allowed to differ from the full ensemble
+    EARLY_EXIT_MAX_FLIP_RATE: float = 0.001
+
+    # Feature store: preprocessed rows keyed by account ID for /predict/by-id (built by src.scoring.feature_store)
+    FEATURE_STORE_ENABLED: bool = False
+    FEATURE_STORE_DIR: str = "data/feature_store"
+
+    # Prediction cache (keyed by canonicalized request + model version)
+    CACHE_ENABLED: bool = False
+    CACHE_BACKEND: str = "memory"
+    CACHE_MAX_ENTRIES: int = 10000
+    CACHE_TTL_SECONDS: float = 300.0
+    
+    # Access log: fraction of requests logged (5xx always logged) and whether writes go through a background thread
+    ACCESS_LOG_SAMPLE_RATE: float = 1.0
+    ACCESS_LOG_ASYNC: bool = True
+    
+    # Drift monitoring: live feature/score histograms compared with the training reference
+    DRIFT_ENABLED: bool = False
+    DRIFT_REFERENCE_PATH: str = "models/drift_reference.json"
+    DRIFT_WINDOW_SECONDS: float = 3600.0
+    DRIFT_BUCKETS: int = 12
+    DRIFT_FLUSH_INTERVAL_SECONDS: float = 1.0
+    # Rows waiting to be binned beyond this are dropped (and counted) instead of delaying requests
+    DRIFT_MAX_BUFFERED_ROWS: int = 100000
+    
+    # Audit trail of every served score (inputs, output, model version, request ID), written by a background thread
+    AUDIT_ENABLED: bool = False
+    AUDIT_DIR: str = "audit"
+    # "ndjson" (gzip) or "parquet" (needs pyarrow)
+    AUDIT_FORMAT: str = "ndjson"
+    AUDIT_MAX_QUEUE_ROWS: int = 100000
+    AUDIT_BATCH_ROWS: int = 1000
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 1.0
+    # Segment rotation by uncompressed size or age
+    AUDIT_ROTATE_BYTES: int = 64 * 1024 * 1024
+    AUDIT_ROTATE_SECONDS: float = 3600.0
+    # When the queue is full: "drop_newest", "drop_oldest", "block" (up to AUDIT_BLOCK_TIMEOUT_MS) or "reject" (503)
+    AUDIT_OVERFLOW_POLICY: str = "drop_newest"
+    AUDIT_BLOCK_TIMEOUT_MS: float = 5.0
+    # Where closed segments go: "" (stay in AUDIT_DIR), a directory, or s3://bucket/prefix
+    AUDIT_UPLOAD_URI: str = ""
+    
     # AWS Config (loaded from env)
     AWS_REGION: str = "us-east-1"
     
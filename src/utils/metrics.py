@@ -0,0 +1,184 @@
+import bisect
+import threading
+from typing import Iterable
+
+# Latency buckets in seconds, from 100us up to 10s
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{k}="{_escape(v)}"' for k, v in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels.get(name, "") for name in self.labelnames)
+
+    def _header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return self._header() + [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    type_name = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """
+    Cumulative-bucket histogram; observations are O(log buckets).
+    """
+    type_name = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets: Iterable[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [per-bucket counts..., +Inf count], sum
+        self._counts: dict[tuple, list[int]] = {}
+        self._sums: dict[tuple, float] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+                self._sums[key] = 0.0
+            counts[idx] += 1
+            self._sums[key] += value
+
+    def snapshot(self, **labels) -> tuple[list[int], float]:
+        """
+        Returns (cumulative counts per bucket incl. +Inf, sum) for one label set.
+        """
+        key = self._key(labels)
+        with self._lock:
+            counts = list(self._counts.get(key, [0] * (len(self.buckets) + 1)))
+            total = self._sums.get(key, 0.0)
+        cumulative, running = [], 0
+        for c in counts:
+            running += c
+            cumulative.append(running)
+        return cumulative, total
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        with self._lock:
+            keys = list(self._counts)
+        for key in keys:
+            labels = dict(zip(self.labelnames, key))
+            cumulative, total = self.snapshot(**labels)
+            for bound, count in zip(self.buckets + (float("inf"),), cumulative):
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Minimal Prometheus text-format (0.0.4) registry, so the service can expose
+    /metrics without an extra dependency.
+    """
+    def __init__(self):
+        self._metrics: list[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self, extra: Iterable[_Metric] = ()) -> str:
+        lines = []
+        for metric in list(self._metrics) + list(extra):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry and the service's metrics
+REGISTRY = MetricsRegistry()
+
+REQUESTS_TOTAL = REGISTRY.counter(
+    "risk_http_requests_total", "HTTP requests by method, route and status", ("method", "path", "status"))
+REQUEST_ERRORS_TOTAL = REGISTRY.counter(
+    "risk_http_request_errors_total", "HTTP responses with status >= 400", ("path", "status"))
+REQUEST_DURATION = REGISTRY.histogram(
+    "risk_http_request_duration_seconds", "End-to-end request latency (perf_counter)", ("method", "path"))
+IN_FLIGHT = REGISTRY.gauge("risk_http_requests_in_flight", "Requests currently being processed")
+IN_FLIGHT.set(0)
+STAGE_DURATION = REGISTRY.histogram(
+    "risk_stage_duration_seconds",
+    "Per-stage latency: validate, transform (preprocessing), model, explain, serialize",
+    ("stage", "model_version"))
+EARLY_EXIT_ROWS = REGISTRY.counter(
+    "risk_early_exit_rows_total", "Rows scored in early-exit mode: exited after the tree prefix or finished with the full ensemble",
+    ("outcome", "model_version"))
+TREES_EVALUATED = REGISTRY.counter(
+    "risk_trees_evaluated_total", "Trees evaluated by early-exit scoring (divide by rows for the average)", ("model_version",))
+MODEL_INFO = REGISTRY.gauge("risk_model_info", "Loaded model versions (1 = active, 0 = loaded)", ("version", "role"))
+
+
+def observe_stages(durations: dict[str, float], model_version: str):
+    for stage, seconds in durations.items():
+        STAGE_DURATION.observe(seconds, stage=stage, model_version=model_version)
@@ -0,0 +1,29 @@
+import time
+from contextlib import contextmanager
+
+
+class StageTimer:
+    """
+    Collects per-stage wall-clock durations (perf_counter) for a single request or batch.
+    """
+    def __init__(self):
+        self.durations: dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations[name] = self.durations.get(name, 0.0) + time.perf_counter() - start
+
+    def copy(self) -> "StageTimer":
+        timer = StageTimer()
+        timer.durations = dict(self.durations)
+        return timer
+
+    def server_timing(self) -> str:
+        """
+        Formats the durations as a Server-Timing header value (milliseconds).
+        """
+        return ", ".join(f"{name};dur={seconds * 1000:.3f}" for name, seconds in self.durations.items())
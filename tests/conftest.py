@@ -0,0 +1,25 @@
+import pytest
+import xgboost as xgb
+from sklearn.pipeline import Pipeline
+
+from src.training.mock_data import generate_synthetic_data
+from src.training.preprocess import get_preprocessor, split_features_target
+
+
+@pytest.fixture(scope="session")
+def synthetic_df():
+    return generate_synthetic_data(n_rows=300)
+
+
+@pytest.fixture(scope="session")
+def trained_pipeline(synthetic_df):
+    """
+    Small throwaway champion-style pipeline trained on synthetic data.
+    """
+    X, y = split_features_target(synthetic_df)
+    pipeline = Pipeline([
+        ('preprocessor', get_preprocessor([], X.columns.tolist())),
+        ('classifier', xgb.XGBClassifier(n_estimators=20, max_depth=3, random_state=42, n_jobs=1))
+    ])
+    pipeline.fit(X, y)
+    return pipeline
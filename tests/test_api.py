@@ -4,6 +4,9 @@ from src.api.main import app
 from src.training.data_loader import load_data
 from unittest.mock import patch, MagicMock
 import pandas as pd
+import json
+import numpy as np
+import xgboost as xgb
 
 client = TestClient(app)
 
@@ -28,3 +31,165 @@ def test_data_loader_mock(mock_fetch):
     assert 'target' in df.columns # Renamed from default payment...
     assert 'pay_1' in df.columns # Renamed from pay_0
     assert df.shape == (2, 3) # 2 rows, 2 features + 1 target
+
+@pytest.fixture
+def loaded_model(trained_pipeline):
+    from src.api.main import models
+    from src.scoring.executor import InferenceExecutor
+    from src.scoring.registry import ModelRegistry, ShadowRunner
+    from src.scoring.scorer import Scorer
+    registry = ModelRegistry()
+    registry.register("test", Scorer(trained_pipeline))
+    registry.activate("test")
+    models['registry'] = registry
+    models['shadow'] = ShadowRunner(registry)
+    models['executor'] = InferenceExecutor("threadpool", max_pending=8)
+    yield trained_pipeline
+    models.clear()
+
+def _applicants(df, n):
+    return df.drop(columns=['target']).head(n).to_dict(orient='records')
+
+def test_predict_batch_matches_pipeline(loaded_model, synthetic_df):
+    rows = _applicants(synthetic_df, 5)
+    response = client.post("/predict/batch", json={"instances": rows})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["n_success"] == 5 and body["n_failed"] == 0
+
+    expected = loaded_model.predict_proba(pd.DataFrame(rows))[:, 1]
+    probs = [item["prediction"]["default_probability"] for item in body["results"]]
+    assert probs == pytest.approx(expected.tolist(), rel=1e-6)
+
+def test_predict_batch_reports_row_errors(loaded_model, synthetic_df):
+    rows = _applicants(synthetic_df, 5)
+    del rows[1]["age"]
+    rows[2]["sex"] = "abc"
+    rows[3]["age"] = "Infinity"
+    rows[4]["sex"] = 1e30
+    response = client.post("/predict/batch", json=rows)
+    body = response.json()
+    assert body["n_success"] == 1 and body["n_failed"] == 4
+    assert body["results"][0]["prediction"] is not None
+    assert body["results"][1]["errors"] == ["age: field required"]
+    assert body["results"][2]["errors"] == ["sex: value is not a valid number"]
+    assert body["results"][3]["errors"] == ["age: value is not a valid integer"]
+    assert body["results"][4]["errors"] == ["sex: value is not a valid integer"]
+
+def test_predict_batch_ndjson_and_columnar(loaded_model, synthetic_df):
+    rows = _applicants(synthetic_df, 2)
+    ndjson = "\n".join(json.dumps(r) for r in rows) + "\n{not json}\n"
+    response = client.post("/predict/batch", content=ndjson, headers={"Content-Type": "application/x-ndjson"})
+    body = response.json()
+    assert body["n_success"] == 2 and body["n_failed"] == 1
+    assert body["results"][2]["errors"][0].startswith("invalid JSON")
+
+    columns = pd.DataFrame(rows).to_dict(orient='list')
+    response = client.post("/predict/batch", json={"columns": columns})
+    assert response.json()["n_success"] == 2
+
+def test_predict_batch_accepts_empty_batches(loaded_model):
+    empty = {"n_success": 0, "n_failed": 0, "results": []}
+    for kwargs in ({"json": []}, {"json": {"instances": []}},
+                   {"content": "", "headers": {"Content-Type": "application/x-ndjson"}}):
+        response = client.post("/predict/batch", **kwargs)
+        assert response.status_code == 200
+        assert {key: response.json()[key] for key in empty} == empty
+
+def test_predict_single_pass_label_from_threshold(loaded_model, synthetic_df):
+    row = _applicants(synthetic_df, 1)[0]
+    response = client.post("/predict", json=row)
+    assert response.status_code == 200
+    body = response.json()
+    expected = loaded_model.predict_proba(pd.DataFrame([row]))[:, 1][0]
+    assert body["default_probability"] == pytest.approx(float(expected), rel=1e-6)
+    assert body["is_default"] == int(loaded_model.predict(pd.DataFrame([row]))[0])
+    timing = response.headers["Server-Timing"]
+    assert "transform" in timing and "model" in timing and "serialize" in timing
+
+def test_predict_explain_opt_in(loaded_model, synthetic_df):
+    from src.api.main import models
+    row = _applicants(synthetic_df, 1)[0]
+    plain = client.post("/predict", json=row).json()
+    assert plain["shap_values"] is None and plain["top_features"] is None
+
+    explained = client.post("/predict?explain=true&top_k=3", json=row).json()
+    assert explained["default_probability"] == plain["default_probability"]
+    assert len(explained["top_features"]) == 3
+    assert set(explained["shap_values"]) == set(row)
+    # Contributions are on the margin scale: bias + sum(contribs) == logit(p)
+    scorer = models['registry'].active
+    bias = scorer.booster.predict(xgb.DMatrix(scorer.transform(pd.DataFrame([row]))), pred_contribs=True)[0, -1]
+    p = explained["default_probability"]
+    assert bias + sum(explained["shap_values"].values()) == pytest.approx(np.log(p / (1 - p)), abs=1e-4)
+
+def test_predict_rejects_when_executor_full(loaded_model, synthetic_df):
+    from src.api.main import models
+    models['executor'].pending = models['executor'].max_pending
+    response = client.post("/predict", json=_applicants(synthetic_df, 1)[0])
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+def test_predict_served_from_cache_on_repeat(loaded_model, synthetic_df):
+    from src.api.main import models
+    from src.scoring.cache import InMemoryCache, PredictionCache
+    models['cache'] = PredictionCache(InMemoryCache())
+    row = _applicants(synthetic_df, 1)[0]
+    first = client.post("/predict", json=row)
+    second = client.post("/predict", json=row)
+    assert first.json() == second.json()
+    assert "cache_hit" in second.headers["Server-Timing"]
+    assert models['cache'].stats()["hits"] == 1
+
+def test_admin_hot_swap_and_shadow(loaded_model, synthetic_df, trained_pipeline, monkeypatch):
+    from src.api.main import models
+    from src.scoring.scorer import Scorer
+    monkeypatch.setattr("src.api.main.settings.ADMIN_TOKEN", "secret")
+    headers = {"X-Admin-Token": "secret"}
+    assert client.get("/admin/models").status_code == 401
+
+    # An applicant the active model does not label a default
+    row = next(r for r in _applicants(synthetic_df, 50) if client.post("/predict", json=r).json()["is_default"] == 0)
+    challenger = Scorer(trained_pipeline, threshold=0.0)
+    models['registry'].register("challenger", challenger)
+    assert client.post("/admin/models/shadow", json={"version": "challenger"}, headers=headers).status_code == 200
+
+    assert client.post("/predict", json=row).status_code == 200
+    models['shadow']._pool.shutdown(wait=True)
+    stats = models['shadow'].stats()
+    # Threshold 0 labels everyone a default, so the challenger disagrees with the active "no"
+    assert stats["scored"] == 1 and stats["label_disagreement_rate"] == 1.0
+
+    response = client.post("/admin/models/challenger/activate", headers=headers)
+    assert response.json()["active"] == "challenger" and response.json()["shadow"] is None
+    assert client.get("/health").json()["model_version"] == "challenger"
+    # Threshold 0 labels everyone as a default: the swapped model is serving
+    assert client.post("/predict", json=row).json()["is_default"] == 1
+
+def test_registry_keeps_loaded_versions_and_the_newest(trained_pipeline):
+    from src.scoring.registry import ModelRegistry
+    from src.scoring.scorer import Scorer
+    registry = ModelRegistry(max_versions=1)
+    registry.register("v1", Scorer(trained_pipeline), warm=False)
+    registry.activate("v1")
+    with pytest.raises(ValueError):
+        registry.register("v1", Scorer(trained_pipeline), warm=False)
+
+    # Over the limit, but neither the active nor the new version is evicted
+    registry.register("v2", Scorer(trained_pipeline), warm=False)
+    registry.activate("v2")
+    registry.register("v3", Scorer(trained_pipeline), warm=False)
+    assert [v["version"] for v in registry.describe()["versions"]] == ["v2", "v3"]
+    registry.activate("v3")
+
+def test_metrics_exposes_request_and_stage_histograms(loaded_model, synthetic_df):
+    assert client.post("/predict", json=_applicants(synthetic_df, 1)[0]).status_code == 200
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    assert 'risk_http_requests_total{method="POST",path="/predict",status="200"}' in text
+    for stage in ("validate", "transform", "model", "serialize"):
+        assert f'risk_stage_duration_seconds_count{{stage="{stage}",model_version="test"}}' in text
+    assert 'risk_model_info{version="test",role="active"} 1' in text
+    assert 'risk_inference_pending{backend="threadpool"} 0' in text
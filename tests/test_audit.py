@@ -0,0 +1,194 @@
+import asyncio
+import os
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.schemas import FEATURE_COLUMNS, PredictionRequest
+from src.monitoring.audit import AuditQueueFull, AuditSink, LocalDirectoryUploader, Uploader, read_audit_segment
+from src.training.preprocess import split_features_target
+
+
+@pytest.fixture
+def features(synthetic_df):
+    X, _ = split_features_target(synthetic_df)
+    return X
+
+
+def _segments(directory):
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory) if not name.endswith(".partial"))
+
+
+@pytest.mark.parametrize("fmt", ["ndjson", "parquet"])
+def test_records_are_flushed_on_shutdown(features, tmp_path, fmt):
+    if fmt == "parquet":
+        pytest.importorskip("pyarrow")
+    sink = AuditSink(str(tmp_path), fmt=fmt, batch_rows=10, flush_interval=0.05)
+    sink.start()
+    request = PredictionRequest(**features.iloc[0].to_dict())
+    sink.submit("rid-1", "/predict", "v1", [request], [0.25], [0])
+    sink.submit("rid-2", "/predict/batch", "v1", features.head(20), np.linspace(0, 1, 20),
+                (np.linspace(0, 1, 20) >= 0.5).astype(int), row_indices=np.arange(20) * 2)
+    sink.shutdown()
+
+    [segment] = _segments(tmp_path)
+    records = read_audit_segment(segment)
+    assert len(records) == 21
+    assert list(records.columns[:5]) == ["timestamp", "request_id", "endpoint", "model_version", "row_index"]
+    assert set(FEATURE_COLUMNS) <= set(records.columns)
+    first = records.iloc[0]
+    assert (first["request_id"], first["default_probability"], first["is_default"]) == ("rid-1", 0.25, 0)
+    assert first["limit_bal"] == features.iloc[0]["limit_bal"]
+    assert records["row_index"].tolist()[1:] == list(range(0, 40, 2))
+    assert sink.stats()["written"] == 21 and sink.stats()["segments"] == 1
+
+
+def test_parquet_schema_does_not_follow_the_first_batch(features, tmp_path):
+    pytest.importorskip("pyarrow")
+    sink = AuditSink(str(tmp_path), fmt="parquet")
+    # Whole-number amounts first, so type inference would make the float fields int64
+    whole = features.head(3).astype({col: "int64" for col in ["limit_bal", "bill_amt1", "pay_amt1"]})
+    sink.submit(None, "/predict/batch", "v1", whole, np.zeros(3), np.zeros(3))
+    sink._drain()
+    cents = PredictionRequest(**{**features.iloc[0].to_dict(), "limit_bal": 1.5, "bill_amt1": 10.25})
+    sink.submit("rid", "/predict", "v1", [cents], [0.75], [1])
+    sink._drain()
+    sink.shutdown()
+
+    records = read_audit_segment(_segments(tmp_path)[0])
+    assert sink.stats()["write_errors"] == 0 and len(records) == 4
+    assert (records["limit_bal"].iloc[3], records["bill_amt1"].iloc[3]) == (1.5, 10.25)
+    assert records["request_id"].tolist() == [None] * 3 + ["rid"]
+
+
+def test_rotation_and_upload(features, tmp_path):
+    uploaded = tmp_path / "uploaded"
+    sink = AuditSink(str(tmp_path / "spool"), batch_rows=1, rotate_bytes=1, uploader=LocalDirectoryUploader(str(uploaded)))
+    for i in range(3):
+        sink.submit(f"rid-{i}", "/predict/batch", "v1", features.head(5), np.full(5, 0.1), np.zeros(5))
+        sink._drain()
+        sink._rotate()
+    sink.shutdown()
+    assert len(_segments(uploaded)) == 3
+    assert _segments(tmp_path / "spool") == []
+    assert sink.stats()["uploaded"] == 3
+
+
+def test_failed_uploads_are_kept_and_retried(features, tmp_path):
+    class Flaky(Uploader):
+        def __init__(self):
+            self.fail, self.done = True, []
+
+        def upload(self, path):
+            if self.fail:
+                raise OSError("unreachable")
+            self.done.append(os.path.basename(path))
+            os.remove(path)
+
+    uploader = Flaky()
+    sink = AuditSink(str(tmp_path), uploader=uploader)
+    sink.submit("rid", "/predict", "v1", features.head(2), np.zeros(2), np.zeros(2))
+    sink._drain()
+    sink._rotate()
+    assert len(_segments(tmp_path)) == 1 and sink.stats()["upload_errors"] == 1
+    uploader.fail = False
+    sink.submit("rid", "/predict", "v1", features.head(2), np.zeros(2), np.zeros(2))
+    sink.shutdown()
+    assert len(uploader.done) == 2 and _segments(tmp_path) == []
+
+
+def test_overflow_policies(features, tmp_path):
+    rows = features.head(4)
+
+    def fill(policy):
+        # No writer thread: the queue only drains when asked to
+        sink = AuditSink(str(tmp_path / policy), max_queue_rows=10, policy=policy, block_timeout=0.01)
+        sink.submit("a", "/predict", "v1", rows, np.zeros(4), np.zeros(4))
+        sink.submit("b", "/predict", "v1", rows, np.zeros(4), np.zeros(4))
+        return sink
+
+    sink = fill("drop_newest")
+    assert not sink.submit("c", "/predict", "v1", rows, np.zeros(4), np.zeros(4))
+    assert sink.stats()["dropped"] == 4 and sink.stats()["queued_rows"] == 8
+
+    sink = fill("drop_oldest")
+    assert sink.submit("c", "/predict", "v1", rows, np.zeros(4), np.zeros(4))
+    assert [entry[1] for entry in sink._queue] == ["b", "c"] and sink.stats()["dropped"] == 4
+
+    sink = fill("block")
+    assert not sink.submit("c", "/predict", "v1", rows, np.zeros(4), np.zeros(4))
+    assert sink.stats()["dropped"] == 4
+
+    sink = fill("reject")
+    with pytest.raises(AuditQueueFull):
+        sink.submit("c", "/predict", "v1", rows, np.zeros(4), np.zeros(4))
+    assert sink.stats()["rejected"] == 4
+
+
+def test_block_policy_waits_off_the_event_loop(features, tmp_path):
+    rows = features.head(4)
+    sink = AuditSink(str(tmp_path), max_queue_rows=4, policy="block", block_timeout=0.2)
+    sink.submit("a", "/predict", "v1", rows, np.zeros(4), np.zeros(4))
+
+    async def submit_while_draining():
+        waiting = asyncio.create_task(sink.submit_async("b", "/predict", "v1", rows, np.zeros(4), np.zeros(4)))
+        # The loop keeps running while the submit waits for room
+        await asyncio.sleep(0.02)
+        assert not waiting.done()
+        await asyncio.to_thread(sink._drain)
+        return await waiting
+
+    assert asyncio.run(submit_while_draining())
+    assert [entry[1] for entry in sink._queue] == ["b"] and sink.stats()["dropped"] == 0
+
+
+def test_unclosed_segments_are_recovered_on_start(features, tmp_path):
+    uploaded = tmp_path / "uploaded"
+    crashed = AuditSink(str(tmp_path / "spool"))
+    crashed.submit("rid", "/predict", "v1", features.head(5), np.zeros(5), np.zeros(5))
+    crashed._drain()
+    # The writer dies mid-line: no gzip trailer, no rename
+    crashed._segment._file.write(b'{"request_id": "cut off')
+    crashed._segment._file.flush()
+    partial = crashed._segment_path + ".partial"
+    dead_pid = partial.replace(f"-{os.getpid()}-", "-999999999-")
+    os.rename(partial, dead_pid)
+
+    sink = AuditSink(str(tmp_path / "spool"), uploader=LocalDirectoryUploader(str(uploaded)))
+    sink.start()
+    sink.shutdown()
+    [segment] = _segments(uploaded)
+    assert len(read_audit_segment(segment)) == 5
+    assert os.listdir(tmp_path / "spool") == [] and sink.stats()["recovered_segments"] == 1
+
+
+def test_api_audits_every_served_score(trained_pipeline, features, tmp_path):
+    from src.api.main import app, models
+    from src.scoring.executor import InferenceExecutor
+    from src.scoring.registry import ModelRegistry
+    from src.scoring.scorer import Scorer
+
+    client = TestClient(app)
+    registry = ModelRegistry()
+    registry.register("test", Scorer(trained_pipeline))
+    registry.activate("test")
+    sink = AuditSink(str(tmp_path))
+    models.update(registry=registry, audit=sink, executor=InferenceExecutor("threadpool", max_pending=8))
+    try:
+        rows = features.head(4).to_dict(orient="records")
+        single = client.post("/predict", json=rows[0])
+        batch = client.post("/predict/batch", json=[rows[1], {"age": 30}, rows[2], rows[3]])
+        assert client.get("/audit/stats").json()["submitted"] == 4
+    finally:
+        models.clear()
+    sink.shutdown()
+
+    records = read_audit_segment(_segments(tmp_path)[0])
+    assert records["request_id"].tolist() == [single.headers["X-Request-ID"]] + [batch.headers["X-Request-ID"]] * 3
+    assert records["endpoint"].tolist() == ["/predict"] + ["/predict/batch"] * 3
+    assert records["row_index"].tolist() == [0, 0, 2, 3]
+    assert records["model_version"].eq("test").all()
+    assert records["default_probability"].iloc[0] == pytest.approx(single.json()["default_probability"])
+    assert records["default_probability"].iloc[1:].tolist() == pytest.approx(
+        [batch.json()["results"][i]["prediction"]["default_probability"] for i in (0, 2, 3)])
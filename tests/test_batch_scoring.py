@@ -0,0 +1,68 @@
+import json
+
+import joblib
+import pandas as pd
+import pytest
+
+from src.scoring import batch
+
+
+@pytest.fixture
+def model_dir(trained_pipeline, tmp_path):
+    directory = tmp_path / "model"
+    directory.mkdir()
+    joblib.dump(trained_pipeline, directory / "model.pkl")
+    return str(directory)
+
+
+def test_chunked_scoring_matches_pipeline_and_isolates_bad_rows(model_dir, trained_pipeline, synthetic_df, tmp_path):
+    X = synthetic_df.drop(columns=['target']).head(7).reset_index(drop=True)
+    raw = X.astype(object)
+    raw.loc[3, 'age'] = "not-a-number"
+    raw.insert(0, 'account_id', range(100, 107))
+    source = tmp_path / "in.csv"
+    raw.to_csv(source, index=False)
+
+    summary = batch.run(str(source), str(tmp_path / "out.csv"), chunk_size=3, model_dir=model_dir, id_column='account_id')
+    assert summary["rows"] == 7 and summary["rows_failed"] == 1 and summary["chunks"] == 3
+
+    out = pd.read_csv(tmp_path / "out.csv")
+    assert out["row"].tolist() == list(range(7))
+    assert out["account_id"].tolist() == list(range(100, 107))
+    assert "age" in out.loc[3, "error"] and pd.isna(out.loc[3, "default_probability"])
+    good = out.drop(index=3)
+    expected = trained_pipeline.predict_proba(X.drop(index=3))[:, 1]
+    assert good["default_probability"].to_numpy() == pytest.approx(expected, rel=1e-6)
+
+
+def test_resume_continues_from_checkpoint(model_dir, synthetic_df, tmp_path):
+    X = synthetic_df.drop(columns=['target']).head(6)
+    source = tmp_path / "in.jsonl"
+    source.write_text("\n".join(json.dumps(r) for r in X.to_dict(orient='records')) + "\n")
+    output = str(tmp_path / "out.jsonl")
+
+    batch.run(str(source), output, chunk_size=2, model_dir=model_dir)
+    full = open(output).read()
+
+    # Simulate a crash after the first chunk: checkpoint says 1 chunk, file has trailing junk
+    checkpoint = json.load(open(output + ".checkpoint.json"))
+    first_chunk_bytes = len("".join(full.splitlines(keepends=True)[:2]).encode())
+    checkpoint.update(chunks_done=1, rows_done=2, rows_scored=2, output_bytes=first_chunk_bytes)
+    json.dump(checkpoint, open(output + ".checkpoint.json", "w"))
+    with open(output, "a") as f:
+        f.write('{"partial": ')
+
+    summary = batch.run(str(source), output, chunk_size=2, model_dir=model_dir, resume=True)
+    assert summary["rows"] == 6
+    assert open(output).read() == full
+
+    # Resuming with another ID column would append rows with a different layout
+    with pytest.raises(SystemExit, match="id column"):
+        batch.run(str(source), output, chunk_size=2, model_dir=model_dir, id_column="account_id", resume=True)
+
+
+def test_json_array_input_is_refused(tmp_path):
+    source = tmp_path / "in.json"
+    source.write_text("[]")
+    with pytest.raises(SystemExit, match="jsonl"):
+        next(batch.iter_chunks(str(source), 10))
@@ -0,0 +1,56 @@
+import asyncio
+
+from src.scoring.batcher import MicroBatcher
+
+
+def test_concurrent_submits_are_coalesced():
+    calls = []
+
+    def score(items):
+        calls.append(list(items))
+        return [item * 10 for item in items]
+
+    async def run():
+        batcher = MicroBatcher(score, max_batch_size=8, max_wait_ms=50)
+        await batcher.start()
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+        stats = batcher.stats()
+        await batcher.stop()
+        return results, stats
+
+    results, stats = asyncio.run(run())
+    assert results == [0, 10, 20, 30, 40]
+    assert calls == [[0, 1, 2, 3, 4]]
+    assert stats["batches_total"] == 1 and stats["batch_size_histogram"]["le_8"] == 1
+
+
+def test_batch_failure_propagates_to_every_caller():
+    def score(items):
+        raise ValueError("boom")
+
+    async def run():
+        batcher = MicroBatcher(score, max_batch_size=4, max_wait_ms=5)
+        await batcher.start()
+        results = await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+        await batcher.stop()
+        return results
+
+    assert all(isinstance(r, ValueError) for r in asyncio.run(run()))
+
+
+def test_stop_fails_the_batch_being_scored():
+    async def run():
+        started = asyncio.Event()
+
+        async def slow_runner(fn, items):
+            started.set()
+            await asyncio.sleep(10)
+
+        batcher = MicroBatcher(lambda items: items, max_batch_size=2, max_wait_ms=1, runner=slow_runner)
+        await batcher.start()
+        callers = [asyncio.create_task(batcher.submit(i)) for i in range(3)]
+        await started.wait()
+        await batcher.stop()
+        return await asyncio.wait_for(asyncio.gather(*callers, return_exceptions=True), timeout=1)
+
+    assert all(isinstance(r, RuntimeError) for r in asyncio.run(run()))
@@ -0,0 +1,37 @@
+from benchmarks.regression import compare, flatten
+
+
+def test_flatten_keeps_numeric_leaves():
+    flat = flatten({"load": {"p50_ms": 2.0, "status_counts": {"200": 10}, "engine": "compiled"}})
+    assert flat == {"load.p50_ms": 2.0, "load.status_counts.200": 10.0}
+
+
+def test_compare_flags_slower_latency_and_lower_throughput():
+    baseline = {"load": {"p50_ms": 10.0, "p95_ms": 20.0, "rps": 100.0}, "stages": {"serialize": {"p50_ms": 0.001}}}
+    current = {"load": {"p50_ms": 13.0, "p95_ms": 19.0, "rps": 70.0}, "stages": {"serialize": {"p50_ms": 0.01}}}
+    rows = {row["metric"]: row for row in compare(current, baseline, tolerance=0.2)}
+    assert rows["load.p50_ms"]["regressed"]
+    assert not rows["load.p95_ms"]["regressed"]
+    assert rows["load.rps"]["regressed"]
+    # Microsecond-scale stages are too noisy to compare
+    assert "stages.serialize.p50_ms" not in rows
+
+
+def test_codec_benchmark_covers_every_format(synthetic_df):
+    from benchmarks import bench_codecs
+    from src.training.preprocess import split_features_target
+
+    X, _ = split_features_target(synthetic_df)
+    results = bench_codecs.run([1, 50], iterations=2, X=X)
+    assert {"json", "json_native"} <= set(results["rows_1"]["decode_request"])
+    assert {"pydantic", "json"} <= set(results["rows_50"]["encode_response"])
+    assert all(m["bytes"] > 0 for m in results["rows_50"]["encode_response"].values())
+
+
+def test_feature_store_benchmark_reports_lookup_and_scoring(tmp_path):
+    from benchmarks import bench_feature_store
+
+    results = bench_feature_store.run(3000, iterations=5, directory=str(tmp_path), batch_size=10)
+    assert results["accounts"] == 3000 and results["store_bytes"] > 0
+    assert {"score_by_id", "score_from_request_fields"} <= set(results["pipeline"])
+    assert results["lookup"]["p50_ms"] > 0
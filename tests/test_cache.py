@@ -0,0 +1,37 @@
+import time
+
+from src.api.schemas import PredictionRequest
+from src.scoring.cache import InMemoryCache, PredictionCache
+
+
+def _request(**overrides):
+    fields = {name: 1 for name in PredictionRequest.model_fields}
+    fields.update(overrides)
+    return PredictionRequest(**fields)
+
+
+def test_key_is_canonical_and_versioned():
+    a = PredictionCache.key(_request(limit_bal=1000), 0, "v1", 0.5)
+    b = PredictionCache.key(_request(limit_bal=1000.0), 0, "v1", 0.5)
+    assert a == b
+    assert a != PredictionCache.key(_request(limit_bal=1000), 0, "v2", 0.5)
+    assert a != PredictionCache.key(_request(limit_bal=1000), 5, "v1", 0.5)
+
+
+def test_lru_eviction_ttl_and_invalidation(monkeypatch):
+    backend = InMemoryCache(max_entries=2, ttl_seconds=10)
+    cache = PredictionCache(backend)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1       # "a" becomes most recently used
+    cache.set("c", 3)                # evicts "b"
+    assert cache.get("b") is None
+
+    now = time.monotonic()
+    monkeypatch.setattr("src.scoring.cache.time.monotonic", lambda: now + 60)
+    assert cache.get("a") is None    # expired
+
+    cache.invalidate()
+    stats = cache.stats()
+    assert stats["size"] == 0 and stats["evictions"] == 1 and stats["expirations"] == 1
+    assert stats["hits"] == 1 and stats["misses"] == 2 and stats["invalidations"] == 1
@@ -0,0 +1,112 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.codecs import ARROW, ARROW_FILE, JSON, MSGPACK, NotAcceptable, negotiate
+from src.api.main import app
+from src.api.schemas import BatchPredictionResponse
+
+msgpack = pytest.importorskip("msgpack")
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def loaded_model(trained_pipeline):
+    from src.api.main import models
+    from src.scoring.executor import InferenceExecutor
+    from src.scoring.registry import ModelRegistry
+    from src.scoring.scorer import Scorer
+    registry = ModelRegistry()
+    registry.register("test", Scorer(trained_pipeline))
+    registry.activate("test")
+    models['registry'] = registry
+    models['executor'] = InferenceExecutor("threadpool", max_pending=8)
+    yield trained_pipeline
+    models.clear()
+
+
+def _applicants(df, n):
+    return df.drop(columns=['target']).head(n).to_dict(orient='records')
+
+
+def test_negotiate():
+    assert negotiate("", (JSON, MSGPACK)) == JSON
+    assert negotiate("*/*", (JSON, MSGPACK)) == JSON
+    assert negotiate("application/x-msgpack", (JSON, MSGPACK)) == MSGPACK
+    assert negotiate("application/json;q=0.5, application/msgpack", (JSON, MSGPACK)) == MSGPACK
+    assert negotiate(f"{ARROW}, application/json;q=0.1", (JSON, MSGPACK)) == JSON
+    with pytest.raises(NotAcceptable):
+        negotiate(ARROW, (JSON, MSGPACK))
+    with pytest.raises(NotAcceptable):
+        negotiate("application/json;q=0", (JSON, MSGPACK))
+
+
+def test_predict_msgpack_matches_json(loaded_model, synthetic_df):
+    row = _applicants(synthetic_df, 1)[0]
+    expected = client.post("/predict", json=row).json()
+    response = client.post("/predict", content=msgpack.packb(row),
+                           headers={"Content-Type": MSGPACK, "Accept": MSGPACK})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == MSGPACK
+    assert msgpack.unpackb(response.content) == expected
+
+    assert client.post("/predict", json=row, headers={"Accept": ARROW}).status_code == 406
+
+
+def test_predict_validation_errors_keep_fastapi_format(loaded_model, synthetic_df):
+    row = {**_applicants(synthetic_df, 1)[0], "age": "old"}
+    response = client.post("/predict", json=row)
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", "age"]
+    assert client.post("/predict", content=b"{", headers={"Content-Type": JSON}).status_code == 422
+    assert client.post("/predict", content=b"\xc1", headers={"Content-Type": MSGPACK}).status_code == 400
+
+
+def test_batch_json_body_matches_response_model(loaded_model, synthetic_df):
+    rows = _applicants(synthetic_df, 4) + [{"age": 30}]
+    response = client.post("/predict/batch?explain=true&top_k=3", json=rows)
+    parsed = BatchPredictionResponse.model_validate_json(response.content)
+    assert json.loads(parsed.model_dump_json()) == response.json()
+    assert parsed.n_success == 4 and parsed.n_failed == 1
+    assert len(parsed.results[0].prediction.top_features) == 3
+
+
+def test_batch_msgpack_round_trip(loaded_model, synthetic_df):
+    rows = _applicants(synthetic_df, 5)
+    expected = client.post("/predict/batch", json={"instances": rows}).json()
+    response = client.post("/predict/batch", content=msgpack.packb({"instances": rows}),
+                           headers={"Content-Type": MSGPACK, "Accept": MSGPACK})
+    assert response.status_code == 200
+    assert msgpack.unpackb(response.content) == expected
+
+
+def test_batch_arrow_round_trip(loaded_model, synthetic_df):
+    pa = pytest.importorskip("pyarrow")
+    rows = _applicants(synthetic_df, 6)
+    table = pa.Table.from_pandas(pd.DataFrame(rows).assign(age=lambda df: df["age"].where(df.index != 2)),
+                                 preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+
+    response = client.post("/predict/batch?explain=true&top_k=2", content=sink.getvalue().to_pybytes(),
+                           headers={"Content-Type": ARROW, "Accept": ARROW})
+    assert response.status_code == 200
+    result = pa.ipc.open_stream(response.content).read_all()
+    assert result.schema.metadata[b"n_success"] == b"5"
+    frame = result.to_pandas()
+    expected = loaded_model.predict_proba(pd.DataFrame(rows).drop(index=2))[:, 1]
+    np.testing.assert_allclose(frame["default_probability"].drop(index=2), expected, rtol=1e-6)
+    assert np.isnan(frame.loc[2, "default_probability"])
+    assert list(frame.loc[2, "errors"]) == ["age: field required"]
+    assert len(frame.loc[0, "top_features"]) == 2
+
+    # The file format is written as a file, not relabelled stream bytes
+    response = client.post("/predict/batch", content=sink.getvalue().to_pybytes(),
+                           headers={"Content-Type": ARROW, "Accept": ARROW_FILE})
+    assert response.headers["content-type"] == ARROW_FILE
+    assert pa.ipc.open_file(response.content).read_all().num_rows == 6
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+from src.training.data_loader import normalize_columns, read_local_dataset
+from src.training.dataset_cache import load_cached
+
+
+def _write_source(path, df):
+    df.rename(columns={'target': 'default payment next month', 'pay_1': 'PAY_0'}).to_csv(path, index=False)
+
+
+def test_cache_roundtrip_with_compact_dtypes(tmp_path, synthetic_df):
+    source = tmp_path / "credit.csv"
+    _write_source(source, synthetic_df)
+    processed = str(tmp_path / "processed")
+
+    calls = []
+    def parse(path):
+        calls.append(path)
+        return read_local_dataset(path)
+
+    first = load_cached(str(source), parse, processed)
+    second = load_cached(str(source), parse, processed)
+    assert len(calls) == 1
+    assert list(second.columns) == list(synthetic_df.columns)
+    assert second["pay_1"].dtype == np.int8 and second["sex"].dtype == np.int8 and second["education"].dtype == np.int8
+    assert second["bill_amt1"].dtype == np.float32
+    # Columns are backed directly by the memory-mapped files
+    assert isinstance(second["pay_1"].to_numpy().base, np.memmap) or isinstance(second["pay_1"].to_numpy(), np.memmap)
+    pd.testing.assert_frame_equal(first, second)
+    np.testing.assert_allclose(second["bill_amt1"], synthetic_df["bill_amt1"], rtol=1e-6)
+    assert (second["pay_1"].to_numpy() == synthetic_df["pay_1"].to_numpy()).all()
+
+
+def test_cache_rebuilt_when_source_changes(tmp_path, synthetic_df):
+    source = tmp_path / "credit.csv"
+    processed = tmp_path / "processed"
+    _write_source(source, synthetic_df)
+    load_cached(str(source), read_local_dataset, str(processed))
+    _write_source(source, synthetic_df.head(10))
+    df = load_cached(str(source), read_local_dataset, str(processed))
+    assert len(df) == 10
+    # Only the cache for the current checksum is kept
+    assert len([p for p in processed.iterdir() if not p.name.startswith(".")]) == 1
+
+
+def test_normalize_columns_handles_raw_uci_names():
+    raw = pd.DataFrame({'X1': [1000], 'X6': [0], 'Y': [1], 'ID': [7]})
+    assert list(normalize_columns(raw).columns) == ['limit_bal', 'pay_1', 'target']
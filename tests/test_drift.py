@@ -0,0 +1,125 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from scipy.stats import ks_2samp
+
+from src.api.schemas import FEATURE_COLUMNS, PredictionRequest
+from src.monitoring.drift import (
+    SCORE_COLUMN, DriftMonitor, SlidingWindowCounts, build_reference, compare, ks_binned, merge_reference
+)
+from src.training.mock_data import generate_synthetic_data
+from src.training.preprocess import split_features_target
+
+
+@pytest.fixture(scope="module")
+def reference_data():
+    X, _ = split_features_target(generate_synthetic_data(n_rows=5000, seed=1))
+    scores = np.random.default_rng(0).beta(2, 6, len(X))
+    return X, scores
+
+
+def test_reference_bins_every_feature_and_the_score(reference_data):
+    X, scores = reference_data
+    reference = build_reference(X, scores, n_bins=10)
+    assert set(reference) == set(FEATURE_COLUMNS) | {SCORE_COLUMN}
+    for column in reference.values():
+        assert len(column["counts"]) == len(column["edges"]) + 1 <= 11
+        assert sum(column["counts"]) == len(X)
+    # Low-cardinality features get one bin per value
+    assert len(reference["sex"]["counts"]) == X["sex"].nunique()
+
+
+def test_merged_reference_keeps_edges_and_adds_counts(reference_data):
+    X, scores = reference_data
+    reference = build_reference(X.iloc[:4000], scores[:4000])
+    merged = merge_reference(reference, X.iloc[4000:], scores[4000:] / 2)
+    for name in FEATURE_COLUMNS:
+        assert merged[name]["edges"] == reference[name]["edges"]
+        assert sum(merged[name]["counts"]) == len(X)
+    edges = reference["limit_bal"]["edges"]
+    assert merged["limit_bal"]["counts"] == np.bincount(np.searchsorted(edges, X["limit_bal"], side="right"),
+                                                        minlength=len(edges) + 1).tolist()
+    assert merged[SCORE_COLUMN] == build_reference(X.iloc[:0], scores[4000:] / 2)[SCORE_COLUMN]
+
+
+def test_same_distribution_is_stable_and_shifted_one_drifts(reference_data):
+    X, scores = reference_data
+    reference = build_reference(X, scores)
+    fresh, _ = split_features_target(generate_synthetic_data(n_rows=5000, seed=2))
+    shifted = fresh.assign(limit_bal=fresh["limit_bal"] * 3)
+
+    def counts_for(frame):
+        return {
+            name: np.bincount(np.searchsorted(reference[name]["edges"], frame[name], side="right"),
+                              minlength=len(reference[name]["counts"]))
+            for name in FEATURE_COLUMNS
+        }
+
+    stable = compare(reference, counts_for(fresh))
+    assert all(column["status"] == "ok" for column in stable.values() if column["n"])
+    drifted = compare(reference, counts_for(shifted))
+    assert drifted["limit_bal"]["status"] == "drift"
+    assert drifted["age"]["status"] == "ok"
+    # Binned KS never exceeds the exact statistic
+    exact = ks_2samp(X["limit_bal"], shifted["limit_bal"]).statistic
+    assert ks_binned(reference["limit_bal"]["counts"], counts_for(shifted)["limit_bal"]) <= exact + 1e-9
+
+
+def test_sliding_window_expires_old_buckets():
+    now = [1000.0]
+    reference = {"x": {"edges": [0.5], "counts": [10, 10]}}
+    window = SlidingWindowCounts(reference, window_seconds=60, n_buckets=6, clock=lambda: now[0])
+    window.add({"x": np.zeros(5)})
+    now[0] += 30
+    window.add({"x": np.ones(3)})
+    assert window.window()["x"].tolist() == [5, 3]
+    assert window.window(10)["x"].tolist() == [0, 3]
+    now[0] += 45
+    assert window.window()["x"].tolist() == [0, 3]
+    now[0] += 60
+    assert window.window()["x"].tolist() == [0, 0]
+
+
+def test_monitor_buffers_off_the_request_path_and_drops_when_full(reference_data):
+    X, scores = reference_data
+    monitor = DriftMonitor(build_reference(X, scores), flush_interval=3600, max_buffered_rows=150)
+    monitor.record(X.head(100), scores[:100])
+    monitor.record([PredictionRequest(**row) for row in X.head(40).to_dict(orient="records")], scores[:40])
+    monitor.record(X.head(20), scores[:20])
+    assert monitor.rows_recorded == 0
+    monitor.flush()
+    report = monitor.report()
+    assert report["rows_recorded"] == 140 and report["rows_dropped"] == 20
+    assert report["columns"]["age"]["n"] == 140
+    assert report["columns"][SCORE_COLUMN]["n"] == 140
+
+
+def test_drift_endpoint(trained_pipeline, synthetic_df):
+    from src.api.main import app, models
+    from src.scoring.executor import InferenceExecutor
+    from src.scoring.registry import ModelRegistry
+    from src.scoring.scorer import Scorer
+
+    client = TestClient(app)
+    assert client.get("/drift").status_code == 503
+
+    X, _ = split_features_target(synthetic_df)
+    registry = ModelRegistry()
+    registry.register("test", Scorer(trained_pipeline))
+    registry.activate("test")
+    monitor = DriftMonitor(build_reference(X, trained_pipeline.predict_proba(X)[:, 1]), flush_interval=3600)
+    models.update(registry=registry, drift=monitor, executor=InferenceExecutor("threadpool", max_pending=8))
+    try:
+        rows = X.head(10).to_dict(orient="records")
+        assert client.post("/predict", json=rows[0]).status_code == 200
+        assert client.post("/predict/batch", json=rows[1:] + [{"age": "bad"}]).status_code == 200
+        monitor.flush()
+        body = client.get("/drift", params={"window_seconds": 60}).json()
+        assert body["rows_recorded"] == 10
+        # Whole buckets of 300 s are summed, and no more than the monitor keeps
+        assert body["window_seconds"] == 300
+        assert client.get("/drift", params={"window_seconds": 86400}).status_code == 422
+        assert body["columns"][SCORE_COLUMN]["n"] == 10
+        assert "risk_drift_psi" in client.get("/metrics").text
+    finally:
+        models.clear()
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from src.scoring.early_exit import (
+    EarlyExitConfig, calibrate_early_exit, evaluate_early_exit, load_early_exit, predict_early_exit, save_early_exit
+)
+from src.training.mock_data import generate_synthetic_data
+from src.training.preprocess import split_features_target
+
+
+@pytest.fixture(scope="module")
+def scored(trained_pipeline):
+    X, y = split_features_target(generate_synthetic_data(n_rows=2000, seed=5))
+    booster = trained_pipeline.named_steps['classifier'].get_booster()
+    return booster, trained_pipeline.named_steps['preprocessor'].transform(X).astype(np.float32), y.to_numpy()
+
+
+def test_calibrated_band_respects_flip_rate(scored):
+    booster, X, y = scored
+    config, candidates = calibrate_early_exit(booster, X, threshold=0.5, max_flip_rate=0.01)
+    assert config.n_trees == booster.num_boosted_rounds() == 20
+    assert all(c["flip_rate"] <= 0.01 for c in candidates)
+    assert config.prefix_trees == min(candidates, key=lambda c: c["avg_trees"])["prefix_trees"]
+
+    report = evaluate_early_exit(booster, X, y, config, threshold=0.5)
+    assert report["flip_rate"] <= 0.01
+    assert report["avg_trees"] < config.n_trees
+    assert report["accuracy_delta"] == pytest.approx(report["accuracy_early_exit"] - report["accuracy_full"])
+
+
+def test_rows_in_band_get_the_full_ensemble_score(scored):
+    booster, X, _ = scored
+    config, _ = calibrate_early_exit(booster, X, threshold=0.5, max_flip_rate=0.01)
+    probs, trees = predict_early_exit(booster, X, config)
+    full = booster.inplace_predict(X)
+    finished = trees == config.n_trees
+    assert finished.any() and not finished.all()
+    np.testing.assert_allclose(probs[finished], full[finished], rtol=1e-5)
+
+    # An unbounded band always finishes, so it reproduces the full model
+    probs, trees = predict_early_exit(booster, X, config._replace(band=np.inf))
+    np.testing.assert_allclose(probs, full, rtol=1e-5)
+    assert (trees == config.n_trees).all()
+
+
+def test_load_scorer_applies_matching_calibration(trained_pipeline, scored, tmp_path, monkeypatch):
+    import joblib
+    from src.scoring.scorer import load_scorer
+    from src.utils.config import settings
+
+    booster, X, _ = scored
+    config, _ = calibrate_early_exit(booster, X, threshold=settings.DECISION_THRESHOLD, max_flip_rate=0.01)
+    joblib.dump(trained_pipeline, tmp_path / "model.pkl")
+    save_early_exit(config, str(tmp_path / "early_exit.json"))
+    assert load_early_exit(str(tmp_path / "early_exit.json")) == config
+
+    assert load_scorer("pipeline", str(tmp_path)).early_exit is None
+    monkeypatch.setattr(settings, "EARLY_EXIT_ENABLED", True)
+    scorer = load_scorer("pipeline", str(tmp_path))
+    assert scorer.early_exit == config
+    features, _ = split_features_target(generate_synthetic_data(n_rows=50, seed=6))
+    np.testing.assert_allclose(scorer.score(features).probabilities,
+                               predict_early_exit(booster, scorer.transform(features), config)[0], rtol=1e-6)
+    # Explanations come from the full ensemble, and so does the probability they explain
+    np.testing.assert_allclose(scorer.score(features, top_k=3).probabilities,
+                               trained_pipeline.predict_proba(features)[:, 1], rtol=1e-6)
+
+    save_early_exit(EarlyExitConfig(**{**config.to_dict(), "n_trees": 999}), str(tmp_path / "early_exit.json"))
+    assert load_scorer("pipeline", str(tmp_path)).early_exit is None
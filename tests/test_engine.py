@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from src.api.schemas import FEATURE_COLUMNS, PredictionRequest
+from src.scoring.engine import CompiledPreprocessor, CompiledScorer, export_compiled_artifacts
+from src.scoring.scorer import Scorer
+from src.training.preprocess import get_preprocessor, split_features_target
+
+
+def test_compiled_scorer_matches_pipeline(trained_pipeline, synthetic_df, tmp_path):
+    spec_path, booster_path = export_compiled_artifacts(
+        trained_pipeline, str(tmp_path / "spec.json"), str(tmp_path / "booster.ubj")
+    )
+    compiled = CompiledScorer.load(spec_path, booster_path)
+    reference = Scorer(trained_pipeline)
+    X, _ = split_features_target(synthetic_df)
+
+    expected = trained_pipeline.predict_proba(X)[:, 1]
+    np.testing.assert_allclose(compiled.score(X).probabilities, expected, rtol=1e-6)
+    np.testing.assert_array_equal(compiled.score(X).labels, reference.score(X).labels)
+
+    # Single-row fast path from request objects
+    request = PredictionRequest(**X.iloc[0].to_dict())
+    single = compiled.score(compiled.features_from_requests([request]), top_k=3)
+    assert single.probabilities[0] == pytest.approx(expected[0], rel=1e-6)
+    assert single.explanations[0][1] == reference.score(X.head(1), top_k=3).explanations[0][1]
+
+
+def test_compiled_preprocessor_categorical_parity(synthetic_df):
+    X, _ = split_features_target(synthetic_df)
+    X = X[FEATURE_COLUMNS].astype(float)
+    cat_cols = ['sex', 'education', 'marriage']
+    num_cols = [c for c in FEATURE_COLUMNS if c not in cat_cols]
+    preprocessor = get_preprocessor(cat_cols, num_cols).fit(X)
+
+    probe = X.head(20).copy()
+    probe.iloc[0, probe.columns.get_loc('limit_bal')] = np.nan   # median imputation
+    probe.iloc[1, probe.columns.get_loc('education')] = np.nan   # most-frequent imputation
+    probe.iloc[2, probe.columns.get_loc('marriage')] = 99        # unknown category -> all zeros
+
+    compiled = CompiledPreprocessor.from_dict(CompiledPreprocessor.from_column_transformer(preprocessor).to_dict())
+    expected = preprocessor.transform(probe).astype(np.float32)
+    np.testing.assert_allclose(compiled.transform(probe.to_numpy()), expected, rtol=1e-6, atol=1e-6)
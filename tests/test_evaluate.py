@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+from sklearn.metrics import (
+    accuracy_score, average_precision_score, brier_score_loss, confusion_matrix, f1_score,
+    log_loss, precision_score, recall_score, roc_auc_score
+)
+
+from src.training.evaluate import build_report, evaluate_predictions
+
+
+@pytest.fixture
+def scores():
+    rng = np.random.default_rng(0)
+    y = rng.integers(0, 2, 2000)
+    # Rounded so there are ties, and some probabilities sit exactly on the threshold
+    prob = np.clip(np.round(0.3 * y + rng.random(2000) * 0.7, 2), 0, 1)
+    return y, prob
+
+
+def test_metrics_match_sklearn(scores):
+    y, prob = scores
+    result = evaluate_predictions(y, prob, threshold=0.5)
+    metrics = result["metrics"]
+    pred = (prob >= 0.5).astype(int)
+    assert metrics["accuracy"] == pytest.approx(accuracy_score(y, pred))
+    assert metrics["precision"] == pytest.approx(precision_score(y, pred))
+    assert metrics["recall"] == pytest.approx(recall_score(y, pred))
+    assert metrics["f1"] == pytest.approx(f1_score(y, pred))
+    assert metrics["roc_auc"] == pytest.approx(roc_auc_score(y, prob))
+    assert metrics["average_precision"] == pytest.approx(average_precision_score(y, prob))
+    assert metrics["log_loss"] == pytest.approx(log_loss(y, prob))
+    assert metrics["brier"] == pytest.approx(brier_score_loss(y, prob))
+    assert result["confusion_matrix"] == confusion_matrix(y, pred).tolist()
+
+
+def test_threshold_sweep_and_calibration(scores):
+    y, prob = scores
+    result = evaluate_predictions(y, prob, threshold=0.37, n_thresholds=11, n_bins=5)
+    thresholds = [row["threshold"] for row in result["threshold_sweep"]]
+    assert 0.37 in thresholds and len(thresholds) == 12
+    for row in result["threshold_sweep"]:
+        pred = (prob >= row["threshold"]).astype(int)
+        assert row["recall"] == pytest.approx(recall_score(y, pred, zero_division=0))
+        assert row["precision"] == pytest.approx(precision_score(y, pred, zero_division=0))
+
+    bins = result["calibration"]
+    assert sum(b["count"] for b in bins) == len(y)
+    top = prob >= 0.8
+    assert bins[-1]["observed_rate"] == pytest.approx(y[top].mean())
+
+    report = build_report({"baseline": result, "champion": result})
+    assert report["champion"]["threshold"] == 0.37 and report["confusion_matrix"] == result["confusion_matrix"]
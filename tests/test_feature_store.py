@@ -0,0 +1,163 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.schemas import FEATURE_COLUMNS
+from src.scoring.engine import CompiledPreprocessor
+from src.scoring.feature_store import FeatureStore, StoreReplaced, build, refresh
+from src.scoring.scorer import Scorer
+from src.training.preprocess import split_features_target
+
+
+@pytest.fixture
+def accounts(synthetic_df):
+    X, _ = split_features_target(synthetic_df)
+    return X, np.arange(len(X), dtype=np.int64) * 7919 + 10**12
+
+
+@pytest.fixture
+def store(trained_pipeline, accounts, tmp_path):
+    X, ids = accounts
+    preprocessor = CompiledPreprocessor.from_column_transformer(trained_pipeline.named_steps['preprocessor'])
+    return build(X, preprocessor, str(tmp_path / "store"), ids, chunk_size=100)
+
+
+def test_lookup_returns_the_stored_rows(trained_pipeline, accounts, store):
+    X, ids = accounts
+    rows = store.lookup(ids)
+    assert store.n_accounts == len(ids)
+    np.testing.assert_array_equal(store._ids[rows], ids)
+    expected = trained_pipeline.named_steps['preprocessor'].transform(X).astype(np.float32)
+    np.testing.assert_array_equal(store.features(rows), expected)
+
+    assert store.lookup([1, -1, ids[5]]).tolist() == [-1, -1, rows[5]]
+    row = store.get(int(ids[3]))
+    # A view of the mapped file, not a copy
+    assert np.shares_memory(row, store._features)
+    assert store.get(12345) is None
+
+
+def test_scores_match_scoring_the_raw_features(trained_pipeline, accounts, store):
+    X, ids = accounts
+    scorer = Scorer(trained_pipeline)
+    assert store.compatible(scorer)
+    np.testing.assert_allclose(scorer.score_transformed(store.features(store.lookup(ids[:50]))).probabilities,
+                               scorer.score(X.head(50)).probabilities, rtol=1e-6)
+
+
+def test_upserts_grow_the_store_and_persist(store, accounts, tmp_path):
+    X, ids = accounts
+    raw = X[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+    before = store.stats()
+    changed = raw[:10].copy()
+    changed[:, FEATURE_COLUMNS.index("limit_bal")] += 1000
+    new_ids = np.arange(2000, dtype=np.int64) + 1
+    new_raw = np.tile(raw, (7, 1))[:2000]
+
+    assert store.upsert(ids[:10], changed) == {"inserted": 0, "updated": 10}
+    assert store.upsert(new_ids, new_raw) == {"inserted": 2000, "updated": 0}
+    stats = store.stats()
+    assert stats["accounts"] == len(ids) + 2000 and stats["stale_rows"] == 10
+    assert stats["capacity"] > before["capacity"] and stats["index_slots"] > before["index_slots"]
+
+    reopened = FeatureStore(store.directory)
+    np.testing.assert_array_equal(reopened.raw_frame(reopened.lookup(ids[:10])).to_numpy(), changed.astype(np.float32))
+    np.testing.assert_array_equal(reopened.features(reopened.lookup(new_ids)), store.preprocessor.transform(new_raw))
+    np.testing.assert_array_equal(reopened.lookup(ids[10:]), store.lookup(ids[10:]))
+
+    # Refresh keeps each account's latest row and drops the stale ones
+    refreshed = refresh(store.preprocessor, store.directory)
+    assert refreshed.stats()["stale_rows"] == 0 and refreshed.n_accounts == stats["accounts"]
+    np.testing.assert_array_equal(refreshed.raw_frame(refreshed.lookup(ids[:10])).to_numpy(), changed.astype(np.float32))
+
+
+def test_writers_in_two_processes_append_after_each_other(store, accounts):
+    X, ids = accounts
+    raw = X[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+    cli, service = store, FeatureStore(store.directory)
+
+    cli.upsert([100], raw[:1])
+    service.upsert([101], raw[1:2])
+    # Enough new accounts to grow the rows and rehash the index under the other instance
+    cli.upsert(np.arange(5000, 7000), np.tile(raw, (7, 1))[:2000])
+    service.upsert([102], raw[2:3])
+
+    reopened = FeatureStore(store.directory)
+    assert reopened.n_accounts == len(ids) + 2003
+    np.testing.assert_array_equal(reopened.raw_frame(reopened.lookup([100, 101, 102])).to_numpy(),
+                                  raw[:3].astype(np.float32))
+    np.testing.assert_array_equal(service.features(service.lookup([100, 101])), reopened.features(reopened.lookup([100, 101])))
+
+    # A rebuilt directory is not written through the old instance
+    rebuilt = build(X.head(10), store.preprocessor, store.directory)
+    with pytest.raises(StoreReplaced):
+        service.upsert([103], raw[:1])
+    assert rebuilt.n_accounts == 10 and FeatureStore(store.directory).n_accounts == 10
+
+
+def test_interrupted_upsert_leaves_no_key_past_the_committed_rows(store, accounts, monkeypatch):
+    from src.scoring import feature_store
+    X, _ = accounts
+    raw = X[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+    insert = feature_store._insert
+
+    def insert_then_die(*args):
+        insert(*args)
+        raise KeyboardInterrupt
+
+    # Killed after the new key is published, before the final metadata write
+    monkeypatch.setattr(feature_store, "_insert", insert_then_die)
+    with pytest.raises(KeyboardInterrupt):
+        store.upsert([5000], raw[:1])
+    monkeypatch.setattr(feature_store, "_insert", insert)
+
+    reopened = FeatureStore(store.directory)
+    reopened.upsert([6000], raw[1:2])
+    rows = reopened.lookup([5000, 6000])
+    assert rows[0] != rows[1]
+    np.testing.assert_array_equal(reopened.raw_frame(rows).to_numpy(), raw[:2].astype(np.float32))
+
+
+def test_store_for_another_preprocessor_is_rejected(trained_pipeline, store):
+    scorer = Scorer(trained_pipeline)
+    other = CompiledPreprocessor.from_dict({**store.meta["spec"], "num_mean": [0.0] * len(store.meta["spec"]["num_mean"])})
+    stale = refresh(other, store.directory)
+    assert not stale.compatible(scorer)
+
+
+def test_api_scores_by_account_id(trained_pipeline, accounts, store, monkeypatch):
+    from src.api.main import app, models
+    from src.scoring.executor import InferenceExecutor
+    from src.scoring.registry import ModelRegistry
+    from src.utils.config import settings
+
+    X, ids = accounts
+    client = TestClient(app)
+    registry = ModelRegistry()
+    registry.register("test", Scorer(trained_pipeline))
+    registry.activate("test")
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "secret")
+    models.update(registry=registry, feature_store=store, executor=InferenceExecutor("threadpool", max_pending=8))
+    try:
+        expected = client.post("/predict", json=X.iloc[2].to_dict()).json()
+        single = client.post("/predict/by-id", json={"account_id": int(ids[2])})
+        assert single.status_code == 200
+        assert single.json()["default_probability"] == pytest.approx(expected["default_probability"], rel=1e-6)
+        assert "lookup" in single.headers["Server-Timing"]
+        assert client.post("/predict/by-id", json={"account_id": 3}).status_code == 404
+        assert client.post("/predict/by-id/batch", json={"account_ids": [2**63]}).status_code == 422
+
+        batch = client.post("/predict/by-id/batch", json={"account_ids": [int(ids[0]), 3, int(ids[2])]}).json()
+        assert (batch["n_success"], batch["n_failed"]) == (2, 1)
+        assert batch["results"][1]["errors"] == ["account_id: unknown account"]
+        assert batch["results"][2]["prediction"]["default_probability"] == pytest.approx(expected["default_probability"], rel=1e-6)
+
+        account = {**X.iloc[0].to_dict(), "account_id": 3}
+        upsert = client.post("/admin/feature-store/upsert", json={"accounts": [account]}, headers={"X-Admin-Token": "secret"})
+        assert upsert.json() == {"inserted": 1, "updated": 0, "accounts": len(ids) + 1}
+        assert client.post("/predict/by-id", json={"account_id": 3}).status_code == 200
+        stats = client.get("/feature-store/stats").json()
+        assert stats["enabled"] and stats["compatible_with_active"] and stats["misses"] == 2
+    finally:
+        models.clear()
+    assert client.post("/predict/by-id", json={"account_id": 3}).status_code == 503
@@ -0,0 +1,81 @@
+import copy
+import json
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.monitoring.drift import SCORE_COLUMN, build_reference, save_reference
+from src.training.incremental import (
+    incremental_train, remap_thresholds, update_scalers, updated_reference, warm_start
+)
+from src.training.mock_data import generate_synthetic_data
+from src.training.preprocess import split_features_target
+
+
+@pytest.fixture(scope="module")
+def new_rows():
+    return split_features_target(generate_synthetic_data(n_rows=400, seed=9))
+
+
+def test_scaler_moments_match_a_refit_on_all_rows(trained_pipeline, synthetic_df, new_rows):
+    X_old, _ = split_features_target(synthetic_df)
+    X_new, _ = new_rows
+    preprocessor = copy.deepcopy(trained_pipeline.named_steps['preprocessor'])
+    update_scalers(preprocessor, X_new)
+
+    scaler = preprocessor.named_transformers_['num'].named_steps['scaler']
+    combined = pd.concat([X_old, X_new], ignore_index=True).to_numpy(dtype=np.float64)
+    assert scaler.n_samples_seen_ == len(combined)
+    np.testing.assert_allclose(scaler.mean_, combined.mean(axis=0), rtol=1e-9)
+    np.testing.assert_allclose(scaler.var_, combined.var(axis=0), rtol=1e-9)
+
+
+def test_remapped_trees_score_exactly_as_before(trained_pipeline, new_rows):
+    X_new, _ = new_rows
+    X_score, _ = split_features_target(generate_synthetic_data(n_rows=2000, seed=10))
+    preprocessor = copy.deepcopy(trained_pipeline.named_steps['preprocessor'])
+    booster = remap_thresholds(trained_pipeline.named_steps['classifier'].get_booster(),
+                               update_scalers(preprocessor, X_new))
+
+    before = trained_pipeline.predict_proba(X_score)[:, 1]
+    after = booster.inplace_predict(preprocessor.transform(X_score).astype(np.float32))
+    np.testing.assert_array_equal(after, before)
+
+
+def test_warm_start_adds_rounds_without_touching_the_input(trained_pipeline, new_rows):
+    X_new, y_new = new_rows
+    means = trained_pipeline.named_steps['preprocessor'].named_transformers_['num'].named_steps['scaler'].mean_.copy()
+    updated = warm_start(trained_pipeline, X_new, y_new, rounds=5)
+
+    assert updated.named_steps['classifier'].get_booster().num_boosted_rounds() == 25
+    assert updated.named_steps['classifier'].n_estimators == 25
+    assert trained_pipeline.named_steps['classifier'].get_booster().num_boosted_rounds() == 20
+    np.testing.assert_array_equal(
+        trained_pipeline.named_steps['preprocessor'].named_transformers_['num'].named_steps['scaler'].mean_, means)
+    assert updated.predict_proba(X_new).shape == (len(X_new), 2)
+
+
+def test_report_compares_with_a_full_retrain(trained_pipeline, synthetic_df, tmp_path):
+    joblib.dump(trained_pipeline, tmp_path / "model.pkl")
+    report = incremental_train(generate_synthetic_data(n_rows=400, seed=11), rounds=5,
+                               model_path=str(tmp_path / "model.pkl"), compare=True, history_df=synthetic_df,
+                               output_path=str(tmp_path / "incremental.json"), export=False)
+    assert report["n_trees"] == 25 and report["n_fit_rows"] == 320
+    for model in ("previous", "incremental", "full_retrain"):
+        assert set(report[model]["auc"]) == {"new_holdout", "history_test"}
+    assert report["incremental"]["seconds"] > 0 and report["full_retrain"]["seconds"] > 0
+    assert json.load(open(tmp_path / "incremental.json")) == report
+
+
+def test_drift_reference_keeps_the_history(synthetic_df, new_rows, tmp_path):
+    X_old, _ = split_features_target(synthetic_df)
+    X_new, _ = new_rows
+    previous = build_reference(X_old, np.linspace(0, 1, len(X_old)))
+    save_reference(previous, str(tmp_path / "drift_reference.json"))
+
+    reference = updated_reference(str(tmp_path / "model.pkl"), X_new, np.full(50, 0.2))
+    assert reference["limit_bal"]["edges"] == previous["limit_bal"]["edges"]
+    assert sum(reference["limit_bal"]["counts"]) == len(X_old) + len(X_new)
+    assert sum(reference[SCORE_COLUMN]["counts"]) == 50
@@ -0,0 +1,46 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from src.api.schemas import FEATURE_COLUMNS, PredictionRequest
+from src.training.mock_data import generate_synthetic_data, iter_synthetic_chunks, write_request_payloads, write_synthetic_dataset
+
+
+def test_generator_is_reproducible_and_leaves_global_state_alone():
+    np.random.seed(0)
+    expected_next = np.random.rand()
+    np.random.seed(0)
+    first = generate_synthetic_data(500)
+    assert np.random.rand() == expected_next
+    pd.testing.assert_frame_equal(first, generate_synthetic_data(500))
+    assert not first.equals(generate_synthetic_data(500, seed=1))
+
+
+def test_generator_models_delinquency_and_default_correlation():
+    df = generate_synthetic_data(20000)
+    assert set(df.columns) == set(FEATURE_COLUMNS) | {'target'}
+    assert 0.15 < df['target'].mean() < 0.3
+    assert df['pay_1'].between(-2, 8).all()
+    assert df['pay_1'].corr(df['pay_2']) > 0.5
+    assert df['pay_1'].corr(df['target']) > 0.2
+    assert df['limit_bal'].corr(df['target']) < 0
+
+
+def test_dataset_streams_in_chunks(tmp_path):
+    path = tmp_path / "synthetic.csv"
+    summary = write_synthetic_dataset(str(path), 2500, chunk_size=1000)
+    assert summary["rows"] == 2500
+    written = pd.read_csv(path)
+    assert len(written) == 2500
+    assert [len(c) for c in iter_synthetic_chunks(2500, chunk_size=1000)] == [1000, 1000, 500]
+    pd.testing.assert_frame_equal(written, pd.concat(iter_synthetic_chunks(2500, 1000), ignore_index=True))
+
+
+def test_payload_file_contains_valid_requests(tmp_path):
+    path = tmp_path / "payloads.jsonl"
+    write_request_payloads(str(path), 50, chunk_size=20)
+    lines = [json.loads(line) for line in open(path)]
+    assert len(lines) == 50
+    assert all('target' not in line for line in lines)
+    PredictionRequest(**lines[0])
@@ -0,0 +1,40 @@
+import json
+
+import numpy as np
+import pytest
+import xgboost as xgb
+
+from src.explainability.shap_utils import get_feature_names
+from src.explainability.shap_report import StratifiedSample, generate_shap_report, load_shap_values
+from src.training.preprocess import split_features_target
+
+
+def test_chunked_report_matches_full_contributions(trained_pipeline, synthetic_df, tmp_path):
+    X, _ = split_features_target(synthetic_df)
+    chunks = (X.iloc[i:i + 64] for i in range(0, len(X), 64))
+    summary = generate_shap_report(trained_pipeline, chunks, str(tmp_path), sample_size=50, n_strata=5, plot=False)
+
+    booster = trained_pipeline.named_steps['classifier'].get_booster()
+    X_t = trained_pipeline.named_steps['preprocessor'].transform(X)
+    expected = booster.predict(xgb.DMatrix(X_t), pred_contribs=True)[:, :-1]
+
+    values = load_shap_values(str(tmp_path))
+    assert values.shape == expected.shape
+    np.testing.assert_allclose(values, expected, atol=1e-4)
+    names = get_feature_names(trained_pipeline.named_steps['preprocessor'])
+    mean_abs = dict(zip([str(n) for n in names], np.abs(expected).mean(axis=0)))
+    assert list(summary["mean_abs_shap"].values()) == sorted(summary["mean_abs_shap"].values(), reverse=True)
+    for name, value in summary["mean_abs_shap"].items():
+        assert value == pytest.approx(mean_abs[name], abs=1e-5)
+    assert 0 < summary["sample_size"] <= 50
+    assert json.load(open(tmp_path / "shap_importance.json"))["rows"] == len(X)
+
+
+def test_stratified_sample_keeps_each_stratum_bounded():
+    sample = StratifiedSample(n_strata=2, per_stratum=10, seed=0)
+    for start in range(0, 1000, 100):
+        rows = np.arange(start, start + 100)
+        sample.update(rows, (rows % 10 == 0).astype(int))
+    rows = sample.rows()
+    assert len(rows) == 20
+    assert (rows % 10 == 0).sum() == 10
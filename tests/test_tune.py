@@ -0,0 +1,45 @@
+import json
+
+import numpy as np
+import xgboost as xgb
+from sklearn.pipeline import Pipeline
+
+from src.scoring.engine import CompiledScorer, export_compiled_artifacts
+from src.training.preprocess import get_preprocessor, split_features_target
+from src.training.tune import MedianPruner, tune
+
+
+def test_tune_persists_trials_and_reports_best(synthetic_df, tmp_path):
+    summary = tune(n_trials=4, n_folds=3, parallel=2, max_rounds=30, early_stopping_rounds=5,
+                   min_trials_before_pruning=2, output_dir=str(tmp_path), export=False, df=synthetic_df)
+    trials = [json.loads(line) for line in open(tmp_path / "trials.jsonl")]
+    assert len(trials) == 4
+    assert {t["status"] for t in trials} <= {"complete", "pruned"}
+    best = max((t for t in trials if t["status"] == "complete"), key=lambda t: t["mean_auc"])
+    assert summary["best_trial"] == best["trial"]
+    assert summary["params"]["n_estimators"] >= 1
+    assert json.load(open(tmp_path / "best.json"))["cv_auc"] == best["mean_auc"]
+
+
+def test_median_pruner():
+    pruner = MedianPruner(min_trials=2)
+    assert not pruner.should_prune(0, 0.7)
+    assert not pruner.should_prune(0, 0.8)
+    assert pruner.should_prune(0, 0.6)
+    assert not pruner.should_prune(0, 0.9)
+
+
+def test_export_keeps_only_best_iteration(synthetic_df, tmp_path):
+    X, y = split_features_target(synthetic_df)
+    X_train, y_train, X_valid, y_valid = X.iloc[:200], y.iloc[:200], X.iloc[200:], y.iloc[200:]
+    pipeline = Pipeline([
+        ('preprocessor', get_preprocessor([], X.columns.tolist())),
+        ('classifier', xgb.XGBClassifier(n_estimators=200, early_stopping_rounds=3, n_jobs=1, random_state=42))
+    ])
+    X_valid_t = get_preprocessor([], X.columns.tolist()).fit(X_train).transform(X_valid)
+    pipeline.fit(X_train, y_train, classifier__eval_set=[(X_valid_t, y_valid)], classifier__verbose=False)
+    assert pipeline.named_steps['classifier'].best_iteration < 199
+
+    spec_path, booster_path = export_compiled_artifacts(pipeline, str(tmp_path / "spec.json"), str(tmp_path / "b.ubj"))
+    compiled = CompiledScorer.load(spec_path, booster_path)
+    np.testing.assert_allclose(compiled.score(X).probabilities, pipeline.predict_proba(X)[:, 1], rtol=1e-6)